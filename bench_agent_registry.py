@@ -0,0 +1,123 @@
+"""
+Benchmark of chat session start for the ReAct Chainlit apps.
+
+Usage:
+    python bench_agent_registry.py [--connects 1000] [--openai]
+
+Compares what on_chat_start does per connecting user:
+
+    per-session  a new LLM client, FunctionTool.from_defaults for add and
+                 multiply, a ReActAgentWorker and an AgentRunner, as the apps
+                 did before
+    registry     AgentRegistry.new_runner() around the shared worker
+
+Reported are the start latency per connect and the memory still held per
+session once all of them are connected (traced with tracemalloc). The LLM is
+MockReActLLM unless --openai is given, which builds OpenAI(model="gpt-4")
+clients with a dummy key; no requests are sent either way. Afterwards one
+question is answered in a registry session, as a check that the shared
+worker works.
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+
+from llama_index.core.agent import AgentRunner, ReActAgentWorker
+from llama_index.core.tools import FunctionTool
+
+from mock_llm import MockReActLLM
+from react_agent import AgentRegistry, hide_deprecation_warnings, iter_agent_steps
+
+# AgentRunner/ReActAgentWorker warn about their deprecation on every construction
+hide_deprecation_warnings()
+
+
+def add(a: int, b: int) -> int:
+    """Adds two integers and returns the result integer"""
+    return a + b
+
+
+def multiply(a: int, b: int) -> int:
+    """Multiplies two integers and returns the result integer"""
+    return a * b
+
+
+def per_session_runner(llm_factory):
+    llm = llm_factory()
+    add_tool = FunctionTool.from_defaults(fn=add)
+    multiply_tool = FunctionTool.from_defaults(fn=multiply)
+    agent_worker = ReActAgentWorker.from_tools([add_tool, multiply_tool], llm=llm)
+    return AgentRunner(agent_worker=agent_worker)
+
+
+def measure(connect, connects):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = []
+    latencies = []
+    for _ in range(connects):
+        start = time.perf_counter()
+        sessions.append(connect())
+        latencies.append(time.perf_counter() - start)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return sorted(latencies), held / connects, sessions
+
+
+async def answer(agent_runner, question):
+    task = agent_runner.create_task(question)
+    async for step in iter_agent_steps(agent_runner, task):
+        if step.tokens is not None:
+            async for _ in step.tokens:
+                pass
+    return str(await agent_runner.afinalize_response(task.task_id))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connects", type=int, default=1000)
+    parser.add_argument("--openai", action="store_true", help="Build OpenAI clients instead of MockReActLLM")
+    args = parser.parse_args()
+
+    if args.openai:
+        from llama_index.llms.openai import OpenAI
+
+        def llm_factory():
+            return OpenAI(model="gpt-4", api_key="sk-benchmark")
+    else:
+        def llm_factory():
+            return MockReActLLM(latency=0.0)
+
+    # Outside of the measurement, like at app import
+    agent_registry = AgentRegistry(llm_factory, [add, multiply])
+    agent_registry.agent_worker
+
+    print(f"{args.connects} connects, {'OpenAI' if args.openai else 'MockReActLLM'}")
+    results = {}
+    for name, connect in (
+        ("per-session", lambda: per_session_runner(llm_factory)),
+        ("registry", agent_registry.new_runner),
+    ):
+        latencies, held, sessions = measure(connect, args.connects)
+        results[name] = statistics.mean(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(
+            f"{name:12}: start latency mean {statistics.mean(latencies) * 1e3:7.3f} ms, "
+            f"p50 {statistics.median(latencies) * 1e3:7.3f} ms, p95 {p95 * 1e3:7.3f} ms, "
+            f"memory {held / 1024:7.1f} KiB per session"
+        )
+        del sessions
+    print(f"Speedup: {results['per-session'] / results['registry']:.1f}x")
+
+    if not args.openai:
+        response = asyncio.run(answer(agent_registry.new_runner(), "What is 6 times 7?"))
+        assert response.endswith("42."), response
+
+
+if __name__ == '__main__':
+    main()
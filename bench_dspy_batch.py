@@ -0,0 +1,157 @@
+"""
+Throughput benchmark of dspy_batch.py against a mock DSPy module.
+
+Usage:
+    python bench_dspy_batch.py [--prompts 5000] [--concurrency 64] [--latency 0.01] [--failure-rate 0.02]
+
+MockQA stands in for a dspy.Module: `acall` waits `--latency` seconds and
+fails with `--failure-rate` probability, like a rate-limited LM. Compared are
+
+    per-row     the design-notes runner: asyncio.gather under a Semaphore,
+                opening the database and committing on every status update
+    batched     BatchRunner, with executemany writes in WAL mode and retries
+
+Then a batched run is cancelled halfway, as a crash would stop it, and
+resumed with the same run id; the resumed run must only process the inputs
+that were not done yet.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from dspy_batch import DONE, BatchRunner, BatchStore
+
+
+class MockPrediction:
+    def __init__(self, answer, prompt_tokens, completion_tokens):
+        self.answer = answer
+        self._usage = {"openai/gpt-4o-mini": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}}
+
+    def toDict(self):
+        return {"answer": self.answer}
+
+    def get_lm_usage(self):
+        return self._usage
+
+
+class MockQA:
+    """A dspy.Module-like question answerer with LM latency and transient failures."""
+
+    def __init__(self, latency, failure_rate, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def acall(self, question):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("429 rate limited")
+        return MockPrediction(f"Answer to {question}", len(question) // 4 + 50, 20)
+
+
+async def per_row(module, questions, path, concurrency):
+    """The runner of the design notes: a connection and commit per status update."""
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE tasks (task_id INTEGER PRIMARY KEY AUTOINCREMENT, input_data TEXT NOT NULL,"
+        " status TEXT NOT NULL, progress FLOAT DEFAULT 0, output TEXT, error TEXT)"
+    )
+    task_ids = []
+    for question in questions:
+        task_ids.append(connection.execute(
+            "INSERT INTO tasks (input_data, status) VALUES (?, 'Pending')", (question,)
+        ).lastrowid)
+    connection.commit()
+    connection.close()
+
+    def update(task_id, progress, status, output=None, error=None):
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "UPDATE tasks SET progress = ?, status = ?, output = ?, error = ? WHERE task_id = ?",
+            (progress, status, output, error, task_id),
+        )
+        connection.commit()
+        connection.close()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(question, task_id):
+        async with semaphore:
+            update(task_id, 0.1, "Processing")
+            try:
+                prediction = await module.acall(question=question)
+            except RuntimeError as error:
+                update(task_id, 0, "Error", error=str(error))
+                return
+            update(task_id, 1.0, "Completed", str(prediction.toDict()))
+
+    await asyncio.gather(*(process(question, task_id) for question, task_id in zip(questions, task_ids)))
+
+
+async def crash_and_resume(args, questions, path):
+    store = BatchStore(path)
+    runner = BatchRunner(MockQA(args.latency, args.failure_rate, seed=1), store, concurrency=args.concurrency,
+                         base_delay=0.01, max_attempts=5)
+    run = asyncio.create_task(runner.run(questions, run_id="nightly"))
+    while store.progress("nightly")[DONE] < len(questions) // 2:
+        await asyncio.sleep(0.05)
+    run.cancel()
+    try:
+        await run
+    except asyncio.CancelledError:
+        pass
+    before = store.progress("nightly")
+    resumed = await runner.run(questions, run_id="nightly")
+    after = store.progress("nightly")
+    store.close()
+    return before, resumed, after
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prompts", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.01, help="Mock LM latency per call in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Share of calls that fail")
+    args = parser.parse_args()
+    questions = [f"Question {i}: what is {i} squared?" for i in range(args.prompts)]
+    ideal = args.prompts * args.latency / args.concurrency
+    print(
+        f"{args.prompts} prompts, concurrency {args.concurrency}, {args.latency * 1e3:.0f} ms per call, "
+        f"{args.failure_rate:.0%} failures; latency-bound time {ideal:.2f} s"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        module = MockQA(args.latency, args.failure_rate)
+        start = time.perf_counter()
+        asyncio.run(per_row(module, questions, os.path.join(directory, "per_row.db"), args.concurrency))
+        elapsed = time.perf_counter() - start
+        print(f"per-row : {elapsed:6.2f} s, {args.prompts / elapsed:8.0f} prompts/s, failures not retried")
+
+        store = BatchStore(os.path.join(directory, "batched.db"))
+        module = MockQA(args.latency, args.failure_rate)
+        runner = BatchRunner(module, store, concurrency=args.concurrency, base_delay=0.01, max_attempts=5)
+        summary = asyncio.run(runner.run(questions, run_id="bench"))
+        progress = store.progress("bench")
+        print(
+            f"batched : {summary['elapsed']:6.2f} s, {args.prompts / summary['elapsed']:8.0f} prompts/s, "
+            f"{module.calls - args.prompts} retries, {progress[DONE]} done, {progress['failed']} failed"
+        )
+        store.close()
+
+        before, resumed, after = asyncio.run(crash_and_resume(args, questions, os.path.join(directory, "resume.db")))
+        assert resumed["skipped"] == before[DONE] and after[DONE] + after["failed"] == args.prompts, (before, resumed, after)
+        print(
+            f"resume  : {before[DONE]} done and {before['running']} running at the crash; resumed run skipped "
+            f"{resumed['skipped']} and finished the other {resumed['done'] + resumed['failed']} in {resumed['elapsed']:.2f} s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark of the NotesElement update traffic of chainlit_example.py.
+
+Usage:
+    python bench_notes_updates.py [--notes 500] [--burst 5] [--interval 0.01]
+
+Notes are added in bursts of `--burst`, `--interval` seconds apart within a
+burst, to an element that only records the size of the props it is sent.
+Compared are re-sending the whole notes list on every note, as the app did
+before, and NotesFeed, which sends batches of operations. A replay of the
+sent operations is checked against the notes in the store.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from notes_store import NotesFeed, NotesStore
+
+
+class RecordingElement:
+    def __init__(self, props):
+        self.props = props
+        self.updates = 0
+        self.bytes_sent = 0
+        self.sent = []
+
+    async def update(self):
+        payload = json.dumps(self.props)
+        self.updates += 1
+        self.bytes_sent += len(payload)
+        self.sent.append(json.loads(payload))
+
+
+async def full_list(notes, burst, interval):
+    element = RecordingElement({"notes": []})
+    for i in range(notes):
+        element.props["notes"].append({"id": i, "content": f"note {i}", "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")})
+        await element.update()
+        await asyncio.sleep(interval if (i + 1) % burst else 0)
+    return element
+
+
+async def feed(store, notes, burst, interval):
+    element = RecordingElement({})
+    notes_feed = NotesFeed(store, "bench-user", element, delay=burst * interval)
+    element.props = await notes_feed.initial_props()
+    for i in range(notes):
+        await notes_feed.append(f"note {i}")
+        await asyncio.sleep(interval if (i + 1) % burst else 0)
+        if i % 10 == 9:
+            await notes_feed.delete(i - 5)
+    await notes_feed.flush()
+
+    replayed = {}
+    for props in element.sent:
+        for op in props["ops"]:
+            if op["op"] == "append":
+                replayed[op["note"]["id"]] = op["note"]
+            else:
+                replayed.pop(op["id"], None)
+    assert list(replayed.values()) == store.notes("bench-user")
+    return element
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--burst", type=int, default=5, help="Notes added in quick succession")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between the notes of a burst")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = NotesStore(os.path.join(directory, "notes.db"))
+        for name, run in (
+            ("full list", full_list(args.notes, args.burst, args.interval)),
+            ("ops", feed(store, args.notes, args.burst, args.interval)),
+        ):
+            element = asyncio.run(run)
+            print(f"{name:9}: {element.updates:5} updates, {element.bytes_sent / 1024:9.1f} KiB sent")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark of independent tool calls in the ReAct agent, with MockReActLLM
+standing in for OpenAI(model="gpt-4").
+
+Usage:
+    python bench_parallel_react.py [--calls 4] [--latency 0.5] [--tool-latency 0.3]
+
+One question asks for `--calls` independent calculations, like a lookup of
+several companies. The stock ReActAgentWorker runs one tool call per step, so
+it takes one LLM round trip and one sequential tool call per calculation;
+ParallelReActAgentWorker gets all of them in one step and runs them at once.
+`add` is a blocking function tool (thread pool), `multiply` a coroutine. A
+last run checks that a tool exceeding its timeout becomes an error
+observation instead of holding up the step.
+"""
+import argparse
+import asyncio
+import time
+
+from llama_index.core.agent import ReActAgentWorker
+from llama_index.core.tools import FunctionTool
+
+from mock_llm import MockReActLLM
+from react_agent import AgentRegistry, hide_deprecation_warnings, iter_agent_steps
+from react_parallel import ParallelReActAgentWorker
+
+# AgentRunner/ReActAgentWorker warn about their deprecation on every construction
+hide_deprecation_warnings()
+
+
+def make_tools(tool_latency):
+    def add(a: int, b: int) -> int:
+        """Adds two integers and returns the result integer"""
+        time.sleep(tool_latency)
+        return a + b
+
+    async def multiply(a: int, b: int) -> int:
+        """Multiplies two integers and returns the result integer"""
+        await asyncio.sleep(tool_latency)
+        return a * b
+
+    return [FunctionTool.from_defaults(fn=add), FunctionTool.from_defaults(fn=multiply)]
+
+
+def make_question(calls):
+    clauses = [f"{i} {'times' if i % 2 else 'plus'} {i + 1}" for i in range(1, calls + 1)]
+    expected = [i * (i + 1) if i % 2 else i + (i + 1) for i in range(1, calls + 1)]
+    question = "What is " + ", ".join(clauses[:-1]) + (" and " if calls > 1 else "") + clauses[-1] + "?"
+    return question, expected
+
+
+async def answer(agent_runner, question):
+    task = agent_runner.create_task(question)
+    steps = 0
+    async for step in iter_agent_steps(agent_runner, task):
+        steps += 1
+        if step.tokens is not None:
+            async for _ in step.tokens:
+                pass
+    return str(await agent_runner.afinalize_response(task.task_id)), steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=4, help="Independent calculations per question")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock LLM latency per call in seconds")
+    parser.add_argument("--tool-latency", type=float, default=0.3, help="Latency of each tool call in seconds")
+    args = parser.parse_args()
+
+    question, expected = make_question(args.calls)
+    tools = make_tools(args.tool_latency)
+    print(f"{question!r}: {args.latency:.2f} s per LLM call, {args.tool_latency:.2f} s per tool call")
+
+    for name, worker_cls, parallel_actions in (
+        ("sequential", ReActAgentWorker, False),
+        ("parallel", ParallelReActAgentWorker, True),
+    ):
+        llm = MockReActLLM(latency=args.latency, parallel_actions=parallel_actions)
+        agent_registry = AgentRegistry(lambda: llm, tools, worker_cls=worker_cls)
+        start = time.perf_counter()
+        response, steps = asyncio.run(answer(agent_registry.new_runner(), question))
+        elapsed = time.perf_counter() - start
+        for value in expected:
+            assert str(value) in response, response
+        print(f"{name:10}: {elapsed:6.2f} s, {steps} steps: {response}")
+
+    # A tool call over its timeout must not hold up the others
+    llm = MockReActLLM(latency=args.latency, parallel_actions=True)
+    timeout = args.tool_latency / 2
+    agent_registry = AgentRegistry(
+        lambda: llm, tools, worker_cls=ParallelReActAgentWorker, tool_timeouts={"multiply": timeout}
+    )
+    start = time.perf_counter()
+    response, steps = asyncio.run(answer(agent_registry.new_runner(), question))
+    elapsed = time.perf_counter() - start
+    assert "timed out" in response, response
+    print(f"{'timeout':10}: {elapsed:6.2f} s, {steps} steps, multiply limited to {timeout:.2f} s: {response}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark for Phi3GenerationServer: throughput and time-to-first-token for
+many concurrent conversations sharing the system prompt and few-shot turns
+of phi3-128k.py.
+
+Usage:
+    python bench_phi3_server.py [--clients 16] [--max-new-tokens 64] [--model]
+
+By default the tiny random-weight model is used so the benchmark runs on any
+CPU; pass --model to load microsoft/Phi-3-mini-128k-instruct instead. Each
+configuration is run on the same requests:
+
+    sequential   one request at a time, no prefix cache
+    prefix       one request at a time, prefix KV cache
+    batched      dynamic batching and prefix KV cache
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from phi3_server import EXAMPLE_MESSAGES, Phi3GenerationServer, load_model, tiny_random_model
+
+CONFIGURATIONS = [
+    ("sequential", dict(max_batch_size=1, prefix_cache_size=0)),
+    ("prefix", dict(max_batch_size=1)),
+    ("batched", dict(max_batch_size=16)),
+]
+
+
+def make_conversations(count):
+    return [
+        EXAMPLE_MESSAGES[:-1] + [{"role": "user", "content": f"What about solving {i + 2}x + 3 = {i + 7}?"}]
+        for i in range(count)
+    ]
+
+
+def run(server, conversations, max_new_tokens):
+    streams = []
+    threads = []
+    start = time.perf_counter()
+
+    def client(messages):
+        stream = server.submit(messages, max_new_tokens=max_new_tokens)
+        streams.append(stream)
+        stream.text()
+
+    for messages in conversations:
+        thread = threading.Thread(target=client, args=(messages,))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stats = [stream.stats for stream in streams]
+    ttft = sorted(s.time_to_first_token for s in stats)
+    tokens = sum(s.generated_tokens for s in stats)
+    return {
+        "tokens/s": tokens / elapsed,
+        "ttft mean": statistics.mean(ttft),
+        "ttft p95": ttft[min(len(ttft) - 1, int(0.95 * len(ttft)))],
+        "elapsed": elapsed,
+        "tokens": tokens,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--model", action="store_true", help="Use the real model instead of the tiny one")
+    args = parser.parse_args()
+
+    model, tokenizer = load_model() if args.model else tiny_random_model()
+    conversations = make_conversations(args.clients)
+
+    print(f"{args.clients} clients, {args.max_new_tokens} new tokens each")
+    for name, options in CONFIGURATIONS:
+        with Phi3GenerationServer(model, tokenizer, **options) as server:
+            # Warm-up, which also fills the prefix cache as a long-running server would
+            server.generate(conversations[0], max_new_tokens=1)
+            result = run(server, conversations, args.max_new_tokens)
+        print(
+            f"{name:10}: {result['tokens/s']:8.1f} tokens/s, "
+            f"TTFT mean {result['ttft mean'] * 1e3:7.1f} ms, p95 {result['ttft p95'] * 1e3:7.1f} ms "
+            f"({result['tokens']} tokens in {result['elapsed']:.2f} s)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark of the tool and LLM caches of react_cache.py on repeated
+questions, with MockReActLLM standing in for OpenAI(model="gpt-4",
+temperature=0).
+
+Usage:
+    python bench_react_cache.py [--questions 100] [--distinct 10] [--latency 0.2] [--tool-latency 0.1]
+
+`--questions` sessions, one after the other, each ask one of `--distinct`
+questions with two independent calculations, so most questions repeat
+earlier ones. Reported are the session latencies without and with the caches
+and the cache hit rates.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from llama_index.core.tools import FunctionTool
+
+from mock_llm import MockReActLLM
+from react_agent import AgentRegistry, hide_deprecation_warnings, iter_agent_steps
+from react_cache import TTLCache
+from react_parallel import ParallelReActAgentWorker
+
+# AgentRunner/ReActAgentWorker warn about their deprecation on every construction
+hide_deprecation_warnings()
+
+
+def make_tools(tool_latency):
+    def add(a: int, b: int) -> int:
+        """Adds two integers and returns the result integer"""
+        time.sleep(tool_latency)
+        return a + b
+
+    def multiply(a: int, b: int) -> int:
+        """Multiplies two integers and returns the result integer"""
+        time.sleep(tool_latency)
+        return a * b
+
+    return [FunctionTool.from_defaults(fn=add), FunctionTool.from_defaults(fn=multiply)]
+
+
+async def answer(agent_runner, question):
+    task = agent_runner.create_task(question)
+    async for step in iter_agent_steps(agent_runner, task):
+        if step.tokens is not None:
+            async for _ in step.tokens:
+                pass
+    return str(await agent_runner.afinalize_response(task.task_id))
+
+
+async def run(agent_registry, questions):
+    latencies = []
+    for question, expected in questions:
+        start = time.perf_counter()
+        response = await answer(agent_registry.new_runner(), question)
+        latencies.append(time.perf_counter() - start)
+        assert response.endswith(f"{expected[0]} and {expected[1]}."), response
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--distinct", type=int, default=10, help="Distinct questions among them")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock LLM latency per call in seconds")
+    parser.add_argument("--tool-latency", type=float, default=0.1, help="Latency of each tool call in seconds")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    distinct = [
+        (f"What is {i} times {i + 1} and {i} plus {i + 2}?", (i * (i + 1), i + i + 2))
+        for i in range(1, args.distinct + 1)
+    ]
+    questions = [rng.choice(distinct) for _ in range(args.questions)]
+    tools = make_tools(args.tool_latency)
+    print(
+        f"{args.questions} questions, {args.distinct} distinct, "
+        f"{args.latency:.2f} s per LLM call, {args.tool_latency:.2f} s per tool call"
+    )
+
+    for name, caches in (
+        ("uncached", {}),
+        ("cached", {"tool_cache": TTLCache(maxsize=1024, ttl=3600), "llm_cache": TTLCache(maxsize=1024, ttl=3600)}),
+    ):
+        llm = MockReActLLM(latency=args.latency, temperature=0.0, parallel_actions=True)
+        agent_registry = AgentRegistry(lambda: llm, tools, worker_cls=ParallelReActAgentWorker, **caches)
+        start = time.perf_counter()
+        latencies = asyncio.run(run(agent_registry, questions))
+        elapsed = time.perf_counter() - start
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(
+            f"{name:8}: total {elapsed:6.2f} s, session latency p50 {statistics.median(latencies):6.3f} s, "
+            f"p95 {p95:6.3f} s" + (f", {agent_registry.cache_summary()}" if caches else "")
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,28 @@
 import chainlit as cl
 
+from notes_store import NotesFeed, NotesStore
+
+# Notes of all users, shared by the sessions
+notes_store = NotesStore("notes.db")
+
+def notes_user_id() -> str:
+    """Notes belong to the logged-in user, or to the session without login."""
+    user = cl.user_session.get("user")
+    return user.identifier if user else cl.user_session.get("id")
+
 @cl.on_chat_start
 async def start():
-    # Initialize an empty notes list
+    # Start from the notes stored for this user; later updates only send changes
     notes_element = cl.CustomElement(
         name="NotesElement",
-        props={"notes": []},
+        props={},
         display="side"  # This will display the element on the side
     )
+    notes_feed = NotesFeed(notes_store, notes_user_id(), notes_element)
+    notes_element.props = await notes_feed.initial_props()
     
-    # Store the element in the user session for later updates
-    cl.user_session.set("notes_element", notes_element)
+    # Store the feed in the user session for later updates
+    cl.user_session.set("notes_feed", notes_feed)
     
     # Send a welcome message with the notes element attached
     await cl.Message(
@@ -20,26 +32,37 @@ async def start():
 
 @cl.on_message
 async def on_message(message: cl.Message):
-    # Get the existing notes element from the session
-    notes_element = cl.user_session.get("notes_element")
+    # Get the notes feed from the session
+    notes_feed = cl.user_session.get("notes_feed")
     
     # Check if the message is adding a note
     if message.content.startswith("/note "):
         # Extract the note content
         note_content = message.content[6:].strip()
         
-        # Add the new note to the existing notes
-        current_notes = notes_element.props["notes"]
-        current_notes.append({
-            "id": len(current_notes),
-            "content": note_content,
-            "timestamp": cl.utils.format_datetime()
-        })
-        
-        # Update the element with the new notes
-        await notes_element.update()
+        # Store the note; the element gets it with the next batch of changes
+        await notes_feed.append(note_content)
         
         await cl.Message(content=f"Note added: '{note_content}'").send()
     else:
         # Normal message processing
         await cl.Message(content=f"Received: {message.content}").send()
+
+@cl.action_callback("delete_note")
+async def delete_note(action: cl.Action):
+    # Called by the element's delete button
+    notes_feed = cl.user_session.get("notes_feed")
+    return {"deleted": await notes_feed.delete(int(action.payload["id"]))}
+
+@cl.action_callback("notes_snapshot")
+async def notes_snapshot(action: cl.Action):
+    # Called by the element when it lost track of the changes
+    notes_feed = cl.user_session.get("notes_feed")
+    return await notes_feed.snapshot()
+
+@cl.on_chat_end
+async def end():
+    # Notes are already stored; only stop the pending element update
+    notes_feed = cl.user_session.get("notes_feed")
+    if notes_feed is not None:
+        notes_feed.close()
@@ -0,0 +1,330 @@
+"""
+Batch runs of a DSPy module over many inputs, with progress and results in
+SQLite for a Dash page to poll.
+
+    store = BatchStore("dspy_results.db")
+    runner = BatchRunner(my_dspy_module, store, concurrency=16)
+    summary = asyncio.run(runner.run(questions, run_id="nightly-2025-06-01"))
+
+Each input (a string, passed as `question`, or a dict of keyword arguments)
+becomes a task row keyed by a hash of the input within the run. A pool of
+`concurrency` workers calls the module: `acall` when it has one (DSPy 2.6+
+modules do), awaiting it when it is a coroutine function, otherwise on a
+thread pool of the same size. Failed calls are retried with exponential
+backoff and jitter, up to `max_attempts` tries per run invocation; the
+`attempts` column counts the tries of all invocations.
+
+Status changes go through one writer, which stores them with executemany in
+a single transaction every `flush_interval` seconds or `batch_size` updates,
+instead of a commit per update; the database is in WAL mode so readers never
+block it. Running the same `run_id` again resumes it: inputs already done are
+skipped, and tasks left running by a crash (or failed, with
+`retry_failed=True`) run again.
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+Input = Union[str, Dict[str, Any]]
+
+
+def input_key(kwargs: Dict[str, Any]) -> str:
+    """Identity of an input within a run: a hash of its canonical JSON."""
+    payload = json.dumps(kwargs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _usage(prediction: Any) -> Tuple[int, int]:
+    """Prompt and completion tokens of a dspy.Prediction (tracked with track_usage=True)."""
+    get_lm_usage = getattr(prediction, "get_lm_usage", None)
+    usage = get_lm_usage() if callable(get_lm_usage) else None
+    prompt_tokens = completion_tokens = 0
+    # {model name: {"prompt_tokens": ..., "completion_tokens": ..., ...}}
+    for model_usage in (usage or {}).values():
+        if isinstance(model_usage, dict):
+            prompt_tokens += model_usage.get("prompt_tokens") or 0
+            completion_tokens += model_usage.get("completion_tokens") or 0
+    return prompt_tokens, completion_tokens
+
+
+def _output(prediction: Any) -> Any:
+    to_dict = getattr(prediction, "toDict", None)
+    return to_dict() if callable(to_dict) else prediction
+
+
+class BatchStore:
+    """
+    Runs and their tasks in a SQLite database. Safe to share between threads;
+    other processes (the Dash page) can read it while a run writes.
+    """
+
+    def __init__(self, path: str = "dspy_results.db") -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS batch_runs ("
+                " run_id TEXT PRIMARY KEY,"
+                " created_at REAL NOT NULL,"
+                " total_tasks INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " run_id TEXT NOT NULL,"
+                " input_key TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " input TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " output TEXT,"
+                " error TEXT,"
+                " prompt_tokens INTEGER NOT NULL DEFAULT 0,"
+                " completion_tokens INTEGER NOT NULL DEFAULT 0,"
+                " started_at REAL,"
+                " finished_at REAL,"
+                " processing_time REAL,"
+                " PRIMARY KEY (run_id, input_key))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (run_id, status)")
+
+    def add_tasks(self, run_id: str, inputs: Sequence[Dict[str, Any]]) -> int:
+        """Create the run if needed and add the inputs it does not have yet; returns how many were added."""
+        rows = [(run_id, input_key(kwargs), position, json.dumps(kwargs, default=str), PENDING)
+                for position, kwargs in enumerate(inputs)]
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO batch_runs (run_id, created_at) VALUES (?, ?)", (run_id, time.time())
+            )
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO tasks (run_id, input_key, position, input, status) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            added = self._connection.total_changes - before
+            self._connection.execute(
+                "UPDATE batch_runs SET total_tasks = (SELECT COUNT(*) FROM tasks WHERE run_id = ?) WHERE run_id = ?",
+                (run_id, run_id),
+            )
+        return added
+
+    def runnable(self, run_id: str, retry_failed: bool = False) -> List[Tuple[str, Dict[str, Any], int]]:
+        """(input_key, input, attempts so far) of the tasks still to run, in input order."""
+        statuses = (PENDING, RUNNING, FAILED) if retry_failed else (PENDING, RUNNING)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT input_key, input, attempts FROM tasks WHERE run_id = ?"
+                f" AND status IN ({', '.join('?' * len(statuses))}) ORDER BY position",
+                (run_id, *statuses),
+            ).fetchall()
+        return [(row["input_key"], json.loads(row["input"]), row["attempts"]) for row in rows]
+
+    def write(self, updates: Iterable[Tuple]) -> None:
+        """
+        Apply task updates in one transaction. Each update is
+        (status, attempts, output, error, prompt_tokens, completion_tokens,
+        started_at, finished_at, processing_time, run_id, input_key); None
+        keeps the stored output, error and times.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE tasks SET status = ?, attempts = ?, output = COALESCE(?, output), error = ?,"
+                " prompt_tokens = ?, completion_tokens = ?, started_at = COALESCE(?, started_at),"
+                " finished_at = ?, processing_time = ? WHERE run_id = ? AND input_key = ?",
+                updates,
+            )
+
+    def progress(self, run_id: str) -> Dict[str, int]:
+        """Number of tasks by status."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) AS tasks FROM tasks WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({row["status"]: row["tasks"] for row in rows})
+        return counts
+
+    def results(self, run_id: str) -> List[Dict[str, Any]]:
+        """All tasks of a run, in input order, with input and output decoded."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM tasks WHERE run_id = ? ORDER BY position", (run_id,)
+            ).fetchall()
+        tasks = []
+        for row in rows:
+            task = dict(row)
+            task["input"] = json.loads(task["input"])
+            task["output"] = json.loads(task["output"]) if task["output"] is not None else None
+            tasks.append(task)
+        return tasks
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class BatchRunner:
+    """
+    Runs a DSPy module over the inputs of a run with bounded concurrency.
+
+    Args:
+        module: A dspy.Module (or any callable taking the input fields as keyword arguments)
+        store: Where tasks and results are kept
+        concurrency: Number of module calls in flight at once
+        max_attempts: Tries per input before it is marked failed, counted
+            anew each time a run is resumed
+        base_delay: Backoff before the second try, doubled for each further one
+        max_delay: Longest backoff
+        retry_on: Exceptions that are retried; others fail the input at once
+        batch_size: Updates after which the writer stores them without waiting
+        flush_interval: Seconds the writer waits for more updates
+        input_field: Keyword argument a string input is passed as
+    """
+
+    def __init__(
+        self,
+        module: Any,
+        store: BatchStore,
+        concurrency: int = 8,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        input_field: str = "question",
+    ) -> None:
+        self.module = module
+        self.store = store
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.input_field = input_field
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _call(self, kwargs: Dict[str, Any]) -> Any:
+        acall = getattr(self.module, "acall", None)
+        if acall is not None:
+            return await acall(**kwargs)
+        if inspect.iscoroutinefunction(self.module) or inspect.iscoroutinefunction(getattr(self.module, "__call__", None)):
+            return await self.module(**kwargs)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="dspy-batch")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, lambda: self.module(**kwargs))
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after failed try number `attempt`: exponential, with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def _process(self, run_id: str, key: str, kwargs: Dict[str, Any], attempts: int, updates: asyncio.Queue) -> str:
+        """Run one input; `attempts` is its stored total of tries, kept up to date."""
+        started_at = time.time()
+        await updates.put((RUNNING, attempts, None, None, 0, 0, started_at, None, None, run_id, key))
+        tries = 0
+        while True:
+            tries += 1
+            attempts += 1
+            try:
+                prediction = await self._call(kwargs)
+            except self.retry_on as error:
+                if tries >= self.max_attempts:
+                    finished_at = time.time()
+                    await updates.put((FAILED, attempts, None, f"{type(error).__name__}: {error}", 0, 0,
+                                       started_at, finished_at, finished_at - started_at, run_id, key))
+                    return FAILED
+                await asyncio.sleep(self.backoff(tries))
+                continue
+            except Exception as error:
+                finished_at = time.time()
+                await updates.put((FAILED, attempts, None, f"{type(error).__name__}: {error}", 0, 0,
+                                   started_at, finished_at, finished_at - started_at, run_id, key))
+                return FAILED
+            finished_at = time.time()
+            prompt_tokens, completion_tokens = _usage(prediction)
+            await updates.put((DONE, attempts, json.dumps(_output(prediction), default=str), None,
+                               prompt_tokens, completion_tokens, started_at, finished_at,
+                               finished_at - started_at, run_id, key))
+            return DONE
+
+    async def _write(self, updates: asyncio.Queue) -> None:
+        """Store queued updates in batches until a None arrives."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    update = await asyncio.wait_for(updates.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if update is None:
+                    stopping = True
+                    break
+                batch.append(update)
+            if batch:
+                await asyncio.to_thread(self.store.write, batch)
+
+    async def run(self, inputs: Iterable[Input], run_id: Optional[str] = None, retry_failed: bool = False) -> Dict[str, Any]:
+        """
+        Run the module over `inputs` as run `run_id` (a new one if None), or
+        resume that run, which also runs the tasks of earlier calls that are
+        not done. Returns the run id, how many inputs were added, and how many
+        tasks of the run were skipped as done, completed and failed.
+        """
+        run_id = run_id or time.strftime("run-%Y%m%d-%H%M%S")
+        inputs = [{self.input_field: item} if isinstance(item, str) else dict(item) for item in inputs]
+        start = time.perf_counter()
+        added = await asyncio.to_thread(self.store.add_tasks, run_id, inputs)
+        tasks = await asyncio.to_thread(self.store.runnable, run_id, retry_failed)
+        # Every task of the run is resumed, including ones not in `inputs`
+        skipped = (await asyncio.to_thread(self.store.progress, run_id))[DONE]
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for task in tasks:
+            pending.put_nowait(task)
+        # Bounded, so a slow disk slows the workers down instead of piling up updates
+        updates: asyncio.Queue = asyncio.Queue(maxsize=4 * self.batch_size)
+        counts = {DONE: 0, FAILED: 0}
+
+        async def work() -> None:
+            while True:
+                try:
+                    key, kwargs, attempts = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                counts[await self._process(run_id, key, kwargs, attempts, updates)] += 1
+
+        writer = asyncio.create_task(self._write(updates))
+        try:
+            await asyncio.gather(*(work() for _ in range(min(self.concurrency, len(tasks)))))
+        finally:
+            # Store what finished, also when the run is cancelled or a worker fails
+            await updates.put(None)
+            await writer
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        return {
+            "run_id": run_id,
+            "added": added,
+            "skipped": skipped,
+            "done": counts[DONE],
+            "failed": counts[FAILED],
+            "elapsed": time.perf_counter() - start,
+        }
@@ -0,0 +1,130 @@
+"""
+Load test for the ReAct agent loop of the Chainlit apps, with MockReActLLM
+standing in for OpenAI(model="gpt-4").
+
+Usage:
+    python load_test_react_agent.py [--sessions 200] [--latency 0.5] [--trace spans.jsonl]
+
+Every simulated session asks one arithmetic question, which takes two agent
+steps (tool call, then answer). Two ways of driving the agent are compared:
+
+    make_async   create_task/run_step/finalize_response wrapped in
+                 cl.make_async, as the apps did before; each step occupies a
+                 worker thread for the duration of the LLM call
+    async        iter_agent_steps/afinalize_response on the event loop
+
+With --trace the steps of the async sessions are traced with StepTracer and
+their spans written to the given JSONL file, and the mean time per step is
+broken down into LLM, tools and the rest (event loop contention).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from chainlit import make_async
+from llama_index.core.agent import AgentRunner, ReActAgentWorker
+from llama_index.core.tools import FunctionTool
+
+from mock_llm import MockReActLLM
+from react_agent import hide_deprecation_warnings, iter_agent_steps
+from react_tracing import JsonlSpanSink, StepTracer
+
+# AgentRunner/ReActAgentWorker warn about their deprecation on every construction
+hide_deprecation_warnings()
+
+
+def add(a: int, b: int) -> int:
+    """Adds two integers and returns the result integer"""
+    return a + b
+
+
+def multiply(a: int, b: int) -> int:
+    """Multiplies two integers and returns the result integer"""
+    return a * b
+
+
+class StepTraceList(list):
+    """Sink keeping the traced steps, for the summary."""
+
+    def write(self, step_trace):
+        self.append(step_trace)
+
+
+def make_agent_runner(llm):
+    tools = [FunctionTool.from_defaults(fn=add), FunctionTool.from_defaults(fn=multiply)]
+    return AgentRunner(agent_worker=ReActAgentWorker.from_tools(tools, llm=llm))
+
+
+async def session_make_async(agent_runner, question):
+    task = await make_async(agent_runner.create_task)(question)
+    is_done = False
+    while not is_done:
+        step_output = await make_async(agent_runner.run_step)(task.task_id)
+        is_done = step_output.is_last
+    return str(await make_async(agent_runner.finalize_response)(task.task_id))
+
+
+async def session_async(agent_runner, question, step_tracer=None):
+    task = agent_runner.create_task(question)
+    task_trace = step_tracer.trace_task(task) if step_tracer is not None else None
+    async for step in iter_agent_steps(agent_runner, task, task_trace):
+        if step.tokens is not None:
+            async for _ in step.tokens:
+                pass
+    return str(await agent_runner.afinalize_response(task.task_id))
+
+
+async def run(mode, sessions, llm, step_tracer=None):
+    latencies = []
+
+    async def one(i):
+        agent_runner = make_agent_runner(llm)
+        start = time.perf_counter()
+        if mode == "make_async":
+            answer = await session_make_async(agent_runner, f"What is {i} times 3?")
+        else:
+            answer = await session_async(agent_runner, f"What is {i} times 3?", step_tracer)
+        latencies.append(time.perf_counter() - start)
+        assert answer.endswith(f"{i * 3}."), answer
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock LLM latency per call in seconds")
+    parser.add_argument("--trace", help="JSONL file for the spans of the async sessions")
+    args = parser.parse_args()
+
+    llm = MockReActLLM(latency=args.latency)
+    step_traces = StepTraceList()
+    step_tracer = None
+    if args.trace:
+        step_tracer = StepTracer(JsonlSpanSink(args.trace), step_traces)
+        llm.callback_manager.add_handler(step_tracer)
+
+    print(f"{args.sessions} concurrent sessions, {args.latency:.2f} s per LLM call, 2 calls per session")
+    for mode in ("make_async", "async"):
+        elapsed, latencies = asyncio.run(run(mode, args.sessions, llm, step_tracer if mode == "async" else None))
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(
+            f"{mode:10}: total {elapsed:6.2f} s, session latency "
+            f"p50 {statistics.median(latencies):6.2f} s, p95 {p95:6.2f} s, max {latencies[-1]:6.2f} s"
+        )
+
+    if step_traces:
+        wall = statistics.mean(t.wall_time for t in step_traces)
+        llm_seconds = statistics.mean(t.llm_seconds for t in step_traces)
+        tool_seconds = statistics.mean(t.tool_seconds for t in step_traces)
+        print(
+            f"{len(step_traces)} traced steps: mean {wall:.3f} s, LLM {llm_seconds:.3f} s, "
+            f"tools {tool_seconds:.3f} s, other {wall - llm_seconds - tool_seconds:.3f} s; spans in {args.trace}"
+        )
+
+
+if __name__ == '__main__':
+    main()
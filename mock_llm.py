@@ -0,0 +1,161 @@
+"""
+Mock LLM standing in for OpenAI(model="gpt-4") in load tests of the ReAct
+Chainlit apps.
+
+MockReActLLM answers in the ReAct format the agent worker parses: arithmetic
+questions ("What is 3 times 4?") get an add/multiply action, and once all
+observations are available it answers with them. A question with several
+calculations ("What is 1 plus 2, 3 times 4 and 5 plus 6?") gets one action per
+step, or all of them in one step with `parallel_actions`. Latency is simulated per call
+and per streamed token; the async methods sleep on the event loop while the
+sync ones block the calling thread, like the OpenAI client does.
+"""
+import asyncio
+import json
+import re
+import time
+from typing import Any, Sequence
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseGen,
+    LLMMetadata,
+    MessageRole,
+)
+from llama_index.core.llms import CustomLLM
+from llama_index.core.llms.callbacks import llm_chat_callback, llm_completion_callback
+
+_NUMBER_PATTERN = re.compile(r"-?\d+")
+_MULTIPLY_PATTERN = re.compile(r"\b(times|multipl\w*|product)\b|\*", re.IGNORECASE)
+_CLAUSE_PATTERN = re.compile(r"[,;]|\band\b", re.IGNORECASE)
+# "2. multiply: " in observations merged by ParallelReActAgentWorker
+_OBSERVATION_LINE_PATTERN = re.compile(r"^\d+\. \w+: ")
+
+
+class MockReActLLM(CustomLLM):
+    model: str = "mock-react"
+    temperature: float = 0.0
+    latency: float = 0.5
+    token_latency: float = 0.0
+    # Request all calculations of a question in one step, for ParallelReActAgentWorker
+    parallel_actions: bool = False
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name=self.model, is_chat_model=True)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "mock_react_llm"
+
+    def respond(self, messages: Sequence[ChatMessage]) -> str:
+        """ReAct formatted reply to a chat, without any latency."""
+        question_index = next(
+            (
+                i for i in range(len(messages) - 1, -1, -1)
+                if messages[i].role == MessageRole.USER
+                and not (messages[i].content or "").startswith("Observation:")
+            ),
+            None,
+        )
+        question = (messages[question_index].content or "") if question_index is not None else ""
+        results = []
+        for message in messages[question_index + 1:] if question_index is not None else []:
+            content = message.content or ""
+            if content.startswith("Observation:"):
+                for line in content[len("Observation:"):].strip().splitlines():
+                    results.append(_OBSERVATION_LINE_PATTERN.sub("", line.strip()))
+
+        calls = self._calls(question)
+        if not calls:
+            return "Thought: I can answer without using any tools.\nAnswer: Please ask me to add or multiply two numbers."
+        if len(results) >= len(calls):
+            if len(results) == 1:
+                answer = f"The result is {results[0]}."
+            else:
+                answer = f"The results are {', '.join(results[:-1])} and {results[-1]}."
+            return f"Thought: I can answer without using any more tools.\nAnswer: {answer}"
+
+        # All remaining calls at once, or the next one
+        pending = calls[len(results):] if self.parallel_actions else calls[len(results):len(results) + 1]
+        lines = ["Thought: I need to use a tool to help me answer the question."]
+        for tool, a, b in pending:
+            lines.append(f"Action: {tool}")
+            lines.append(f"Action Input: {json.dumps({'a': a, 'b': b})}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _calls(question: str) -> list[tuple[str, int, int]]:
+        """(tool, a, b) for each calculation asked for in a question."""
+        clauses = _CLAUSE_PATTERN.split(question)
+        if not any(len(_NUMBER_PATTERN.findall(clause)) >= 2 for clause in clauses):
+            # e.g. "add 3 and 4"
+            clauses = [question]
+        calls = []
+        for clause in clauses:
+            numbers = [int(n) for n in _NUMBER_PATTERN.findall(clause)]
+            if len(numbers) >= 2:
+                tool = "multiply" if _MULTIPLY_PATTERN.search(clause) else "add"
+                calls.append((tool, numbers[0], numbers[1]))
+        return calls
+
+    @staticmethod
+    def _tokens(text: str) -> list[str]:
+        return re.findall(r"\S+\s*|\s+", text)
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        time.sleep(self.latency)
+        text = self.respond(messages)
+        return ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=text))
+
+    @llm_chat_callback()
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        await asyncio.sleep(self.latency)
+        text = self.respond(messages)
+        return ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=text))
+
+    @llm_chat_callback()
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        text = self.respond(messages)
+
+        def gen() -> ChatResponseGen:
+            time.sleep(self.latency)
+            content = ""
+            for token in self._tokens(text):
+                time.sleep(self.token_latency)
+                content += token
+                yield ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=content), delta=token)
+
+        return gen()
+
+    @llm_chat_callback()
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        text = self.respond(messages)
+
+        async def gen() -> ChatResponseAsyncGen:
+            await asyncio.sleep(self.latency)
+            content = ""
+            for token in self._tokens(text):
+                await asyncio.sleep(self.token_latency)
+                content += token
+                yield ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=content), delta=token)
+
+        return gen()
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        response = self.chat([ChatMessage(role=MessageRole.USER, content=prompt)])
+        return CompletionResponse(text=response.message.content)
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        def gen() -> CompletionResponseGen:
+            for response in self.stream_chat([ChatMessage(role=MessageRole.USER, content=prompt)]):
+                yield CompletionResponse(text=response.message.content, delta=response.delta)
+
+        return gen()
@@ -0,0 +1,107 @@
+"""
+Benchmark of the historical-table callback, native vs custom DataTable mode.
+
+Usage:
+    python bench_historical_table.py [--rows 1000 10000 100000] [--repeat 20]
+
+For each history size, the same filter is served the way filter_table did
+before (the whole filtered table as records, paged/sorted/filtered in the
+browser) and the way it does now (HistoricalSnapshot.query returning one
+sorted page). Reported are the JSON payload per callback and the callback
+latency. The custom results are checked against pandas.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from historical_data import HistoricalSnapshot
+
+COMPANIES = [
+    "Apple Inc.", "Microsoft Corp.", "Amazon.com Inc.", "Alphabet Inc.", "Tesla Inc.",
+    "Meta Platforms Inc.", "Nvidia Corp.", "Berkshire Hathaway Inc.", "JPMorgan Chase & Co.",
+    "Johnson & Johnson", "Walmart Inc.", "Visa Inc.", "Procter & Gamble Co.",
+]
+RESEARCHERS = ["John Smith", "Emily Johnson", "Michael Brown", "Sarah Davis", "James Wilson"]
+STATUSES = ["Completed", "Failed", "Cancelled"]
+
+FILTER_QUERY = '{company} contains "inc" && {insights} >= 8'
+SORT_BY = [{"column_id": "status", "direction": "asc"}, {"column_id": "duration_mins", "direction": "desc"}]
+PAGE_SIZE = 15
+
+
+def historical_runs(n):
+    """Research runs shaped like generate_historical_data in pages/historical_records.py."""
+    rng = np.random.default_rng(42)
+    dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, size=n), unit="min")
+    df = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "date": dates.strftime("%Y-%m-%d %H:%M"),
+        "company": rng.choice(COMPANIES, size=n),
+        "researcher": rng.choice(RESEARCHERS, size=n),
+        "duration_mins": rng.uniform(1, 15, size=n).round(2),
+        "status": rng.choice(STATUSES, size=n, p=[0.8, 0.1, 0.1]),
+        "insights": rng.integers(3, 15, size=n),
+    })
+    return df.sort_values("id", ascending=False)
+
+
+def native_callback(df):
+    """The old filter_table: every matching row goes to the browser."""
+    filtered = df[df["company"].str.contains("inc", case=False, regex=False)]
+    filtered = filtered[filtered["status"] != "Failed"]
+    return filtered.to_dict("records")
+
+
+def custom_callback(snapshot, page_current):
+    mask = snapshot.filter_mask("inc") & ~snapshot.status_mask("Failed")
+    records, total = snapshot.query(mask, FILTER_QUERY, SORT_BY, page_current, PAGE_SIZE)
+    return {"data": records, "page_count": -(-total // PAGE_SIZE)}
+
+
+def expected_page(df, page_current):
+    """The same page computed with pandas."""
+    filtered = df[
+        df["company"].str.lower().str.contains("inc", regex=False)
+        & (df["status"] != "Failed")
+        & (df["insights"] >= 8)
+    ]
+    filtered = filtered.sort_values(["status", "duration_mins"], ascending=[True, False], kind="stable")
+    start = page_current * PAGE_SIZE
+    return filtered.iloc[start:start + PAGE_SIZE].to_dict("records")
+
+
+def timed(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append(time.perf_counter() - start)
+    return result, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for n in args.rows:
+        df = historical_runs(n)
+        snapshot = HistoricalSnapshot(df)
+        page_current = 3
+        assert custom_callback(snapshot, page_current)["data"] == expected_page(df, page_current)
+
+        native, native_latency = timed(lambda: native_callback(df), args.repeat)
+        custom, custom_latency = timed(lambda: custom_callback(snapshot, page_current), args.repeat)
+        print(
+            f"{n:7} rows: native {len(json.dumps(native)) / 1024:9.1f} KiB, {native_latency * 1e3:7.2f} ms | "
+            f"custom {len(json.dumps(custom)) / 1024:5.1f} KiB, {custom_latency * 1e3:6.2f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of the data behind the Home page stat cards and graph.
+
+Usage:
+    python bench_home_metrics.py [--years 1 5 20] [--repeat 50]
+
+Compared per history length are what update_graph and create_stat_cards
+computed before (the daily frame, string month keys and a groupby per
+callback) and MetricsRollup, which keeps the aggregates as runs are
+recorded. Reported are the median times of a dropdown change, of the stat
+cards, and of recording one run. Plotly figures are not built here.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from metrics_rollup import MetricsRollup
+
+
+def daily_data(years):
+    dates = pd.date_range(start='2023-01-01', periods=365 * years, freq='D')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'date': dates,
+        'research_runs': rng.integers(5, 30, size=len(dates)),
+        'success_rate': rng.uniform(0.7, 0.95, size=len(dates)),
+        'avg_duration': rng.uniform(2, 10, size=len(dates)),
+    })
+
+
+def groupby_monthly(df):
+    df = df.copy()
+    df['month'] = df['date'].dt.strftime('%Y-%m')
+    return df.groupby('month').mean().reset_index()
+
+
+def groupby_totals(df):
+    return df['research_runs'].sum(), df['success_rate'].mean(), df['avg_duration'].mean()
+
+
+def timed(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for years in args.years:
+        df = daily_data(years)
+        metrics_rollup = MetricsRollup(start='2023-01-01')
+        metrics_rollup.load_daily(df)
+
+        monthly = metrics_rollup.monthly_frame()
+        expected = groupby_monthly(df)
+        assert list(monthly['month']) == list(expected['month'])
+        assert np.allclose(monthly[['research_runs', 'success_rate', 'avg_duration']], expected[['research_runs', 'success_rate', 'avg_duration']])
+
+        last_day = df['date'].iloc[-1]
+        # A run lands between dropdown changes, so the monthly frame is rebuilt each time
+        def rollup_graph():
+            metrics_rollup.record_run(last_day, True, 5.0)
+            metrics_rollup.monthly_frame()
+
+        print(
+            f"{years:3} years: graph groupby {timed(lambda: groupby_monthly(df), args.repeat):6.2f} ms, "
+            f"rollup {timed(metrics_rollup.monthly_frame, args.repeat):6.3f} ms cached, "
+            f"{timed(rollup_graph, args.repeat):6.3f} ms after a run | "
+            f"cards {timed(lambda: groupby_totals(df), args.repeat):6.3f} ms vs "
+            f"{timed(metrics_rollup.totals, args.repeat):6.4f} ms | "
+            f"record_run {timed(lambda: metrics_rollup.record_run(last_day, False, 3.0), args.repeat):6.4f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark of the research step DAG and step cache of research_jobs.py.
+
+Usage:
+    python bench_research_dag.py [--companies 8] [--scale 0.1]
+
+Each of `--companies` companies is researched with the steps of
+pages/researcher.py (durations times `--scale`), first as a chain where
+every step waits for the one before, then with the dependencies of the
+page, where the three analyses run concurrently, and then again the same
+day with the step cache filled. Reported is the time from submit until
+the job is done.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from research_jobs import DONE, JobRunner, JobStore, StepCache
+
+STEPS = [
+    ("Initializing research workflow", 1, []),
+    ("Gathering market data", 2, ["Initializing research workflow"]),
+    ("Analyzing financial performance", 3, ["Initializing research workflow"]),
+    ("Conducting competitive analysis", 2, ["Initializing research workflow"]),
+    ("Generating insights", 2, ["Gathering market data", "Analyzing financial performance", "Conducting competitive analysis"]),
+]
+
+
+def make_steps(scale, chain):
+    def step(name, seconds):
+        def run(company_name, result):
+            time.sleep(seconds * scale)
+            return {name: f"{company_name}: {seconds} s of research"}
+        return run
+    return [
+        (name, step(name, seconds), ([STEPS[i - 1][0]] if i else []) if chain else after)
+        for i, (name, seconds, after) in enumerate(STEPS)
+    ]
+
+
+def research(runner, companies):
+    latencies = []
+    for company in companies:
+        start = time.perf_counter()
+        job_id = runner.submit(company)
+        while runner.store.get(job_id)["status"] != DONE:
+            time.sleep(0.005)
+        latencies.append(time.perf_counter() - start)
+        assert len(runner.store.get(job_id)["result"]) == len(STEPS)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=8)
+    parser.add_argument("--scale", type=float, default=0.1, help="Factor on the step durations of the page")
+    args = parser.parse_args()
+    companies = [f"Company {i}" for i in range(args.companies)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = JobStore(os.path.join(directory, "research_jobs.db"))
+        cache = StepCache(os.path.join(directory, "research_cache.db"))
+        for name, runner, run_companies in (
+            ("chain", JobRunner(store, make_steps(args.scale, chain=True), workers=4, poll_interval=0.05), companies),
+            ("dag", JobRunner(store, make_steps(args.scale, chain=False), workers=4, cache=cache, poll_interval=0.05), companies),
+            # Same day, differently typed names
+            ("cached", JobRunner(store, make_steps(args.scale, chain=False), workers=4, cache=cache, poll_interval=0.05),
+             [company.upper() for company in companies]),
+        ):
+            print(f"{name:6}: research p50 {research(runner, run_companies) * 1e3:8.1f} ms")
+            runner.stop()
+        cache.close()
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
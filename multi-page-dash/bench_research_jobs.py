@@ -0,0 +1,121 @@
+"""
+Load test of the Researcher page callbacks, blocking vs background jobs.
+
+Usage:
+    python bench_research_jobs.py [--researches 48] [--server-threads 4] [--workers 16] [--scale 0.05]
+
+A ThreadPoolExecutor with `--server-threads` threads stands in for the Dash
+server. `--researches` searches arrive at once; in blocking mode each one
+runs the research steps inside its callback, as start_research did, and
+with jobs the callback only submits to a JobRunner with `--workers`
+threads while the page polls every 0.1 s. Step durations are those of
+pages/researcher.py times `--scale`. Reported are the time until all
+researches are done and the latency of an unrelated callback meanwhile.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from research_jobs import DONE, JobRunner, JobStore
+
+STEP_SECONDS = [1, 2, 3, 2, 2]
+
+
+def make_steps(scale):
+    def step(seconds):
+        def run(company_name, result):
+            time.sleep(seconds * scale)
+            return {}
+        return run
+    return [
+        (f"step {i}", step(seconds), [f"step {i - 1}"] if i else [])
+        for i, seconds in enumerate(STEP_SECONDS)
+    ]
+
+
+def probe_latencies(server, stop):
+    """Latency of a trivial callback (such as a Home page dropdown) while researches run."""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        server.submit(lambda: None).result()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.05)
+    return latencies
+
+
+def blocking(args, steps):
+    def start_research(company_name):
+        result = {}
+        for name, fn, after in steps:
+            result.update(fn(company_name, result))
+        return result
+
+    with ThreadPoolExecutor(args.server_threads) as server:
+        return measure(server, lambda: [
+            future.result() for future in
+            [server.submit(start_research, f"Company {i}") for i in range(args.researches)]
+        ])
+
+
+def with_jobs(args, steps, path):
+    runner = JobRunner(JobStore(path), steps, workers=args.workers, poll_interval=0.1)
+
+    def wait_for(server, job_ids):
+        pending = set(job_ids)
+        while pending:
+            time.sleep(0.1)
+            # One poll callback per open page
+            polls = {job_id: server.submit(runner.store.get, job_id) for job_id in pending}
+            pending = {job_id for job_id, poll in polls.items() if poll.result()["status"] != DONE}
+
+    with ThreadPoolExecutor(args.server_threads) as server:
+        elapsed, latencies = measure(server, lambda: wait_for(server, [
+            future.result() for future in
+            [server.submit(runner.submit, f"Company {i}") for i in range(args.researches)]
+        ]))
+    runner.stop()
+    runner.store.close()
+    return elapsed, latencies
+
+
+def measure(server, run):
+    stop = threading.Event()
+    latencies = []
+    probe = threading.Thread(target=lambda: latencies.extend(probe_latencies(server, stop)))
+    start = time.perf_counter()
+    probe.start()
+    run()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    probe.join()
+    return elapsed, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--researches", type=int, default=48)
+    parser.add_argument("--server-threads", type=int, default=4, help="Threads serving Dash callbacks")
+    parser.add_argument("--workers", type=int, default=16, help="JobRunner worker threads")
+    parser.add_argument("--scale", type=float, default=0.05, help="Factor on the step durations of the page")
+    args = parser.parse_args()
+    steps = make_steps(args.scale)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, run in (
+            ("blocking", lambda: blocking(args, steps)),
+            ("jobs", lambda: with_jobs(args, steps, os.path.join(directory, "research_jobs.db"))),
+        ):
+            elapsed, latencies = run()
+            print(
+                f"{name:8}: {args.researches} researches done in {elapsed:6.2f} s, other callbacks "
+                f"p50 {statistics.median(latencies) * 1e3:7.1f} ms, max {latencies[-1] * 1e3:7.1f} ms"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+# historical_data.py - Cached, indexed data layer for the historical records page
+import operator
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+CATEGORY_COLUMNS = ["company", "researcher", "status"]
+
+# One condition of a DataTable filter_query, e.g. {company} contains "Apple" or {insights} >= 10
+FILTER_EXPRESSION = re.compile(
+    r"^\s*\{(?P<column>[^}]+)\}\s*"
+    r"(?P<operator>>=|<=|!=|<|>|=|(?:eq|ne|lt|le|gt|ge|contains|datestartswith)(?=\s))"
+    r"\s*(?P<value>.*?)\s*$",
+    re.DOTALL,
+)
+OPERATOR_ALIASES = {">=": "ge", "<=": "le", "!=": "ne", "<": "lt", ">": "gt", "=": "eq"}
+COMPARISONS = {
+    "eq": operator.eq, "ne": operator.ne,
+    "lt": operator.lt, "le": operator.le,
+    "gt": operator.gt, "ge": operator.ge,
+}
+
+
+def parse_filter_query(filter_query):
+    """
+    Split a DataTable `filter_query` into (column, operator, value) conditions.
+
+    Operators are normalised to eq/ne/lt/le/gt/ge/contains/datestartswith and
+    quotes are removed from the values. Conditions of other kinds (such as
+    "is blank") are skipped.
+    """
+    conditions = []
+    for part in (filter_query or "").split(" && "):
+        match = FILTER_EXPRESSION.match(part)
+        if not match:
+            continue
+        value = match["value"]
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"`":
+            value = value[1:-1].replace("\\" + value[0], value[0])
+        op = match["operator"]
+        conditions.append((match["column"], OPERATOR_ALIASES.get(op, op), value))
+    return conditions
+
+
+def _text_matches(text, op, value):
+    if op == "contains":
+        return value.lower() in text.lower()
+    if op == "datestartswith":
+        return text.startswith(value)
+    return COMPARISONS[op](text, value)
+
+
+def _text_mask(texts, op, value):
+    if op == "contains":
+        return np.char.find(np.char.lower(texts), value.lower()) >= 0
+    return np.char.startswith(texts, value)
+
+
+class HistoricalSnapshot:
+    """
+    One load of the research runs, prepared for filtering.
+
+    `frame` has `date` as datetime64 (to the minute, as displayed) and the
+    company, researcher and status columns as categoricals. The table rows
+    are built once in `records`, so a filter only selects among them, and
+    the lowercase company names are kept per category, so a company search
+    tests each distinct name once instead of every row.
+
+    `query` serves the DataTable in custom paging/sorting/filtering mode: it
+    returns one page of rows, using sort orders computed once per snapshot.
+    """
+
+    def __init__(self, df, loaded_at=None):
+        frame = df.copy()
+        frame["date"] = pd.to_datetime(frame["date"]).dt.floor("min")
+        for column in CATEGORY_COLUMNS:
+            frame[column] = frame[column].astype("category")
+        self.frame = frame.reset_index(drop=True)
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+
+        self.dates = self.frame["date"].to_numpy()
+        self.company_codes = self.frame["company"].cat.codes.to_numpy()
+        self.company_keys = [str(name).lower() for name in self.frame["company"].cat.categories]
+        self.status_categories = list(self.frame["status"].cat.categories)
+        self.status_codes = self.frame["status"].cat.codes.to_numpy()
+        self._orders = {}
+
+        display = self.frame.copy()
+        display["date"] = display["date"].dt.strftime(DATE_FORMAT)
+        for column in CATEGORY_COLUMNS:
+            display[column] = display[column].astype(str)
+        self.records = display.to_dict("records")
+        self.date_strings = display["date"].to_numpy(dtype=str)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def company_mask(self, company):
+        """Rows whose company contains `company`, ignoring case."""
+        query = company.lower()
+        matching = [code for code, key in enumerate(self.company_keys) if query in key]
+        return np.isin(self.company_codes, matching)
+
+    def status_mask(self, status):
+        if status not in self.status_categories:
+            return np.zeros(len(self), dtype=bool)
+        return self.status_codes == self.status_categories.index(status)
+
+    def filter_mask(self, company=None, status="all", start_date=None, end_date=None):
+        """Boolean mask of the rows passing the filters of the page."""
+        mask = np.ones(len(self), dtype=bool)
+        if company:
+            mask &= self.company_mask(company)
+        if status and status != "all":
+            mask &= self.status_mask(status)
+        if start_date:
+            mask &= self.dates >= np.datetime64(pd.to_datetime(start_date))
+        if end_date:
+            mask &= self.dates <= np.datetime64(pd.to_datetime(end_date))
+        return mask
+
+    def select_records(self, mask):
+        return [self.records[i] for i in np.flatnonzero(mask)]
+
+    def condition_mask(self, column, op, value):
+        """Boolean mask of the rows passing one parse_filter_query condition."""
+        if column not in self.frame.columns:
+            return np.ones(len(self), dtype=bool)
+        series = self.frame[column]
+        if column in CATEGORY_COLUMNS:
+            # Test each category once and spread the result over the rows
+            hits = [_text_matches(str(name), op, value) for name in series.cat.categories]
+            return np.array(hits, dtype=bool)[series.cat.codes.to_numpy()]
+        if column == "date":
+            if op in ("contains", "datestartswith"):
+                return _text_mask(self.date_strings, op, value)
+            try:
+                bound = np.datetime64(pd.to_datetime(value))
+            except (ValueError, TypeError):
+                return np.zeros(len(self), dtype=bool)
+            return COMPARISONS[op](self.dates, bound)
+        values = series.to_numpy()
+        if op in ("contains", "datestartswith"):
+            return _text_mask(values.astype(str), op, value)
+        try:
+            number = float(value)
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        return COMPARISONS[op](values, number)
+
+    def sort_key(self, column):
+        if column in CATEGORY_COLUMNS:
+            # Categories of strings are sorted, so their codes sort like the names
+            return self.frame[column].cat.codes.to_numpy().astype("int64")
+        if column == "date":
+            return self.dates.view("int64")
+        return self.frame[column].to_numpy()
+
+    def order(self, column, descending=False):
+        """Row positions sorted by `column`, computed once per snapshot."""
+        key = (column, descending)
+        if key not in self._orders:
+            values = self.sort_key(column)
+            self._orders[key] = np.argsort(-values if descending else values, kind="stable")
+        return self._orders[key]
+
+    def query(self, mask, filter_query=None, sort_by=None, page_current=0, page_size=15):
+        """
+        The rows of one table page and the number of rows passing the filters.
+
+        `mask` comes from filter_mask; `filter_query` and `sort_by` are the
+        DataTable properties of the same names.
+        """
+        for column, op, value in parse_filter_query(filter_query):
+            mask = mask & self.condition_mask(column, op, value)
+        sort_by = [sort for sort in sort_by or [] if sort["column_id"] in self.frame.columns]
+        if not sort_by:
+            rows = np.flatnonzero(mask)
+        elif len(sort_by) == 1:
+            order = self.order(sort_by[0]["column_id"], sort_by[0]["direction"] == "desc")
+            rows = order[mask[order]]
+        else:
+            rows = np.flatnonzero(mask)
+            # np.lexsort sorts by the last key first
+            keys = []
+            for sort in reversed(sort_by):
+                values = self.sort_key(sort["column_id"])[rows]
+                keys.append(-values if sort["direction"] == "desc" else values)
+            rows = rows[np.lexsort(keys)]
+        start = page_current * page_size
+        return [self.records[i] for i in rows[start:start + page_size]], len(rows)
+
+
+class HistoricalDataCache:
+    """
+    Process-level HistoricalSnapshot, shared by all callbacks.
+
+    The snapshot is reloaded with `loader` (returning a DataFrame) once it is
+    older than `ttl` seconds, or when `invalidate()` is called, e.g. when a
+    research run finishes. `version`, if given, is a cheap callable returning
+    a change token (such as the latest run id in the database); when it
+    changes the snapshot is reloaded before its TTL. While one thread
+    reloads, the others keep using the previous snapshot.
+    """
+
+    def __init__(self, loader, ttl=60.0, version=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.version = version
+        self._snapshot = None
+        self._snapshot_version = None
+        self._stale = False
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._stale = True
+
+    def _needs_reload(self, snapshot):
+        if snapshot is None or self._stale:
+            return True
+        if self.ttl is not None and time.time() - snapshot.loaded_at >= self.ttl:
+            return True
+        return self.version is not None and self.version() != self._snapshot_version
+
+    def _reload(self):
+        self._stale = False
+        version = self.version() if self.version is not None else None
+        self._snapshot = HistoricalSnapshot(self.loader())
+        self._snapshot_version = version
+
+    def get(self):
+        snapshot = self._snapshot
+        if not self._needs_reload(snapshot):
+            return snapshot
+        if snapshot is None:
+            # Nothing to serve yet, so wait for the first load
+            with self._lock:
+                if self._snapshot is None:
+                    self._reload()
+            return self._snapshot
+        if self._lock.acquire(blocking=False):
+            try:
+                if self._needs_reload(self._snapshot):
+                    self._reload()
+            finally:
+                self._lock.release()
+        return self._snapshot
@@ -0,0 +1,146 @@
+# metrics_rollup.py - Incrementally maintained daily/monthly research metrics for the Home page
+import threading
+
+import numpy as np
+import pandas as pd
+
+METRICS = ["research_runs", "success_rate", "avg_duration"]
+
+
+class MetricsRollup:
+    """
+    Daily and monthly aggregates of research runs, updated as runs land.
+
+    Days are kept as numpy columns indexed by the number of days since
+    `start`: runs, successes and total duration. Per month and in total the
+    rollup keeps the number of days with runs and the sums of the daily runs,
+    success rates and average durations, so a new run changes one day, one
+    month and the totals in constant time. Averages are means of the daily
+    values over the days with runs, as the Home page always showed them.
+
+    `version` changes with every update, for memoizing what is built from
+    the rollup.
+    """
+
+    def __init__(self, start, capacity_days=366):
+        self.start = np.datetime64(start, "D")
+        self.version = 0
+        self._lock = threading.Lock()
+        self._monthly_frame = None
+
+        self.day_runs = np.zeros(capacity_days, dtype=np.int64)
+        self.day_successes = np.zeros(capacity_days)
+        self.day_duration = np.zeros(capacity_days)
+        self.last_day = -1
+
+        capacity_months = capacity_days // 28 + 2
+        self.month_days = np.zeros(capacity_months, dtype=np.int64)
+        self.month_runs = np.zeros(capacity_months, dtype=np.int64)
+        self.month_success_sum = np.zeros(capacity_months)
+        self.month_duration_sum = np.zeros(capacity_months)
+
+        self.total_days = 0
+        self.total_runs = 0
+        self.total_success_sum = 0.0
+        self.total_duration_sum = 0.0
+
+    def _index(self, date):
+        day = np.datetime64(date, "D")
+        index = int((day - self.start) // np.timedelta64(1, "D"))
+        if index < 0:
+            raise ValueError(f"{day} is before the start of the rollup ({self.start})")
+        month = int((day.astype("datetime64[M]") - self.start.astype("datetime64[M]")) // np.timedelta64(1, "M"))
+        return index, month
+
+    def _grow(self, index, month):
+        if index >= len(self.day_runs):
+            size = max(index + 1, 2 * len(self.day_runs))
+            for name in ("day_runs", "day_successes", "day_duration"):
+                column = getattr(self, name)
+                setattr(self, name, np.concatenate([column, np.zeros(size - len(column), dtype=column.dtype)]))
+        if month >= len(self.month_days):
+            size = max(month + 1, 2 * len(self.month_days))
+            for name in ("month_days", "month_runs", "month_success_sum", "month_duration_sum"):
+                column = getattr(self, name)
+                setattr(self, name, np.concatenate([column, np.zeros(size - len(column), dtype=column.dtype)]))
+
+    def _day_values(self, index):
+        runs = self.day_runs[index]
+        if runs == 0:
+            return 0.0, 0.0
+        return self.day_successes[index] / runs, self.day_duration[index] / runs
+
+    def _add(self, date, runs, successes, duration):
+        with self._lock:
+            index, month = self._index(date)
+            self._grow(index, month)
+            new_day = int(self.day_runs[index] == 0 and runs > 0)
+            old_success, old_duration = self._day_values(index)
+
+            self.day_runs[index] += runs
+            self.day_successes[index] += successes
+            self.day_duration[index] += duration
+            self.last_day = max(self.last_day, index)
+            success, mean_duration = self._day_values(index)
+            success_change, duration_change = success - old_success, mean_duration - old_duration
+
+            self.month_days[month] += new_day
+            self.month_runs[month] += runs
+            self.month_success_sum[month] += success_change
+            self.month_duration_sum[month] += duration_change
+            self.total_days += new_day
+            self.total_runs += runs
+            self.total_success_sum += float(success_change)
+            self.total_duration_sum += float(duration_change)
+
+            self.version += 1
+            self._monthly_frame = None
+
+    def record_run(self, date, succeeded, duration_mins):
+        """Count one finished research run."""
+        self._add(date, 1, float(succeeded), duration_mins)
+
+    def add_daily(self, date, research_runs, success_rate, avg_duration):
+        """Count a day of runs given as its aggregates."""
+        self._add(date, int(research_runs), success_rate * research_runs, avg_duration * research_runs)
+
+    def load_daily(self, df):
+        """Count the days of a frame with date, research_runs, success_rate and avg_duration columns."""
+        for row in df[["date"] + METRICS].itertuples(index=False):
+            self.add_daily(row.date, row.research_runs, row.success_rate, row.avg_duration)
+
+    def totals(self):
+        """Total runs, mean daily success rate and mean daily duration."""
+        days = max(self.total_days, 1)
+        return {
+            "research_runs": self.total_runs,
+            "success_rate": self.total_success_sum / days,
+            "avg_duration": self.total_duration_sum / days,
+        }
+
+    def monthly_frame(self):
+        """Month ('%Y-%m') and the mean daily metrics of each month with runs."""
+        with self._lock:
+            if self._monthly_frame is None:
+                months = np.flatnonzero(self.month_days)
+                days = self.month_days[months]
+                labels = self.start.astype("datetime64[M]") + months.astype("timedelta64[M]")
+                self._monthly_frame = pd.DataFrame({
+                    "month": labels.astype(str),
+                    "research_runs": self.month_runs[months] / days,
+                    "success_rate": self.month_success_sum[months] / days,
+                    "avg_duration": self.month_duration_sum[months] / days,
+                })
+            return self._monthly_frame
+
+    def recent_days(self, n=5):
+        """The last `n` days with runs and their metrics."""
+        with self._lock:
+            days = np.flatnonzero(self.day_runs[:self.last_day + 1])[-n:]
+            runs = self.day_runs[days]
+            return pd.DataFrame({
+                "date": pd.to_datetime(self.start + days.astype("timedelta64[D]")),
+                "research_runs": runs,
+                "success_rate": self.day_successes[days] / runs,
+                "avg_duration": self.day_duration[days] / runs,
+            })
@@ -4,8 +4,11 @@ from dash import dcc, html, callback, Input, Output, dash_table
 import dash_bootstrap_components as dbc
 import pandas as pd
 import numpy as np
+import math
 from datetime import datetime, timedelta
 
+from historical_data import HistoricalDataCache
+
 # Register the page
 dash.register_page(__name__, path='/historical-records', name='Historical Records', title='Research Dashboard - Historical Records')
 
@@ -42,6 +45,9 @@ def generate_historical_data(n=100):
     
     return df
 
+# Loaded once per process and shared by all callbacks; reloaded every 5 minutes
+historical_data = HistoricalDataCache(generate_historical_data, ttl=300)
+
 # Historical records page layout
 layout = dbc.Container([
     dbc.Row([
@@ -104,15 +110,17 @@ layout = dbc.Container([
                     dash_table.DataTable(
                         id="historical-table",
                         columns=[
-                            {"name": "ID", "id": "id"},
-                            {"name": "Date", "id": "date"},
+                            {"name": "ID", "id": "id", "type": "numeric"},
+                            {"name": "Date", "id": "date", "type": "datetime"},
                             {"name": "Company", "id": "company"},
                             {"name": "Researcher", "id": "researcher"},
-                            {"name": "Duration (mins)", "id": "duration_mins"},
+                            {"name": "Duration (mins)", "id": "duration_mins", "type": "numeric"},
                             {"name": "Status", "id": "status"},
-                            {"name": "Insights Generated", "id": "insights"},
+                            {"name": "Insights Generated", "id": "insights", "type": "numeric"},
                         ],
-                        data=generate_historical_data().to_dict("records"),
+                        # Rows are sent one page at a time by filter_table
+                        data=[],
+                        page_current=0,
                         page_size=15,
                         style_table={"overflowX": "auto"},
                         style_cell={
@@ -144,9 +152,12 @@ layout = dbc.Container([
                                 "backgroundColor": "rgba(253, 203, 110, 0.2)",
                             },
                         ],
-                        sort_action="native",
-                        filter_action="native",
-                        page_action="native",
+                        sort_action="custom",
+                        sort_mode="multi",
+                        sort_by=[],
+                        filter_action="custom",
+                        filter_query="",
+                        page_action="custom",
                     ),
                     html.Div(id="table-info", className="mt-3 text-muted small"),
                 ])
@@ -155,43 +166,52 @@ layout = dbc.Container([
     ])
 ], fluid=True)
 
-# Callback to filter the data table
+# Callback to reset the filter inputs; filter_table then runs on their new values
+@callback(
+    [Output("company-filter", "value"),
+     Output("status-filter", "value"),
+     Output("date-filter", "start_date"),
+     Output("date-filter", "end_date")],
+    [Input("clear-filters", "n_clicks")],
+    prevent_initial_call=True
+)
+def clear_filters(n_clicks):
+    return None, "all", None, None
+
+# Callback to filter, sort and page the data table on the server
 @callback(
     [Output("historical-table", "data"),
+     Output("historical-table", "page_count"),
+     Output("historical-table", "page_current"),
      Output("table-info", "children")],
     [Input("company-filter", "value"),
      Input("status-filter", "value"),
      Input("date-filter", "start_date"),
      Input("date-filter", "end_date"),
-     Input("clear-filters", "n_clicks")]
+     Input("historical-table", "page_current"),
+     Input("historical-table", "page_size"),
+     Input("historical-table", "sort_by"),
+     Input("historical-table", "filter_query")]
 )
-def filter_table(company, status, start_date, end_date, clear_clicks):
-    # Get the full dataset
-    df = generate_historical_data()
+def filter_table(company, status, start_date, end_date, page_current, page_size, sort_by, filter_query):
+    # Get the cached dataset
+    snapshot = historical_data.get()
+    
+    # Company (case-insensitive substring), status and date filters
+    mask = snapshot.filter_mask(company, status, start_date, end_date)
     
-    # Check if clear button was clicked
     ctx = dash.callback_context
-    if ctx.triggered and 'clear-filters' in ctx.triggered[0]['prop_id']:
-        filtered_df = df
-    else:
-        # Apply company filter if provided
-        if company:
-            df = df[df['company'].str.contains(company, case=False)]
-        
-        # Apply status filter if not "all"
-        if status != "all":
-            df = df[df['status'] == status]
-        
-        # Apply date filters if provided
-        if start_date:
-            df = df[pd.to_datetime(df['date']) >= pd.to_datetime(start_date)]
-        
-        if end_date:
-            df = df[pd.to_datetime(df['date']) <= pd.to_datetime(end_date)]
-        
-        filtered_df = df
+    triggered = [trigger['prop_id'] for trigger in ctx.triggered] if ctx.triggered else []
+    
+    # Back to the first page unless the page itself was changed
+    if "historical-table.page_current" not in triggered:
+        page_current = 0
+    
+    # Column filters, sorting and the visible page
+    records, total = snapshot.query(mask, filter_query, sort_by, page_current or 0, page_size)
+    page_count = max(1, math.ceil(total / page_size))
     
     # Create info text about the filtered results
-    info_text = f"Showing {len(filtered_df)} of {len(generate_historical_data())} total records"
+    info_text = f"Showing {total} of {len(snapshot)} total records"
     
-    return filtered_df.to_dict("records"), info_text
+    return records, page_count, page_current, info_text
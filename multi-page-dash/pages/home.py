@@ -6,6 +6,8 @@ import plotly.express as px
 import pandas as pd
 import numpy as np
 
+from metrics_rollup import MetricsRollup
+
 # Register the page
 dash.register_page(__name__, path='/', name='Home', title='Research Dashboard - Home')
 
@@ -25,13 +27,20 @@ def generate_data():
     
     return df
 
+# Daily/monthly aggregates, loaded once per process; finished runs are added with record_run
+metrics_rollup = MetricsRollup(start='2023-01-01')
+metrics_rollup.load_daily(generate_data())
+
+# Figures by metric, with the rollup version they were built from
+metric_figures = {}
+
 # Create stats cards for dashboard
 def create_stat_cards():
-    df = generate_data()
+    totals = metrics_rollup.totals()
     
-    total_runs = df['research_runs'].sum()
-    avg_success = df['success_rate'].mean() * 100
-    avg_time = df['avg_duration'].mean()
+    total_runs = totals['research_runs']
+    avg_success = totals['success_rate'] * 100
+    avg_time = totals['avg_duration']
     
     cards = [
         dbc.Card(
@@ -59,67 +68,68 @@ def create_stat_cards():
     
     return cards
 
-# Home page layout
-layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            html.H1("Research Dashboard", className="text-primary"),
-            html.P("Overview of research operations and performance metrics", className="lead"),
-        ]),
-    ], className="mb-4"),
-    
-    # Statistics cards
-    dbc.Row([
-        dbc.Col(card, width=4) for card in create_stat_cards()
-    ]),
+# Home page layout, built per page load so it shows the latest runs
+def layout(**kwargs):
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                html.H1("Research Dashboard", className="text-primary"),
+                html.P("Overview of research operations and performance metrics", className="lead"),
+            ]),
+        ], className="mb-4"),
     
-    # Interactive graph
-    dbc.Row([
-        dbc.Col([
-            html.H3("Research Activity", className="mt-4"),
-            dbc.Card([
-                dbc.CardBody([
-                    dcc.Dropdown(
-                        id='graph-metric',
-                        options=[
-                            {'label': 'Research Runs', 'value': 'research_runs'},
-                            {'label': 'Success Rate', 'value': 'success_rate'},
-                            {'label': 'Average Duration', 'value': 'avg_duration'}
-                        ],
-                        value='research_runs',
-                        className="mb-2"
-                    ),
-                    dcc.Graph(id='main-graph')
-                ])
-            ], className="shadow")
-        ], width=12)
-    ], className="mb-4"),
+        # Statistics cards
+        dbc.Row([
+            dbc.Col(card, width=4) for card in create_stat_cards()
+        ]),
     
-    # Recent activity table
-    dbc.Row([
-        dbc.Col([
-            html.H3("Recent Activity", className="mt-4"),
-            dbc.Card([
-                dbc.CardBody([
-                    dbc.Table.from_dataframe(
-                        generate_data().tail(5)[['date', 'research_runs', 'success_rate', 'avg_duration']].rename(
-                            columns={
-                                'date': 'Date', 
-                                'research_runs': 'Runs', 
-                                'success_rate': 'Success Rate', 
-                                'avg_duration': 'Avg. Duration (mins)'
-                            }
+        # Interactive graph
+        dbc.Row([
+            dbc.Col([
+                html.H3("Research Activity", className="mt-4"),
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Dropdown(
+                            id='graph-metric',
+                            options=[
+                                {'label': 'Research Runs', 'value': 'research_runs'},
+                                {'label': 'Success Rate', 'value': 'success_rate'},
+                                {'label': 'Average Duration', 'value': 'avg_duration'}
+                            ],
+                            value='research_runs',
+                            className="mb-2"
                         ),
-                        striped=True, 
-                        bordered=True, 
-                        hover=True,
-                        className="table-sm"
-                    )
-                ])
-            ], className="shadow")
-        ], width=12)
-    ])
-], fluid=True)
+                        dcc.Graph(id='main-graph')
+                    ])
+                ], className="shadow")
+            ], width=12)
+        ], className="mb-4"),
+    
+        # Recent activity table
+        dbc.Row([
+            dbc.Col([
+                html.H3("Recent Activity", className="mt-4"),
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Table.from_dataframe(
+                            metrics_rollup.recent_days(5).rename(
+                                columns={
+                                    'date': 'Date', 
+                                    'research_runs': 'Runs', 
+                                    'success_rate': 'Success Rate', 
+                                    'avg_duration': 'Avg. Duration (mins)'
+                                }
+                            ),
+                            striped=True, 
+                            bordered=True, 
+                            hover=True,
+                            className="table-sm"
+                        )
+                    ])
+                ], className="shadow")
+            ], width=12)
+        ])
+    ], fluid=True)
 
 # Callback to update graph based on dropdown selection
 @callback(
@@ -127,12 +137,17 @@ layout = dbc.Container([
     Input('graph-metric', 'value')
 )
 def update_graph(selected_metric):
-    df = generate_data()
-    
-    # Group by month for better visualization
-    df['month'] = df['date'].dt.strftime('%Y-%m')
-    monthly_data = df.groupby('month').mean().reset_index()
+    # Reuse the figure unless runs landed since it was built
+    version = metrics_rollup.version
+    cached = metric_figures.get(selected_metric)
+    if cached is not None and cached[0] == version:
+        return cached[1]
     
+    fig = build_graph(selected_metric, metrics_rollup.monthly_frame())
+    metric_figures[selected_metric] = (version, fig)
+    return fig
+
+def build_graph(selected_metric, monthly_data):
     if selected_metric == 'research_runs':
         fig = px.bar(
             monthly_data, 
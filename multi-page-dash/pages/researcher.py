@@ -6,9 +6,42 @@ import dash_bootstrap_components as dbc
 import time
 import random
 
+from research_jobs import DONE, FAILED, QUEUED, JobRunner, JobStore, StepCache
+
 # Register the page
 dash.register_page(__name__, path='/researcher', name='Researcher', title='Research Dashboard - Researcher')
 
+# Stand-in for a research step: waits like the real one, then returns its findings
+def simulated_step(seconds, findings=dict):
+    def step(company_name, result):
+        time.sleep(seconds)
+        return findings()
+    return step
+
+# Research steps with the steps they need; the three analyses run concurrently
+research_steps = [
+    ("Initializing research workflow", simulated_step(1), []),
+    ("Gathering market data", simulated_step(2, lambda: {
+        "market_share": random.randint(5, 25),
+        "competitors": ['Competitor ' + str(i) for i in range(1, 4)],
+    }), ["Initializing research workflow"]),
+    ("Analyzing financial performance", simulated_step(3, lambda: {
+        "revenue_growth": random.randint(-5, 25),
+        "profit_margin": random.randint(5, 30),
+        "debt_to_equity": random.uniform(0.1, 2.0),
+    }), ["Initializing research workflow"]),
+    ("Conducting competitive analysis", simulated_step(2), ["Initializing research workflow"]),
+    ("Generating insights", simulated_step(2), [
+        "Gathering market data", "Analyzing financial performance", "Conducting competitive analysis",
+    ]),
+]
+
+# Jobs are queued in SQLite and run by a pool of worker threads, so callbacks only submit and poll.
+# Step outputs are cached per company and day, so a repeat search the same day is immediate.
+research_jobs = JobRunner(
+    JobStore("research_jobs.db"), research_steps, workers=16, cache=StepCache("research_cache.db")
+)
+
 # Researcher page layout
 layout = dbc.Container([
     dbc.Row([
@@ -50,6 +83,10 @@ layout = dbc.Container([
         ], width={"size": 8, "offset": 2})
     ]),
 
+    # Job of the current research, polled while it runs
+    dcc.Store(id="research-job"),
+    dcc.Interval(id="research-poll", interval=1000, disabled=True),
+
     # Research progress container (hidden initially)
     dbc.Row([
         dbc.Col([
@@ -114,59 +151,22 @@ layout = dbc.Container([
     ])
 ], fluid=True)
 
-# Callback to handle research process
-@callback(
-    [Output("research-progress-container", "style"),
-     Output("research-status", "children"),
-     Output("research-progress", "value"),
-     Output("research-details", "children"),
-     Output("research-results-container", "style"),
-     Output("research-results", "children"),
-     Output("download-report", "style"),
-     Output("evidence-container", "style"),
-     Output("evidence-cards", "children")],
-    [Input("search-button", "n_clicks")],
-    [State("company-input", "value")],
-    prevent_initial_call=True
-)
-def start_research(n_clicks, company_name):
-    if not company_name:
-        return {"display": "none"}, "", 0, "", {"display": "none"}, "", {"display": "none"}, {"display": "none"}, ""
-
-    # Show progress container
-    progress_style = {"display": "block"}
-
-    # Research steps simulation
-    steps = [
-        {"name": "Initializing research workflow", "time": 1},
-        {"name": "Gathering market data", "time": 2},
-        {"name": "Analyzing financial performance", "time": 3},
-        {"name": "Conducting competitive analysis", "time": 2},
-        {"name": "Generating insights", "time": 2},
-    ]
-
-    total_steps = len(steps)
-    current_progress = 100  # Final progress state
-
-    # Create final status messages
-    final_status = f"Research Complete: {company_name}"
-    final_details = html.P("All research steps completed successfully!", className="text-success")
-
-    # Generate comprehensive report content
-    results_content = html.Div([
+# Comprehensive report from the findings of the research steps
+def report_content(company_name, result):
+    return html.Div([
         html.H4(f"Summary Report: {company_name}"),
         html.Hr(),
         dbc.Row([
             dbc.Col([
                 html.H5("Market Position"),
-                html.P(f"{company_name} currently holds approximately {random.randint(5, 25)}% market share in its primary industry."),
-                html.P(f"Key competitors include {', '.join(['Competitor ' + str(i) for i in range(1, 4)])}.")
+                html.P(f"{company_name} currently holds approximately {result['market_share']}% market share in its primary industry."),
+                html.P(f"Key competitors include {', '.join(result['competitors'])}.")
             ], width=6),
             dbc.Col([
                 html.H5("Financial Health"),
-                html.P(f"Revenue growth: {random.randint(-5, 25)}% year-over-year"),
-                html.P(f"Profit margin: {random.randint(5, 30)}%"),
-                html.P(f"Debt-to-equity ratio: {random.uniform(0.1, 2.0):.2f}")
+                html.P(f"Revenue growth: {result['revenue_growth']}% year-over-year"),
+                html.P(f"Profit margin: {result['profit_margin']}%"),
+                html.P(f"Debt-to-equity ratio: {result['debt_to_equity']:.2f}")
             ], width=6)
         ]),
         html.H5("SWOT Analysis", className="mt-3"),
@@ -192,7 +192,8 @@ def start_research(n_clicks, company_name):
         ])
     ])
 
-    # Generate evidence cards
+# Evidence cards of a research
+def evidence_cards(company_name):
     evidence_sources = [
         {"title": f"{company_name} Annual Report", "description": "Official annual financial report with detailed performance metrics and future outlook.", "url": "https://example.com/annual-report"},
         {"title": "Industry Analysis", "description": "Comprehensive market research and industry trends affecting the company's position.", "url": "https://example.com/industry-analysis"},
@@ -202,7 +203,7 @@ def start_research(n_clicks, company_name):
     ]
     
     # Create cards for each evidence
-    evidence_cards = dbc.Row([
+    return dbc.Row([
         dbc.Col([
             dbc.Card([
                 dbc.CardHeader(source["title"], className="fw-bold"),
@@ -214,12 +215,60 @@ def start_research(n_clicks, company_name):
         ], width=12) for source in evidence_sources
     ])
 
-    # Show containers and button
-    results_style = {"display": "block"}
-    evidence_style = {"display": "block"}
-    download_style = {"display": "block"}
+# Callback to queue a research job
+@callback(
+    Output("research-job", "data"),
+    [Input("search-button", "n_clicks")],
+    [State("company-input", "value")],
+    prevent_initial_call=True
+)
+def start_research(n_clicks, company_name):
+    if not company_name:
+        return None
+    return research_jobs.submit(company_name)
+
+# Callback to show the progress and results of the research job
+@callback(
+    [Output("research-progress-container", "style"),
+     Output("research-status", "children"),
+     Output("research-progress", "value"),
+     Output("research-details", "children"),
+     Output("research-results-container", "style"),
+     Output("research-results", "children"),
+     Output("download-report", "style"),
+     Output("evidence-container", "style"),
+     Output("evidence-cards", "children"),
+     Output("research-poll", "disabled")],
+    [Input("research-poll", "n_intervals"),
+     Input("research-job", "data")],
+    prevent_initial_call=True
+)
+def show_research(n_intervals, job_id):
+    job = research_jobs.store.get(job_id) if job_id else None
+    if job is None:
+        return {"display": "none"}, "", 0, "", {"display": "none"}, "", {"display": "none"}, {"display": "none"}, "", True
+
+    company_name = job["company"]
+    hidden = {"display": "none"}
+    shown = {"display": "block"}
+
+    if job["status"] == DONE:
+        final_status = f"Research Complete: {company_name}"
+        final_details = html.P("All research steps completed successfully!", className="text-success")
+        return (shown, final_status, 100, final_details,
+                shown, report_content(company_name, job["result"]), shown,
+                shown, evidence_cards(company_name), True)
+
+    if job["status"] == FAILED:
+        failed_details = html.P(f"Research failed: {(job['error'] or 'unknown error').strip().splitlines()[-1]}", className="text-danger")
+        return (shown, f"Research Failed: {company_name}", job["progress"], failed_details,
+                hidden, "", hidden, hidden, "", True)
 
-    # Return final state
-    return (progress_style, final_status, current_progress, final_details,
-            results_style, results_content, download_style,
-            evidence_style, evidence_cards)
+    # Still queued or running: show the finished steps and keep polling
+    if job["status"] == QUEUED:
+        status = f"Queued: {company_name} (waiting for a research worker)"
+    else:
+        status = f"Researching {company_name}: {job['step_name'] or 'starting'}..."
+    details = html.Ul([html.Li(name, className="text-success") for name in job["completed"]])
+    return (shown, status, job["progress"], details,
+            hidden, dash.no_update, hidden, hidden, dash.no_update, False)
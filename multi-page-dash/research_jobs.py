@@ -0,0 +1,321 @@
+# research_jobs.py - Background research jobs: a SQLite-backed queue, a step cache and a pool of worker threads
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobStore:
+    """
+    Research jobs in a SQLite database, shared by the worker threads and the
+    Dash callbacks polling them (and by other processes using the same file).
+
+    A job is claimed by moving it from queued to running in one IMMEDIATE
+    transaction, so two workers never run the same job. A running job whose
+    heartbeat (`updated_at`, refreshed by the worker while it runs the job)
+    is older than `stale_after` seconds is taken to belong to a dead worker
+    and is claimed again, up to `max_attempts` times. Each claim counts as an
+    attempt, and the writes of a worker only apply while the job is still at
+    the attempt it claimed, so a worker whose job was claimed again stops.
+    """
+
+    def __init__(self, path="research_jobs.db", stale_after=300.0, max_attempts=3):
+        self.path = path
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " company TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " step INTEGER NOT NULL DEFAULT 0,"
+                " total_steps INTEGER NOT NULL,"
+                " step_name TEXT NOT NULL DEFAULT '',"
+                " completed TEXT NOT NULL DEFAULT '[]',"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            columns = {row["name"] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+            if "completed" not in columns:
+                self._connection.execute("ALTER TABLE jobs ADD COLUMN completed TEXT NOT NULL DEFAULT '[]'")
+
+    @staticmethod
+    def _job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["completed"] = json.loads(job["completed"])
+        job["progress"] = round(100 * job["step"] / job["total_steps"]) if job["total_steps"] else 100
+        return job
+
+    def create(self, company, total_steps):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO jobs (id, company, status, total_steps, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, company, QUEUED, total_steps, now, now),
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def claim(self, job_id=None):
+        """Mark the oldest runnable job (or job `job_id`, if runnable) as running and return it, or None."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs of dead workers that used up their attempts are failed rather than retried
+                self._connection.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ?"
+                    " WHERE status = ? AND updated_at < ? AND attempts >= ?",
+                    (FAILED, "Worker stopped responding", now, RUNNING, now - self.stale_after, self.max_attempts),
+                )
+                row = self._connection.execute(
+                    "SELECT id FROM jobs WHERE (status = ? OR (status = ? AND updated_at < ?))"
+                    + (" AND id = ?" if job_id else "") + " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now - self.stale_after) + ((job_id,) if job_id else ()),
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (RUNNING, now, row["id"]),
+                    )
+                    row = self._connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return self._job(row)
+
+    def update(self, job_id, attempt, completed, running, result):
+        """
+        Record the finished and running steps (and the heartbeat of the worker).
+        Returns False when the job is no longer running at `attempt`.
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE jobs SET step = ?, step_name = ?, completed = ?, result = ?, updated_at = ?"
+                " WHERE id = ? AND status = ? AND attempts = ?",
+                (len(completed), ", ".join(running), json.dumps(completed), json.dumps(result), time.time(),
+                 job_id, RUNNING, attempt),
+            )
+        return cursor.rowcount > 0
+
+    def finish(self, job_id, attempt, status, result=None, error=None):
+        """Record the outcome of a job. Returns False when the job is no longer running at `attempt`."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE jobs SET status = ?, result = COALESCE(?, result), error = ?, updated_at = ?"
+                " WHERE id = ? AND status = ? AND attempts = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(),
+                 job_id, RUNNING, attempt),
+            )
+        return cursor.rowcount > 0
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class StepCache:
+    """
+    Outputs of research steps by (company, step, data date) in SQLite.
+
+    The data date is today by default (`data_date` returns it as a string),
+    so a company researched again the same day reuses every step, and the
+    next day the steps run again on fresh data. Company names are compared
+    case- and whitespace-insensitively.
+    """
+
+    def __init__(self, path="research_cache.db", data_date=None):
+        self.path = path
+        self.data_date = data_date or (lambda: date.today().isoformat())
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS step_cache ("
+                " company TEXT NOT NULL,"
+                " step TEXT NOT NULL,"
+                " data_date TEXT NOT NULL,"
+                " output TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (company, step, data_date))"
+            )
+
+    @staticmethod
+    def _company(company):
+        return " ".join(company.lower().split())
+
+    def get(self, company, step, data_date):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT output FROM step_cache WHERE company = ? AND step = ? AND data_date = ?",
+                (self._company(company), step, data_date),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, company, step, data_date, output):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO step_cache (company, step, data_date, output, created_at) VALUES (?, ?, ?, ?, ?)",
+                (self._company(company), step, data_date, json.dumps(output), time.time()),
+            )
+
+    def prune(self, before):
+        """Drop the outputs of data dates before `before`."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM step_cache WHERE data_date < ?", (before,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class JobRunner:
+    """
+    Runs research jobs on `workers` background threads.
+
+    `steps` is a list of (name, fn, after) triples in dependency order:
+    a step starts once the steps named in `after` are done, so independent
+    steps run concurrently on a pool of `step_workers` threads. Each fn is
+    called as fn(company, result) with the results of the steps done so far
+    and returns a dict merged into them. The finished and running steps are
+    stored as they change, so callbacks can poll them with JobStore.get.
+    While steps run, the heartbeat of the job is refreshed every
+    `heartbeat_interval` seconds (a third of the store's `stale_after` by
+    default), so a slow step does not get its job claimed by another worker.
+
+    With a StepCache, step outputs are reused for the same company and data
+    date, and a search whose steps are all cached completes in submit.
+    Threads start on the first submit and also pick up jobs queued by other
+    processes, checking every `poll_interval` seconds.
+    """
+
+    def __init__(self, store, steps, workers=16, step_workers=None, cache=None, poll_interval=1.0,
+                 heartbeat_interval=None):
+        names = set()
+        for name, fn, after in steps:
+            if not set(after) <= names:
+                raise ValueError(f"Step {name!r} must come after {sorted(set(after) - names)}")
+            names.add(name)
+        self.store = store
+        self.steps = steps
+        self.workers = workers
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or store.stale_after / 3
+        self._executor = ThreadPoolExecutor(step_workers or workers * len(steps), thread_name_prefix="research-step")
+        self._threads = []
+        self._wakeup = threading.Condition()
+        self._stopping = False
+
+    def start(self):
+        with self._wakeup:
+            if self._threads:
+                return
+            self._stopping = False
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"research-worker-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Let the workers finish their current job and exit."""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, company):
+        """Queue a research of `company` and return its job id."""
+        self.start()
+        job_id = self.store.create(company, len(self.steps))
+        if self.cache is not None:
+            data_date = self.cache.data_date()
+            if all(self.cache.get(company, name, data_date) is not None for name, _, _ in self.steps):
+                job = self.store.claim(job_id)
+                if job is not None:
+                    self.run(job)
+                    return job_id
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def _work(self):
+        while True:
+            with self._wakeup:
+                if self._stopping:
+                    return
+            job = self.store.claim()
+            if job is None:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(self.poll_interval)
+                continue
+            self.run(job)
+
+    def run(self, job):
+        company = job["company"]
+        attempt = job["attempts"]
+        result = job["result"] or {}
+        # A retried job keeps the steps it already finished
+        completed = list(job["completed"])
+        data_date = self.cache.data_date() if self.cache is not None else None
+        running = {}
+        try:
+            while len(completed) < len(self.steps):
+                # Steps are in dependency order, so one pass also starts the dependents of cached steps
+                for name, fn, after in self.steps:
+                    if name in completed or name in running.values() or not set(after) <= set(completed):
+                        continue
+                    output = self.cache.get(company, name, data_date) if self.cache is not None else None
+                    if output is not None:
+                        result.update(output)
+                        completed.append(name)
+                    else:
+                        running[self._executor.submit(fn, company, dict(result))] = name
+                # Also the heartbeat, at least every heartbeat_interval while steps run
+                if not self.store.update(job["id"], attempt, completed, list(running.values()), result):
+                    # Claimed again by another worker; let it have the job
+                    return
+                if not running:
+                    continue
+                done, _ = wait(running, timeout=self.heartbeat_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    output = future.result() or {}
+                    if self.cache is not None:
+                        self.cache.set(company, name, data_date, output)
+                    result.update(output)
+                    completed.append(name)
+        except Exception:
+            self.store.finish(job["id"], attempt, FAILED, result, traceback.format_exc(limit=5))
+            return
+        self.store.finish(job["id"], attempt, DONE, result)
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from research_jobs import DONE, FAILED, JobRunner, JobStore
+
+
+def wait_for(store, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] in (DONE, FAILED):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_slow_step_is_not_claimed_again(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"), stale_after=0.3)
+    calls = []
+    lock = threading.Lock()
+
+    def slow_step(company, result):
+        with lock:
+            calls.append(company)
+        time.sleep(1.0)
+        return {"profile": company}
+
+    runner = JobRunner(store, [("profile", slow_step, [])], workers=3, poll_interval=0.05)
+    try:
+        job = wait_for(store, runner.submit("Acme"))
+    finally:
+        runner.stop()
+    assert job["status"] == DONE and job["result"] == {"profile": "Acme"}
+    assert calls == ["Acme"] and job["attempts"] == 1
+    store.close()
+
+
+def test_worker_of_a_reclaimed_job_stops_writing(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"), stale_after=0.0)
+    job_id = store.create("Acme", total_steps=1)
+    first = store.claim(job_id)
+    second = store.claim(job_id)
+    assert (first["attempts"], second["attempts"]) == (1, 2)
+    assert not store.update(job_id, first["attempts"], ["profile"], [], {"profile": "stale"})
+    assert not store.finish(job_id, first["attempts"], DONE, {"profile": "stale"})
+    assert store.finish(job_id, second["attempts"], DONE, {"profile": "fresh"})
+    assert store.get(job_id)["result"] == {"profile": "fresh"}
+    store.close()
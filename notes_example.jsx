@@ -1,25 +1,76 @@
+import { useEffect, useRef, useState } from 'react';
+
+// Applies "append"/"delete" operations to a notes list
+const applyOps = (notes, ops) => {
+  let updated = notes;
+  for (const op of ops) {
+    if (op.op === 'append') {
+      updated = updated.some(note => note.id === op.note.id) ? updated : [...updated, op.note];
+    } else if (op.op === 'delete') {
+      updated = updated.filter(note => note.id !== op.id);
+    }
+  }
+  return updated;
+};
+
 export default function NotesElement() {
-  // In Chainlit custom elements, props and updateElement are globally available
-  
+  // In Chainlit custom elements, props and callAction are globally available.
+  // The first props hold a snapshot of the notes; later ones only the
+  // operations since the previous update, numbered by seq.
+  const [notes, setNotes] = useState(() => (props.snapshot ? props.snapshot.notes : []));
+  const lastSeq = useRef(props.snapshot ? props.snapshot.seq : null);
+  const resyncing = useRef(false);
+
+  const resync = async () => {
+    if (resyncing.current) return;
+    resyncing.current = true;
+    try {
+      const result = await callAction({ name: 'notes_snapshot', payload: {} });
+      const snapshot = result && result.response;
+      if (snapshot) {
+        lastSeq.current = snapshot.seq;
+        setNotes(snapshot.notes);
+      }
+    } finally {
+      resyncing.current = false;
+    }
+  };
+
+  useEffect(() => {
+    if (lastSeq.current === null) {
+      // Mounted without a snapshot, e.g. after a reload
+      resync();
+      return;
+    }
+    const ops = (props.ops || []).filter(op => op.seq > lastSeq.current);
+    if (ops.length === 0) return;
+    if (ops[0].seq !== lastSeq.current + 1) {
+      // Missed an update
+      resync();
+      return;
+    }
+    lastSeq.current = ops[ops.length - 1].seq;
+    setNotes(current => applyOps(current, ops));
+  }, [props.version]);
+
   const deleteNote = (noteId) => {
-    // Filter out the deleted note
-    const updatedNotes = props.notes.filter(note => note.id !== noteId);
-    // Update the element with the new notes array
-    updateElement({...props, notes: updatedNotes});
+    // Remove the note right away; the server confirms with a delete operation
+    setNotes(current => current.filter(note => note.id !== noteId));
+    callAction({ name: 'delete_note', payload: { id: noteId } });
   };
 
   return (
     <div className="w-full p-4">
       <h3 className="text-lg font-semibold mb-4">Recorded Notes</h3>
       
-      {(!props.notes || props.notes.length === 0) ? (
+      {(notes.length === 0) ? (
         <p className="text-gray-500 text-sm italic">
           No notes yet. Add a note by typing "/note" followed by your note text.
         </p>
       ) : (
         <div className="max-h-[500px] overflow-auto pr-4">
           <div className="flex flex-col gap-3">
-            {props.notes.map((note) => (
+            {notes.map((note) => (
               <div key={note.id} className="border rounded p-3 bg-white shadow-sm dark:bg-gray-800 dark:border-gray-700">
                 <div className="flex justify-between">
                   <div className="flex-1">
@@ -0,0 +1,152 @@
+"""
+Notes of the chainlit_example.py side panel: a SQLite store keyed by user,
+and the batching of updates to the NotesElement (notes_example.jsx).
+
+Instead of re-sending the whole notes list on every change, the element gets
+the operations since its last update:
+
+    {"version": 7, "ops": [{"seq": 12, "op": "append", "note": {...}},
+                           {"seq": 13, "op": "delete", "id": 4}]}
+
+Operations queued within `delay` seconds of the first one are sent together,
+and a note deleted before its append was sent is dropped from the batch. The
+element applies operations in `seq` order; when it sees a gap (it was
+remounted, or missed an update) it asks for a snapshot instead. The first
+props of the element hold such a snapshot:
+
+    {"version": 0, "ops": [], "snapshot": {"seq": 0, "notes": [...]}}
+
+Notes live in the store, so a session only keeps the operations not sent yet.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+DEFAULT_DELAY = 0.25
+
+
+class NotesStore:
+    """Notes by user in a SQLite database. Safe to share between threads."""
+
+    def __init__(self, path: str = "notes.db") -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS notes ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " user_id TEXT NOT NULL,"
+                " content TEXT NOT NULL,"
+                " timestamp TEXT NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS notes_user ON notes (user_id, id)")
+
+    @staticmethod
+    def _note(row: sqlite3.Row) -> dict:
+        return {"id": row["id"], "content": row["content"], "timestamp": row["timestamp"]}
+
+    def add(self, user_id: str, content: str, timestamp: Optional[str] = None) -> dict:
+        timestamp = timestamp or time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO notes (user_id, content, timestamp) VALUES (?, ?, ?)",
+                (user_id, content, timestamp),
+            )
+        return {"id": cursor.lastrowid, "content": content, "timestamp": timestamp}
+
+    def delete(self, user_id: str, note_id: int) -> bool:
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM notes WHERE user_id = ? AND id = ?", (user_id, note_id)
+            )
+        return cursor.rowcount > 0
+
+    def notes(self, user_id: str) -> list[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, content, timestamp FROM notes WHERE user_id = ? ORDER BY id", (user_id,)
+            ).fetchall()
+        return [self._note(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class NotesFeed:
+    """
+    The notes of one user in one session, and the element showing them.
+
+    `element` is the chainlit CustomElement (anything with `props` and an
+    async `update()`). Store calls run in a worker thread.
+    """
+
+    def __init__(self, store: NotesStore, user_id: str, element: Any, delay: float = DEFAULT_DELAY) -> None:
+        self.store = store
+        self.user_id = user_id
+        self.element = element
+        self.delay = delay
+        self.seq = 0
+        self.version = 0
+        self._pending: list[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def snapshot(self) -> dict:
+        """All notes, after sending the pending operations so `seq` matches them."""
+        await self.flush()
+        notes = await asyncio.to_thread(self.store.notes, self.user_id)
+        return {"seq": self.seq, "notes": notes}
+
+    async def initial_props(self) -> dict:
+        return {"version": self.version, "ops": [], "snapshot": await self.snapshot()}
+
+    async def append(self, content: str) -> dict:
+        note = await asyncio.to_thread(self.store.add, self.user_id, content)
+        self._queue({"op": "append", "note": note})
+        return note
+
+    async def delete(self, note_id: int) -> bool:
+        deleted = await asyncio.to_thread(self.store.delete, self.user_id, note_id)
+        if deleted:
+            appended = [op for op in self._pending if op["op"] == "append" and op["note"]["id"] == note_id]
+            if appended:
+                # Never sent, so there is nothing to delete on the client
+                self._pending.remove(appended[0])
+            else:
+                self._queue({"op": "delete", "id": note_id})
+        return deleted
+
+    def _queue(self, op: dict) -> None:
+        self._pending.append(op)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send the pending operations now, if any."""
+        async with self._lock:
+            if not self._pending:
+                return
+            ops, self._pending = self._pending, []
+            for op in ops:
+                self.seq += 1
+                op["seq"] = self.seq
+            self.version += 1
+            self.element.props = {"version": self.version, "ops": ops}
+            await self.element.update()
+
+    def close(self) -> None:
+        """Drop the operations not sent yet, e.g. when the chat ends; the notes are stored already."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._pending = []
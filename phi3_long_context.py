@@ -0,0 +1,304 @@
+"""
+Long-document mode for the 128k-context Phi-3 model of phi3-128k.py.
+
+A plain `pipeline` call prefills the whole prompt in one forward pass, so
+memory grows with the full attention over 100k tokens at once. Here the
+prompt is prefilled in fixed-size chunks into the KV cache instead: each
+chunk only attends from `chunk_size` queries, and logits are kept for the
+last position only. Optionally the KV cache is stored as int8 to roughly
+halve (bf16) or quarter (fp32) its size. Peak memory and prefill tokens/s are
+reported per chunk.
+
+Usage:
+    python phi3_long_context.py section.txt [--chunk-size 2048] [--quantize-cache] [--tiny]
+
+where section.txt is e.g. the text of a 10-K item.
+"""
+import argparse
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import torch
+from transformers import DynamicCache
+
+from phi3_server import load_model, tiny_random_model
+
+SUMMARY_SYSTEM_PROMPT = "You are a financial analyst. Summarize SEC filings accurately and concisely."
+
+
+class Int8KVCache(DynamicCache):
+    """
+    DynamicCache keeping older keys and values as int8.
+
+    The most recent tokens (up to `residual_length`) stay in full precision;
+    once more accumulate they are quantized per token and head with one scale
+    over the head dimension. Attention still sees full precision tensors: a
+    layer's cache is dequantized when it is updated, so only one layer is
+    materialized at a time.
+    """
+
+    def __init__(self, residual_length: int = 128) -> None:
+        super().__init__()
+        self.residual_length = residual_length
+        # Per layer: (int8 keys, key scales, int8 values, value scales), or None
+        self._quantized: list[Optional[tuple[torch.Tensor, ...]]] = []
+
+    @staticmethod
+    def _quantize(states):
+        scale = states.abs().amax(dim=-1, keepdim=True).clamp(min=1e-8) / 127
+        return torch.round(states / scale).to(torch.int8), scale.to(states.dtype)
+
+    def update(self, key_states, value_states, layer_idx, cache_kwargs=None):
+        if layer_idx == 0:
+            self._seen_tokens += key_states.shape[-2]
+
+        if len(self.key_cache) <= layer_idx:
+            self.key_cache.append(key_states)
+            self.value_cache.append(value_states)
+            self._quantized.append(None)
+        else:
+            self.key_cache[layer_idx] = torch.cat([self.key_cache[layer_idx], key_states], dim=-2)
+            self.value_cache[layer_idx] = torch.cat([self.value_cache[layer_idx], value_states], dim=-2)
+
+        keys, values = self.key_cache[layer_idx], self.value_cache[layer_idx]
+        quantized = self._quantized[layer_idx]
+        if quantized is not None:
+            q_keys, key_scale, q_values, value_scale = quantized
+            keys = torch.cat([q_keys.to(keys.dtype) * key_scale, keys], dim=-2)
+            values = torch.cat([q_values.to(values.dtype) * value_scale, values], dim=-2)
+
+        if self.key_cache[layer_idx].shape[-2] > self.residual_length:
+            q_keys, key_scale = self._quantize(self.key_cache[layer_idx])
+            q_values, value_scale = self._quantize(self.value_cache[layer_idx])
+            if quantized is not None:
+                q_keys = torch.cat([quantized[0], q_keys], dim=-2)
+                key_scale = torch.cat([quantized[1], key_scale], dim=-2)
+                q_values = torch.cat([quantized[2], q_values], dim=-2)
+                value_scale = torch.cat([quantized[3], value_scale], dim=-2)
+            self._quantized[layer_idx] = (q_keys, key_scale, q_values, value_scale)
+            self.key_cache[layer_idx] = self.key_cache[layer_idx][..., :0, :]
+            self.value_cache[layer_idx] = self.value_cache[layer_idx][..., :0, :]
+
+        return keys, values
+
+    def get_seq_length(self, layer_idx: Optional[int] = 0) -> int:
+        if len(self.key_cache) <= layer_idx:
+            return 0
+        length = self.key_cache[layer_idx].shape[-2]
+        if self._quantized[layer_idx] is not None:
+            length += self._quantized[layer_idx][0].shape[-2]
+        return length
+
+
+def cache_nbytes(cache: DynamicCache) -> int:
+    tensors = [*cache.key_cache, *cache.value_cache]
+    for quantized in getattr(cache, "_quantized", []):
+        if quantized is not None:
+            tensors.extend(quantized)
+    return sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+
+
+def reset_peak_memory(device) -> None:
+    if torch.device(device).type == "cuda":
+        torch.cuda.reset_peak_memory_stats(device)
+        return
+    # Resets VmHWM, the peak resident set size, on Linux
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_memory_bytes(device) -> int:
+    """Peak memory since the last reset_peak_memory (CUDA memory, or resident set size)."""
+    if torch.device(device).type == "cuda":
+        return torch.cuda.max_memory_allocated(device)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and is never reset
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class ChunkStats:
+    index: int
+    tokens: int
+    cached_tokens: int
+    seconds: float
+    cache_bytes: int
+    peak_memory_bytes: int
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"chunk {self.index:3}: {self.tokens:5} tokens in {self.seconds:6.2f} s "
+            f"({self.tokens_per_second:8.1f} tokens/s), cache {self.cached_tokens} tokens / "
+            f"{self.cache_bytes / 2**20:7.1f} MiB, peak memory {self.peak_memory_bytes / 2**20:7.1f} MiB"
+        )
+
+
+def _longrope_embeddings(model) -> list:
+    """The LongRoPE rotary embeddings of the model (one per attention layer)."""
+    return [module for module in model.modules() if hasattr(module, "short_factor") and hasattr(module, "long_factor")]
+
+
+def needs_long_rope(model, total_tokens: int) -> bool:
+    """Whether the model uses LongRoPE and a sequence of `total_tokens` is past its original context."""
+    rope_scaling = getattr(model.config, "rope_scaling", None) or {}
+    original_max = getattr(model.config, "original_max_position_embeddings", None)
+    rope_type = rope_scaling.get("type", rope_scaling.get("rope_type"))
+    return rope_type == "longrope" and original_max is not None and total_tokens > original_max
+
+
+@contextmanager
+def long_rope_factors(model):
+    """
+    Make LongRoPE rotate with its long factors whatever the length of each
+    forward call, as a single forward pass over a long prompt does.
+    """
+    embeddings = _longrope_embeddings(model)
+    short_factors = [embedding.short_factor for embedding in embeddings]
+    for embedding in embeddings:
+        embedding.short_factor = embedding.long_factor
+    try:
+        yield
+    finally:
+        for embedding, short_factor in zip(embeddings, short_factors):
+            embedding.short_factor = short_factor
+
+
+@torch.no_grad()
+def chunked_prefill(
+    model,
+    input_ids: list[int],
+    *,
+    chunk_size: int = 2048,
+    cache: Optional[DynamicCache] = None,
+    on_chunk: Optional[Callable[[ChunkStats], None]] = None,
+):
+    """
+    Prefill `input_ids` into a KV cache `chunk_size` tokens at a time.
+
+    LongRoPE models pick short or long rotary factors from the sequence
+    length of each forward call, so the early chunks of a prompt longer than
+    `original_max_position_embeddings` would be encoded with the short ones.
+    For such prompts the long factors are used for every chunk; when the
+    model's rotary embeddings cannot be switched, the prompt is prefilled in
+    one pass instead.
+
+    Returns:
+        A tuple of (cache, logits of the last position)
+    """
+    cache = cache if cache is not None else DynamicCache()
+    device = model.device
+
+    long_rope = needs_long_rope(model, cache.get_seq_length() + len(input_ids))
+    if long_rope and not _longrope_embeddings(model):
+        chunk_size = max(len(input_ids), 1)
+
+    logits = None
+    with long_rope_factors(model) if long_rope else nullcontext():
+        for index, start in enumerate(range(0, len(input_ids), chunk_size)):
+            chunk = input_ids[start:start + chunk_size]
+            reset_peak_memory(device)
+            began = time.perf_counter()
+            output = model(
+                input_ids=torch.tensor([chunk], device=device),
+                past_key_values=cache,
+                use_cache=True,
+                num_logits_to_keep=1,
+            )
+            logits = output.logits[:, -1, :]
+            if on_chunk is not None:
+                on_chunk(ChunkStats(
+                    index=index,
+                    tokens=len(chunk),
+                    cached_tokens=cache.get_seq_length(),
+                    seconds=time.perf_counter() - began,
+                    cache_bytes=cache_nbytes(cache),
+                    peak_memory_bytes=peak_memory_bytes(device),
+                ))
+    return cache, logits
+
+
+@torch.no_grad()
+def generate_long(
+    model,
+    tokenizer,
+    messages,
+    *,
+    chunk_size: int = 2048,
+    max_new_tokens: int = 500,
+    quantize_cache: bool = False,
+    on_chunk: Optional[Callable[[ChunkStats], None]] = None,
+) -> str:
+    """
+    Greedy generation for a long prompt, with a chunked prefill.
+    """
+    input_ids = list(tokenizer.apply_chat_template(messages, add_generation_prompt=True, tokenize=True))
+    cache = Int8KVCache() if quantize_cache else DynamicCache()
+    cache, logits = chunked_prefill(model, input_ids, chunk_size=chunk_size, cache=cache, on_chunk=on_chunk)
+
+    eos = model.generation_config.eos_token_id
+    eos = set(eos if isinstance(eos, (list, tuple)) else [eos]) | {tokenizer.eos_token_id}
+    generated = []
+    while len(generated) < max_new_tokens:
+        token = int(logits.argmax(dim=-1))
+        if token in eos:
+            break
+        generated.append(token)
+        output = model(
+            input_ids=torch.tensor([[token]], device=model.device),
+            past_key_values=cache,
+            use_cache=True,
+        )
+        logits = output.logits[:, -1, :]
+    return tokenizer.decode(generated, skip_special_tokens=True)
+
+
+def summarize_section(model, tokenizer, text: str, **kwargs) -> str:
+    messages = [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Summarize the following section of a 10-K filing:\n\n{text}"},
+    ]
+    return generate_long(model, tokenizer, messages, **kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", help="Text file with the section to summarize, '-' for stdin")
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--max-new-tokens", type=int, default=500)
+    parser.add_argument("--quantize-cache", action="store_true", help="Store the KV cache as int8")
+    parser.add_argument("--tiny", action="store_true", help="Use a tiny random-weight model")
+    parser.add_argument("--device-map", default="cpu")
+    args = parser.parse_args()
+
+    text = sys.stdin.read() if args.path == "-" else open(args.path, encoding="utf-8").read()
+    model, tokenizer = tiny_random_model() if args.tiny else load_model(device_map=args.device_map)
+
+    started = time.perf_counter()
+    summary = summarize_section(
+        model,
+        tokenizer,
+        text,
+        chunk_size=args.chunk_size,
+        max_new_tokens=args.max_new_tokens,
+        quantize_cache=args.quantize_cache,
+        on_chunk=lambda stats: print(stats, file=sys.stderr),
+    )
+    print(summary)
+    print(f"Total: {time.perf_counter() - started:.1f} s", file=sys.stderr)
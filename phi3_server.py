@@ -0,0 +1,515 @@
+"""
+Local generation service around the Phi-3 model used in phi3-128k.py.
+
+The model is loaded once and shared by all requests:
+
+* Dynamic batching: requests submitted concurrently are prefilled as they
+  arrive and then decoded together, one batched forward pass per token.
+  Requests join and leave the running batch at token boundaries.
+* Prefix KV cache: the KV cache of everything before the last message (the
+  system prompt and few-shot turns) is kept in an LRU cache, so a repeated
+  prefix is only encoded once.
+* Streaming: every request returns a GenerationStream yielding text as it is
+  generated, with time-to-first-token and token counts once done.
+
+Usage:
+    python phi3_server.py           # example conversation of phi3-128k.py
+    python phi3_server.py --tiny    # same, on a tiny random-weight model (CPU)
+"""
+import argparse
+import copy
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer, DynamicCache, Phi3Config, Phi3ForCausalLM
+
+MODEL_ID = "microsoft/Phi-3-mini-128k-instruct"
+
+
+def load_model(model_id=MODEL_ID, device_map="cpu", torch_dtype="auto"):
+    model = AutoModelForCausalLM.from_pretrained(
+        model_id,
+        device_map=device_map,
+        torch_dtype=torch_dtype,
+        trust_remote_code=True,
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    return model.eval(), tokenizer
+
+
+class ByteTokenizer:
+    """
+    Byte-level stand-in for the Phi-3 tokenizer, with the same chat markup.
+    Only the methods used by Phi3GenerationServer are implemented.
+    """
+
+    SPECIAL_TOKENS = ["<pad>", "<s>", "<|endoftext|>", "<|system|>", "<|user|>", "<|assistant|>", "<|end|>"]
+    BYTE_OFFSET = 16
+
+    def __init__(self):
+        self.special_ids = {token: i for i, token in enumerate(self.SPECIAL_TOKENS)}
+        self.pad_token_id = self.special_ids["<pad>"]
+        self.eos_token_id = self.special_ids["<|endoftext|>"]
+        self.vocab_size = self.BYTE_OFFSET + 256
+
+    def encode(self, text):
+        return [self.BYTE_OFFSET + b for b in text.encode("utf-8")]
+
+    def decode(self, ids, skip_special_tokens=False):
+        data = bytearray()
+        for i in ids:
+            if i >= self.BYTE_OFFSET:
+                data.append(i - self.BYTE_OFFSET)
+            elif not skip_special_tokens and i < len(self.SPECIAL_TOKENS):
+                data.extend(self.SPECIAL_TOKENS[i].encode("utf-8"))
+        return data.decode("utf-8", errors="replace")
+
+    def apply_chat_template(self, messages, add_generation_prompt=False, tokenize=True):
+        ids = []
+        for message in messages:
+            ids.append(self.special_ids[f"<|{message['role']}|>"])
+            ids.extend(self.encode("\n" + message["content"]))
+            ids.append(self.special_ids["<|end|>"])
+            ids.extend(self.encode("\n"))
+        if add_generation_prompt:
+            ids.append(self.special_ids["<|assistant|>"])
+            ids.extend(self.encode("\n"))
+        else:
+            ids.append(self.eos_token_id)
+        return ids if tokenize else self.decode(ids)
+
+
+def tiny_random_model(seed=0, hidden_size=256, num_hidden_layers=4):
+    """
+    A small Phi-3 architecture model with random weights and a ByteTokenizer,
+    standing in for the real model on CPU-only test machines.
+    """
+    torch.random.manual_seed(seed)
+    tokenizer = ByteTokenizer()
+    config = Phi3Config(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_hidden_layers,
+        num_attention_heads=8,
+        num_key_value_heads=8,
+        max_position_embeddings=131072,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.special_ids["<s>"],
+        eos_token_id=tokenizer.eos_token_id,
+    )
+    return Phi3ForCausalLM(config).eval(), tokenizer
+
+
+@dataclass
+class GenerationStats:
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    generated_tokens: int = 0
+    time_to_first_token: Optional[float] = None
+    total_time: Optional[float] = None
+
+
+class GenerationStream:
+    """
+    Text of one request as it is generated. Iterating yields text deltas;
+    `stats` is complete once iteration has finished.
+    """
+
+    def __init__(self):
+        self.stats = GenerationStats()
+        self.error: Optional[BaseException] = None
+        self._chunks = queue.Queue()
+        self._parts = []
+
+    def _put(self, text):
+        self._chunks.put(text)
+
+    def _close(self, error=None):
+        self.error = error
+        self._chunks.put(None)
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                if self.error is not None:
+                    raise self.error
+                return
+            self._parts.append(chunk)
+            yield chunk
+
+    def text(self) -> str:
+        """Wait for the request to finish and return the full text."""
+        for _ in self:
+            pass
+        return "".join(self._parts)
+
+
+@dataclass
+class _Request:
+    messages: list
+    max_new_tokens: int
+    temperature: float
+    do_sample: bool
+    stream: GenerationStream
+    submitted_at: float
+    generated: list = field(default_factory=list)
+    emitted_text: str = ""
+    next_token: Optional[int] = None
+    length: int = 0  # tokens in the KV cache, without padding
+
+
+class Phi3GenerationServer:
+    """
+    Phi3GenerationServer serves many conversations from one model instance.
+
+    A background thread owns the model. Submitted requests are prefilled
+    individually (reusing cached prefixes), then merged into the running batch
+    by left-padding their KV cache to the batch length. Each decode step is a
+    single forward pass for the whole batch; finished requests are dropped
+    from the batch cache right away.
+
+        with Phi3GenerationServer(*load_model()) as server:
+            for text in server.submit(messages):
+                print(text, end="", flush=True)
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        *,
+        max_batch_size: int = 8,
+        batch_wait: float = 0.005,
+        prefix_cache_size: int = 16,
+    ):
+        """
+        Args:
+            model: Causal LM supporting DynamicCache, e.g. from load_model()
+            tokenizer: Tokenizer with a chat template
+            max_batch_size: Maximum number of requests decoded together
+            batch_wait: Seconds to wait for more requests when the batch is
+                idle, so that requests arriving together are grouped
+            prefix_cache_size: Number of prefix KV caches kept, 0 to disable
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait
+        self.prefix_cache_size = prefix_cache_size
+        self._prefix_cache: OrderedDict = OrderedDict()
+        self._requests: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        eos = model.generation_config.eos_token_id
+        eos = set(eos if isinstance(eos, (list, tuple)) else [eos])
+        eos.add(tokenizer.eos_token_id)
+        self._eos_token_ids = {token for token in eos if token is not None}
+
+        # Batch state, only touched by the serving thread
+        self._active: list[_Request] = []
+        self._cache: Optional[DynamicCache] = None
+        self._attention_mask: Optional[torch.Tensor] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._serve, name="phi3-server", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the serving thread. Running and queued requests fail with a RuntimeError."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._requests.put(None)
+            self._thread.join()
+            self._thread = None
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.stream._close(RuntimeError("Phi3GenerationServer stopped"))
+
+    def submit(self, messages, *, max_new_tokens=500, temperature=0.0, do_sample=False) -> GenerationStream:
+        """
+        Queue a conversation for generation and return its stream right away.
+        """
+        stream = GenerationStream()
+        self._requests.put(
+            _Request(
+                messages=messages,
+                max_new_tokens=max_new_tokens,
+                temperature=temperature,
+                do_sample=do_sample,
+                stream=stream,
+                submitted_at=time.perf_counter(),
+            )
+        )
+        return stream
+
+    def generate(self, messages, **generation_args) -> str:
+        return self.submit(messages, **generation_args).text()
+
+    # Serving thread
+
+    def _serve(self):
+        while not self._stopping.is_set():
+            try:
+                self._admit_requests()
+                if self._active:
+                    self._decode_step()
+            except Exception as e:
+                for request in self._active:
+                    request.stream._close(e)
+                self._reset_batch()
+
+        for request in self._active:
+            request.stream._close(RuntimeError("Phi3GenerationServer stopped"))
+        self._reset_batch()
+
+    def _admit_requests(self):
+        free = self.max_batch_size - len(self._active)
+        if free <= 0:
+            return
+        new_requests = []
+        if not self._active:
+            request = self._requests.get()
+            if request is None:
+                return
+            new_requests.append(request)
+            deadline = time.perf_counter() + self.batch_wait
+            while len(new_requests) < free:
+                try:
+                    request = self._requests.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    break
+                new_requests.append(request)
+        else:
+            while len(new_requests) < free:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    break
+                new_requests.append(request)
+
+        for request in new_requests:
+            try:
+                cache, logits = self._prefill(request)
+            except Exception as e:
+                request.stream._close(e)
+                continue
+            if self._accept_token(request, self._sample(logits, [request])[0]):
+                self._join_batch(request, cache)
+
+    @torch.no_grad()
+    def _prefill(self, request):
+        ids = list(self.tokenizer.apply_chat_template(
+            request.messages, add_generation_prompt=True, tokenize=True,
+        ))
+        prefix_ids = []
+        if self.prefix_cache_size and len(request.messages) > 1:
+            # The template closes a conversation without a generation prompt
+            # (Phi-3 appends <|endoftext|>), so the prefix is the part of the
+            # full conversation the earlier messages tokenize to
+            earlier_ids = self.tokenizer.apply_chat_template(request.messages[:-1], tokenize=True)
+            prefix_ids = ids[:min(_common_prefix_length(ids, earlier_ids), len(ids) - 1)]
+
+        cache = self._prefix_kv_cache(prefix_ids) if prefix_ids else DynamicCache()
+        suffix = torch.tensor([ids[len(prefix_ids):]], device=self.model.device)
+        output = self.model(input_ids=suffix, past_key_values=cache, use_cache=True)
+
+        request.stream.stats.prompt_tokens = len(ids)
+        request.stream.stats.cached_prompt_tokens = len(prefix_ids)
+        request.length = len(ids)
+        return output.past_key_values, output.logits[:, -1, :]
+
+    @torch.no_grad()
+    def _prefix_kv_cache(self, prefix_ids) -> DynamicCache:
+        """Copy of the KV cache of `prefix_ids`, computing and storing it on a miss."""
+        key = tuple(prefix_ids)
+        cache = self._prefix_cache.get(key)
+        if cache is None:
+            cache = DynamicCache()
+            self.model(
+                input_ids=torch.tensor([prefix_ids], device=self.model.device),
+                past_key_values=cache,
+                use_cache=True,
+            )
+            self._prefix_cache[key] = cache
+            while len(self._prefix_cache) > self.prefix_cache_size:
+                self._prefix_cache.popitem(last=False)
+        else:
+            self._prefix_cache.move_to_end(key)
+        return copy.deepcopy(cache)
+
+    def _join_batch(self, request, cache):
+        mask = torch.ones((1, request.length), dtype=torch.long, device=self.model.device)
+        if self._cache is None:
+            self._cache, self._attention_mask = cache, mask
+        else:
+            self._cache, self._attention_mask = _concat_left_padded(
+                self._cache, self._attention_mask, cache, mask,
+            )
+        self._active.append(request)
+
+    @torch.no_grad()
+    def _decode_step(self):
+        device = self.model.device
+        input_ids = torch.tensor([[r.next_token] for r in self._active], device=device)
+        position_ids = torch.tensor([[r.length] for r in self._active], device=device)
+        self._attention_mask = torch.cat(
+            [self._attention_mask, self._attention_mask.new_ones((len(self._active), 1))], dim=1,
+        )
+        output = self.model(
+            input_ids=input_ids,
+            attention_mask=self._attention_mask,
+            position_ids=position_ids,
+            past_key_values=self._cache,
+            use_cache=True,
+        )
+        self._cache = output.past_key_values
+        for request in self._active:
+            request.length += 1
+
+        tokens = self._sample(output.logits[:, -1, :], self._active)
+        keep = [i for i, (request, token) in enumerate(zip(self._active, tokens)) if self._accept_token(request, token)]
+        if len(keep) < len(self._active):
+            self._active = [self._active[i] for i in keep]
+            if not self._active:
+                self._reset_batch()
+            else:
+                self._cache, self._attention_mask = _select_rows(self._cache, self._attention_mask, keep)
+
+    def _sample(self, logits, requests) -> list[int]:
+        tokens = logits.argmax(dim=-1).tolist()
+        for row, request in enumerate(requests):
+            if request.do_sample and request.temperature > 0:
+                probs = torch.softmax(logits[row].float() / request.temperature, dim=-1)
+                tokens[row] = int(torch.multinomial(probs, 1))
+        return tokens
+
+    def _accept_token(self, request, token) -> bool:
+        """Record a sampled token and stream its text. Returns False when the request is done."""
+        stats = request.stream.stats
+        now = time.perf_counter()
+        if stats.time_to_first_token is None:
+            stats.time_to_first_token = now - request.submitted_at
+
+        finished = token in self._eos_token_ids
+        if not finished:
+            request.generated.append(token)
+            stats.generated_tokens += 1
+            text = self.tokenizer.decode(request.generated, skip_special_tokens=True)
+            # Hold back incomplete multi-byte characters until the next token
+            if not text.endswith("�") and len(text) > len(request.emitted_text):
+                request.stream._put(text[len(request.emitted_text):])
+                request.emitted_text = text
+            request.next_token = token
+            finished = len(request.generated) >= request.max_new_tokens
+
+        if finished:
+            # Nothing more is coming to complete a held back character
+            text = self.tokenizer.decode(request.generated, skip_special_tokens=True)
+            if len(text) > len(request.emitted_text):
+                request.stream._put(text[len(request.emitted_text):])
+                request.emitted_text = text
+            stats.total_time = now - request.submitted_at
+            request.stream._close()
+        return not finished
+
+    def _reset_batch(self):
+        self._active = []
+        self._cache = None
+        self._attention_mask = None
+
+
+def _common_prefix_length(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def _left_pad(tensor, length, dim):
+    missing = length - tensor.shape[dim]
+    if missing <= 0:
+        return tensor
+    shape = list(tensor.shape)
+    shape[dim] = missing
+    return torch.cat([tensor.new_zeros(shape), tensor], dim=dim)
+
+
+def _concat_left_padded(cache_a, mask_a, cache_b, mask_b):
+    """Stack two batch KV caches, left-padding the shorter one."""
+    length = max(mask_a.shape[1], mask_b.shape[1])
+    merged = DynamicCache()
+    for layer in range(len(cache_a.key_cache)):
+        merged.key_cache.append(torch.cat([
+            _left_pad(cache_a.key_cache[layer], length, -2),
+            _left_pad(cache_b.key_cache[layer], length, -2),
+        ]))
+        merged.value_cache.append(torch.cat([
+            _left_pad(cache_a.value_cache[layer], length, -2),
+            _left_pad(cache_b.value_cache[layer], length, -2),
+        ]))
+    merged._seen_tokens = length
+    mask = torch.cat([_left_pad(mask_a, length, 1), _left_pad(mask_b, length, 1)])
+    return merged, mask
+
+
+def _select_rows(cache, mask, rows):
+    """Keep `rows` of a batch KV cache and drop padding columns no row needs anymore."""
+    index = torch.tensor(rows, device=mask.device)
+    mask = mask.index_select(0, index)
+    start = int(mask.any(dim=0).nonzero()[0])
+    selected = DynamicCache()
+    for layer in range(len(cache.key_cache)):
+        selected.key_cache.append(cache.key_cache[layer].index_select(0, index)[..., start:, :])
+        selected.value_cache.append(cache.value_cache[layer].index_select(0, index)[..., start:, :])
+    selected._seen_tokens = mask.shape[1] - start
+    return selected, mask[:, start:]
+
+
+EXAMPLE_MESSAGES = [
+    {"role": "system", "content": "You are a helpful AI assistant."},
+    {"role": "user", "content": "Can you provide ways to eat combinations of bananas and dragonfruits?"},
+    {"role": "assistant", "content": "Sure! Here are some ways to eat bananas and dragonfruits together: 1. Banana and dragonfruit smoothie: Blend bananas and dragonfruits together with some milk and honey. 2. Banana and dragonfruit salad: Mix sliced bananas and dragonfruits together with some lemon juice and honey."},
+    {"role": "user", "content": "What about solving an 2x + 3 = 7 equation?"},
+]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tiny", action="store_true", help="Use a tiny random-weight model")
+    parser.add_argument("--device-map", default="cpu")
+    args = parser.parse_args()
+
+    model, tokenizer = tiny_random_model() if args.tiny else load_model(device_map=args.device_map)
+    with Phi3GenerationServer(model, tokenizer) as server:
+        stream = server.submit(EXAMPLE_MESSAGES, max_new_tokens=500)
+        for text in stream:
+            print(text, end="", flush=True)
+        print()
+        print(stream.stats)
@@ -0,0 +1,269 @@
+"""
+Async driver for the llama-index ReAct AgentRunner used by the Chainlit apps
+(react_chainlit_example.py, react_chainlit_basic.py).
+
+Steps run through AgentRunner.astream_step on the event loop, so an LLM call
+only suspends its own session instead of occupying a worker thread, and the
+final answer can be streamed token by token. Nothing here depends on a
+Chainlit context, so load tests can drive sessions directly.
+
+AgentRegistry builds the LLM client, tools and agent worker once per process;
+each session only gets its own AgentRunner (task table and chat memory)
+around them.
+"""
+import asyncio
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Collection, List, Optional, Sequence
+
+from llama_index.core.agent import AgentRunner, ReActAgentWorker
+from llama_index.core.agent.react.types import (
+    ActionReasoningStep,
+    ObservationReasoningStep,
+    ResponseReasoningStep,
+)
+from llama_index.core.base.llms.types import ChatMessage
+from llama_index.core.callbacks.base_handler import BaseCallbackHandler
+from llama_index.core.chat_engine.types import StreamingAgentChatResponse
+from llama_index.core.llms import LLM
+from llama_index.core.memory import ChatMemoryBuffer
+from llama_index.core.tools import BaseTool, FunctionTool
+
+from react_cache import CachedLLM, CachedTool, TTLCache
+from react_parallel import ParallelActionReasoningStep
+
+# Messages of one chat session processed at the same time; later ones wait
+MAX_TASKS_PER_SESSION = 1
+
+
+@dataclass
+class AgentStep:
+    """
+    One completed step of an agent task.
+
+    `reasoning` holds the ReAct reasoning steps (thought/action, observation,
+    answer) added by this step. For a streamed final answer `tokens` yields
+    its text as it arrives, and must be consumed before the task is finalized.
+    `trace` is the react_tracing.StepTrace of the step, when traced.
+    """
+    number: int
+    output: Any
+    reasoning: list
+    tokens: Optional[AsyncIterator[str]] = None
+    trace: Optional[Any] = None
+
+    @property
+    def is_last(self) -> bool:
+        return self.output.is_last
+
+
+class AgentRegistry:
+    """
+    LLM client, tools and ReAct agent worker shared by every chat session.
+
+    They are built on first use from `llm_factory` and `tools` (BaseTool
+    instances, or plain functions wrapped with FunctionTool.from_defaults).
+    The worker keeps the state of a task in the Task object itself, so one
+    worker can serve all sessions, and the single LLM client reuses its HTTP
+    connection pool across them. `new_runner` then only creates the per
+    session AgentRunner, with its own task table and chat memory.
+
+    Results of tools can be memoized in `tool_cache` (all tools, or only
+    those named in `cached_tools`), and LLM responses at temperature 0 in
+    `llm_cache`; see react_cache.py. `callback_handlers`, e.g. a
+    react_tracing.StepTracer, see the LLM and tool calls of every session.
+
+    Usage:
+        agent_registry = AgentRegistry(lambda: OpenAI(model="gpt-4"), [add, multiply])
+        ...
+        agent_runner = agent_registry.new_runner()
+    """
+
+    def __init__(
+        self,
+        llm_factory: Callable[[], LLM],
+        tools: Sequence[Any],
+        worker_cls: type = ReActAgentWorker,
+        *,
+        tool_cache: Optional[TTLCache] = None,
+        cached_tools: Optional[Collection[str]] = None,
+        llm_cache: Optional[TTLCache] = None,
+        callback_handlers: Sequence[BaseCallbackHandler] = (),
+        **worker_kwargs: Any,
+    ) -> None:
+        self._callback_handlers = list(callback_handlers)
+        self._llm_factory = llm_factory
+        self.tool_cache = tool_cache
+        self._cached_tools = set(cached_tools) if cached_tools is not None else None
+        self.llm_cache = llm_cache
+        self._tool_specs = list(tools)
+        self._worker_cls = worker_cls
+        self._worker_kwargs = worker_kwargs
+        self._lock = threading.Lock()
+        self._llm: Optional[LLM] = None
+        self._tools: Optional[List[BaseTool]] = None
+        self._agent_worker = None
+        self._memory_token_limit: Optional[int] = None
+
+    def _build(self) -> None:
+        with self._lock:
+            if self._agent_worker is not None:
+                return
+            llm = self._llm_factory()
+            # The agent worker reports its tool calls to the LLM's callback manager
+            for handler in self._callback_handlers:
+                llm.callback_manager.add_handler(handler)
+            if self.llm_cache is not None:
+                llm = CachedLLM(llm, self.llm_cache)
+            tools = [
+                tool if isinstance(tool, BaseTool) else FunctionTool.from_defaults(fn=tool)
+                for tool in self._tool_specs
+            ]
+            if self.tool_cache is not None:
+                tools = [
+                    CachedTool(tool, self.tool_cache)
+                    if self._cached_tools is None or tool.metadata.get_name() in self._cached_tools
+                    else tool
+                    for tool in tools
+                ]
+            agent_worker = self._worker_cls.from_tools(tools, llm=llm, **self._worker_kwargs)
+            # Same limit ChatMemoryBuffer.from_defaults derives from the LLM
+            self._memory_token_limit = ChatMemoryBuffer.from_defaults(llm=llm).token_limit
+            self._llm, self._tools = llm, tools
+            self._agent_worker = agent_worker
+
+    @property
+    def llm(self) -> LLM:
+        if self._agent_worker is None:
+            self._build()
+        return self._llm
+
+    @property
+    def tools(self) -> List[BaseTool]:
+        if self._agent_worker is None:
+            self._build()
+        return self._tools
+
+    @property
+    def agent_worker(self):
+        if self._agent_worker is None:
+            self._build()
+        return self._agent_worker
+
+    def new_runner(self, chat_history: Optional[List[ChatMessage]] = None) -> AgentRunner:
+        """AgentRunner for one session, around the shared agent worker."""
+        agent_worker = self.agent_worker
+        memory = ChatMemoryBuffer.from_defaults(chat_history, token_limit=self._memory_token_limit)
+        return AgentRunner(agent_worker=agent_worker, memory=memory)
+
+    def cache_summary(self) -> str:
+        """Hit rates of the caches in use, e.g. for step messages; "" without caches."""
+        parts = []
+        if self.tool_cache is not None:
+            parts.append(f"tool cache hits {self.tool_cache.summary()}")
+        if self.llm_cache is not None:
+            parts.append(f"LLM cache hits {self.llm_cache.summary()}")
+        return ", ".join(parts)
+
+
+def hide_deprecation_warnings() -> None:
+    """
+    Stop showing DeprecationWarnings, e.g. in load tests.
+
+    AgentRunner and ReActAgentWorker install their own "once" filter for their
+    deprecation warning inside catch_warnings, which resets it, so the warning
+    is printed on every construction whatever filters are set. Only dropping
+    it when shown keeps it quiet.
+    """
+    show = warnings.showwarning
+    if getattr(show, "hides_deprecation", False):
+        return
+
+    def showwarning(message, category, *args, **kwargs):
+        if not issubclass(category, DeprecationWarning):
+            show(message, category, *args, **kwargs)
+
+    showwarning.hides_deprecation = True
+    warnings.showwarning = showwarning
+
+
+def session_semaphore(user_session, max_tasks: int = MAX_TASKS_PER_SESSION) -> asyncio.Semaphore:
+    """
+    Semaphore limiting the tasks running at once for one chat session,
+    created on first use and kept in `user_session` (e.g. cl.user_session).
+    """
+    semaphore = user_session.get("task_semaphore")
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_tasks)
+        user_session.set("task_semaphore", semaphore)
+    return semaphore
+
+
+async def _stream_tokens(response: StreamingAgentChatResponse, step_trace=None) -> AsyncIterator[str]:
+    async for token in response.async_response_gen():
+        yield token
+    if step_trace is not None:
+        step_trace.finish()
+
+
+async def iter_agent_steps(agent_runner, task, task_trace=None) -> AsyncIterator[AgentStep]:
+    """
+    Run the steps of `task` until the last one, yielding each as it completes.
+
+    With a `task_trace` (react_tracing.StepTracer.trace_task) each step is
+    traced: `step.trace` holds its spans while the caller handles the step,
+    and it is exported once the caller moves on to the next one.
+
+    Usage:
+        task = agent_runner.create_task(message)
+        async for step in iter_agent_steps(agent_runner, task):
+            ...
+        response = await agent_runner.afinalize_response(task.task_id)
+    """
+    current_reasoning = task.extra_state["current_reasoning"]
+    number = 0
+    while True:
+        seen = len(current_reasoning)
+        number += 1
+        step_trace = task_trace.start_step(number) if task_trace is not None else None
+        step_output = await agent_runner.astream_step(task.task_id)
+
+        tokens = None
+        if step_output.is_last and isinstance(step_output.output, StreamingAgentChatResponse):
+            # The step lasts until its answer is streamed
+            tokens = _stream_tokens(step_output.output, step_trace)
+        elif step_trace is not None:
+            step_trace.finish()
+
+        yield AgentStep(
+            number=number,
+            output=step_output,
+            reasoning=list(current_reasoning[seen:]),
+            tokens=tokens,
+            trace=step_trace,
+        )
+        if step_trace is not None:
+            task_trace.finish_step(step_trace)
+        if step_output.is_last:
+            return
+
+
+def format_reasoning(reasoning: list) -> str:
+    """Markdown for the reasoning steps of one agent step."""
+    parts = []
+    for reasoning_step in reasoning:
+        if isinstance(reasoning_step, ActionReasoningStep):
+            parts.append(f"**Thought**: {reasoning_step.thought}")
+            parts.append(f"**Action**: {reasoning_step.action}: {reasoning_step.action_input}")
+        elif isinstance(reasoning_step, ParallelActionReasoningStep):
+            parts.append(f"**Thought**: {reasoning_step.thought}")
+            for action in reasoning_step.actions:
+                parts.append(f"**Action**: {action.action}: {action.action_input}")
+        elif isinstance(reasoning_step, ObservationReasoningStep):
+            # Hard line breaks keep the lines of a merged observation apart
+            observation = reasoning_step.observation.replace("\n", "  \n")
+            parts.append(f"**Observation**: {observation}")
+        elif isinstance(reasoning_step, ResponseReasoningStep):
+            parts.append(f"**Thought**: {reasoning_step.thought}")
+    return "\n\n".join(parts)
@@ -0,0 +1,299 @@
+"""
+Opt-in memoization for the ReAct agent of the Chainlit apps.
+
+Repeated questions make the agent call the same deterministic tools with the
+same arguments, and send the LLM the same prompts, again. Two caches sit in
+front of them:
+
+    CachedTool   wraps a tool; results are keyed by tool name and the
+                 arguments as canonical JSON
+    CachedLLM    wraps an LLM; responses are keyed by a hash of the messages
+                 (or prompt) and the model parameters, and only cached when
+                 the temperature is 0
+
+Both store their entries in a TTLCache, which expires them after `ttl`
+seconds, evicts the least recently used beyond `maxsize` and counts hits and
+misses. AgentRegistry(tool_cache=..., llm_cache=...) sets them up.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Generator, Hashable, Optional, Sequence
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseAsyncGen,
+    CompletionResponseGen,
+    LLMMetadata,
+)
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import LLM
+from llama_index.core.tools import BaseTool, ToolMetadata, ToolOutput
+from llama_index.core.tools.types import AsyncBaseTool, adapt_to_async_tool
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after being set.
+
+    Args:
+        maxsize: Most entries kept; the least recently used are evicted first
+        ttl: Seconds an entry stays valid, None for no expiry
+        clock: Time source, time.monotonic by default
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > self._clock()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def summary(self) -> str:
+        """E.g. "75% of 8 lookups"."""
+        return f"{self.hit_rate:.0%} of {self.lookups} lookups"
+
+
+def canonical_json(value: Any) -> str:
+    """JSON with sorted keys and no whitespace, equal for equal arguments."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class CachedTool(AsyncBaseTool):
+    """
+    Tool returning cached results for arguments it was already called with.
+
+    Only meant for deterministic tools. Error outputs are not cached.
+    """
+
+    def __init__(self, tool: BaseTool, cache: TTLCache) -> None:
+        self.tool = adapt_to_async_tool(tool)
+        self.cache = cache
+
+    @property
+    def metadata(self) -> ToolMetadata:
+        return self.tool.metadata
+
+    def _key(self, kwargs: dict) -> tuple[str, str, str]:
+        return ("tool", self.metadata.get_name(), canonical_json(kwargs))
+
+    def call(self, **kwargs: Any) -> ToolOutput:
+        key = self._key(kwargs)
+        tool_output = self.cache.get(key, _MISSING)
+        if tool_output is _MISSING:
+            tool_output = self.tool.call(**kwargs)
+            if not tool_output.is_error:
+                self.cache.set(key, tool_output)
+        return tool_output
+
+    async def acall(self, **kwargs: Any) -> ToolOutput:
+        key = self._key(kwargs)
+        tool_output = self.cache.get(key, _MISSING)
+        if tool_output is _MISSING:
+            tool_output = await self.tool.acall(**kwargs)
+            if not tool_output.is_error:
+                self.cache.set(key, tool_output)
+        return tool_output
+
+
+class CachedLLM(LLM):
+    """
+    LLM answering repeated prompts from a cache.
+
+    Wraps `llm` and forwards every call to it, except that while the
+    temperature of `llm` is 0 responses are cached by a hash of the messages
+    or prompt, the call arguments and the model parameters. A cached
+    response to a streaming call is replayed as one chunk; a stream is only
+    cached once it has been read to the end.
+    """
+
+    llm: LLM = Field(description="The wrapped LLM.")
+    _cache: TTLCache = PrivateAttr()
+
+    def __init__(self, llm: LLM, cache: TTLCache, **kwargs: Any) -> None:
+        super().__init__(llm=llm, callback_manager=llm.callback_manager, **kwargs)
+        self._cache = cache
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "cached_llm"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return self.llm.metadata
+
+    @property
+    def cache(self) -> TTLCache:
+        return self._cache
+
+    def _key(self, kind: str, payload: Any, kwargs: dict) -> Optional[str]:
+        """Cache key, or None if responses must not be cached."""
+        if getattr(self.llm, "temperature", None) != 0:
+            return None
+        params = {
+            "class": self.llm.class_name(),
+            "model": self.llm.metadata.model_name,
+            "max_tokens": getattr(self.llm, "max_tokens", None),
+            "additional_kwargs": getattr(self.llm, "additional_kwargs", None),
+            "kwargs": kwargs,
+        }
+        digest = hashlib.sha256(canonical_json([kind, payload, params]).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _messages(messages: Sequence[ChatMessage]) -> list:
+        return [(message.role.value, message.content, message.additional_kwargs) for message in messages]
+
+    def _lookup(self, key: Optional[str]) -> Any:
+        return self._cache.get(key, _MISSING) if key is not None else _MISSING
+
+    def _store(self, key: Optional[str], value: Any) -> None:
+        if key is not None:
+            self._cache.set(key, value)
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        key = self._key("chat", self._messages(messages), kwargs)
+        message = self._lookup(key)
+        if message is not _MISSING:
+            return ChatResponse(message=message.model_copy())
+        response = self.llm.chat(messages, **kwargs)
+        self._store(key, response.message.model_copy())
+        return response
+
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        key = self._key("chat", self._messages(messages), kwargs)
+        message = self._lookup(key)
+        if message is not _MISSING:
+            return ChatResponse(message=message.model_copy())
+        response = await self.llm.achat(messages, **kwargs)
+        self._store(key, response.message.model_copy())
+        return response
+
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        key = self._key("chat", self._messages(messages), kwargs)
+        message = self._lookup(key)
+        if message is not _MISSING:
+            return iter([ChatResponse(message=message.model_copy(), delta=message.content)])
+        stream = self.llm.stream_chat(messages, **kwargs)
+
+        def gen() -> Generator[ChatResponse, None, None]:
+            response = None
+            for response in stream:
+                yield response
+            if response is not None:
+                self._store(key, response.message.model_copy())
+
+        return gen()
+
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        key = self._key("chat", self._messages(messages), kwargs)
+        message = self._lookup(key)
+        stream = None if message is not _MISSING else await self.llm.astream_chat(messages, **kwargs)
+
+        async def gen() -> AsyncGenerator[ChatResponse, None]:
+            if stream is None:
+                yield ChatResponse(message=message.model_copy(), delta=message.content)
+                return
+            response = None
+            async for response in stream:
+                yield response
+            if response is not None:
+                self._store(key, response.message.model_copy())
+
+        return gen()
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        key = self._key("complete", [prompt, formatted], kwargs)
+        text = self._lookup(key)
+        if text is not _MISSING:
+            return CompletionResponse(text=text)
+        response = self.llm.complete(prompt, formatted=formatted, **kwargs)
+        self._store(key, response.text)
+        return response
+
+    async def acomplete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        key = self._key("complete", [prompt, formatted], kwargs)
+        text = self._lookup(key)
+        if text is not _MISSING:
+            return CompletionResponse(text=text)
+        response = await self.llm.acomplete(prompt, formatted=formatted, **kwargs)
+        self._store(key, response.text)
+        return response
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        key = self._key("complete", [prompt, formatted], kwargs)
+        text = self._lookup(key)
+        if text is not _MISSING:
+            return iter([CompletionResponse(text=text, delta=text)])
+        stream = self.llm.stream_complete(prompt, formatted=formatted, **kwargs)
+
+        def gen() -> Generator[CompletionResponse, None, None]:
+            response = None
+            for response in stream:
+                yield response
+            if response is not None:
+                self._store(key, response.text)
+
+        return gen()
+
+    async def astream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseAsyncGen:
+        key = self._key("complete", [prompt, formatted], kwargs)
+        text = self._lookup(key)
+        stream = None if text is not _MISSING else await self.llm.astream_complete(prompt, formatted=formatted, **kwargs)
+
+        async def gen() -> AsyncGenerator[CompletionResponse, None]:
+            if stream is None:
+                yield CompletionResponse(text=text, delta=text)
+                return
+            response = None
+            async for response in stream:
+                yield response
+            if response is not None:
+                self._store(key, response.text)
+
+        return gen()
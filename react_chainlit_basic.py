@@ -1,7 +1,10 @@
+import time
+
 import chainlit as cl
-from llama_index.core.agent import AgentRunner, ReActAgentWorker
 from llama_index.llms.openai import OpenAI
-from llama_index.core.tools import FunctionTool
+
+from react_agent import AgentRegistry, iter_agent_steps, session_semaphore
+from react_tracing import JsonlSpanSink, StepTracer
 
 # Define sample tools
 def add(a: int, b: int) -> int:
@@ -12,18 +15,20 @@ def multiply(a: int, b: int) -> int:
     """Multiplies two integers and returns the result integer"""
     return a * b
 
+# Timings of every agent step, also appended to react_spans.jsonl for offline profiling
+step_tracer = StepTracer(JsonlSpanSink("react_spans.jsonl"))
+
+# LLM client, tools and agent worker are built once and shared by all sessions
+agent_registry = AgentRegistry(
+    lambda: OpenAI(model="gpt-4"),
+    [add, multiply],
+    callback_handlers=[step_tracer],
+)
+
 @cl.on_chat_start
 async def on_chat_start():
-    # Initialize LLM
-    llm = OpenAI(model="gpt-4")
-    
-    # Create function tools
-    add_tool = FunctionTool.from_defaults(fn=add)
-    multiply_tool = FunctionTool.from_defaults(fn=multiply)
-    
-    # Initialize the agent worker and runner
-    agent_worker = ReActAgentWorker.from_tools([add_tool, multiply_tool], llm=llm)
-    agent_runner = AgentRunner(agent_worker=agent_worker)
+    # Each session only gets its own runner (tasks and chat memory)
+    agent_runner = agent_registry.new_runner()
     
     # Store in user session
     cl.user_session.set("agent_runner", agent_runner)
@@ -33,40 +38,40 @@ async def on_message(message: cl.Message):
     # Get the agent runner from the session
     agent_runner = cl.user_session.get("agent_runner")
     
-    # Create a task with the user's message
-    task = await cl.make_async(agent_runner.create_task)(message.content)
-    
-    # Show thinking header
-    thinking_msg = cl.Message(content="🤔 Processing your request...")
-    await thinking_msg.send()
-    
-    # Process steps asynchronously
-    is_done = False
-    step_count = 1
-    
-    while not is_done:
-        # Run a single step asynchronously
-        step_output = await cl.make_async(agent_runner.run_step)(task.task_id)
+    # Steps run on the event loop; messages of the same session wait their turn
+    queued_at = time.perf_counter()
+    async with session_semaphore(cl.user_session):
+        # Create a task with the user's message
+        task = agent_runner.create_task(message.content)
+        task_trace = step_tracer.trace_task(
+            task,
+            session_id=cl.user_session.get("id"),
+            queue_delay=time.perf_counter() - queued_at,
+        )
         
-        # Create a message with the complete step output text
-        step_content = f"**Step {step_count}**\n\n"
+        # Show thinking header
+        thinking_msg = cl.Message(content="🤔 Processing your request...")
+        await thinking_msg.send()
         
-        # Convert the complete step_output to string
-        # This includes all the information without manually extracting components
-        step_content += f"``````"
+        async for step in iter_agent_steps(agent_runner, task, task_trace):
+            # Create a message with the complete step output text
+            step_content = f"**Step {step.number}**\n\n"
+            step_content += f"```\n{step.output}\n```"
+            
+            step_msg = cl.Message(content=step_content, parent_id=thinking_msg.id)
+            if step.tokens is not None:
+                # Stream the final answer into the step message as it arrives
+                await step_msg.stream_token("\n\n**Answer**: ")
+                async for token in step.tokens:
+                    await step_msg.stream_token(token)
+            
+            # Add where the step's time went, then send the step message
+            step_msg.content += f"\n\n_{step.trace.summary()}_"
+            with step.trace.span("send"):
+                await step_msg.send()
         
-        # Send the step message
-        step_msg = cl.Message(content=step_content, parent_id=thinking_msg.id)
-        await step_msg.send()
-        
-        # Increment step counter
-        step_count += 1
-        
-        # Check if this is the last step
-        is_done = step_output.is_last
-    
-    # Get final response
-    final_response = await cl.make_async(agent_runner.finalize_response)(task.task_id)
+        # Get final response
+        final_response = await agent_runner.afinalize_response(task.task_id)
     
     # Send the final answer
     final_msg = cl.Message(content=f"**Final Answer**: {str(final_response)}")
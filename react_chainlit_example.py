@@ -1,7 +1,9 @@
 import chainlit as cl
-from llama_index.core.agent import AgentRunner, ReActAgentWorker
 from llama_index.llms.openai import OpenAI
-from llama_index.core.tools import FunctionTool
+
+from react_agent import AgentRegistry, format_reasoning, iter_agent_steps, session_semaphore
+from react_cache import TTLCache
+from react_parallel import ParallelReActAgentWorker
 
 # Define sample tools
 def add(a: int, b: int) -> int:
@@ -12,18 +14,22 @@ def multiply(a: int, b: int) -> int:
     """Multiplies two integers and returns the result integer"""
     return a * b
 
+# LLM client, tools and agent worker are built once and shared by all sessions;
+# independent tool calls of one step run concurrently. Tool results and, at
+# temperature 0, LLM responses are cached for an hour
+agent_registry = AgentRegistry(
+    lambda: OpenAI(model="gpt-4", temperature=0),
+    [add, multiply],
+    worker_cls=ParallelReActAgentWorker,
+    tool_timeout=30.0,
+    tool_cache=TTLCache(maxsize=4096, ttl=3600),
+    llm_cache=TTLCache(maxsize=1024, ttl=3600),
+)
+
 @cl.on_chat_start
 async def on_chat_start():
-    # Initialize LLM
-    llm = OpenAI(model="gpt-4")
-    
-    # Create function tools
-    add_tool = FunctionTool.from_defaults(fn=add)
-    multiply_tool = FunctionTool.from_defaults(fn=multiply)
-    
-    # Initialize the agent worker and runner
-    agent_worker = ReActAgentWorker.from_tools([add_tool, multiply_tool], llm=llm)
-    agent_runner = AgentRunner(agent_worker=agent_worker)
+    # Each session only gets its own runner (tasks and chat memory)
+    agent_runner = agent_registry.new_runner()
     
     # Store in user session
     cl.user_session.set("agent_runner", agent_runner)
@@ -33,47 +39,35 @@ async def on_message(message: cl.Message):
     # Get the agent runner from the session
     agent_runner = cl.user_session.get("agent_runner")
     
-    # Create a task with the user's message
-    task = await cl.make_async(agent_runner.create_task)(message.content)
-    
-    # Show thinking header
-    thinking_msg = cl.Message(content="🤔 Thinking step by step...")
-    await thinking_msg.send()
-    
-    # Process steps asynchronously
-    is_done = False
-    step_messages = []
-    
-    while not is_done:
-        # Run a single step asynchronously
-        step_output = await cl.make_async(agent_runner.run_step)(task.task_id)
-        
-        # Create a message for this step
-        step_content = f"**Step {len(step_messages) + 1}**\n\n"
-        
-        # Add thought if available
-        if hasattr(step_output, 'thought') and step_output.thought:
-            step_content += f"**Thought**: {step_output.thought}\n\n"
+    # Steps run on the event loop; messages of the same session wait their turn
+    async with session_semaphore(cl.user_session):
+        # Create a task with the user's message
+        task = agent_runner.create_task(message.content)
         
-        # Add action if available
-        if hasattr(step_output, 'action') and step_output.action:
-            action_str = f"{step_output.action.tool}: {step_output.action.tool_input}"
-            step_content += f"**Action**: {action_str}\n\n"
+        # Show thinking header
+        thinking_msg = cl.Message(content="🤔 Thinking step by step...")
+        await thinking_msg.send()
         
-        # Add observation if available
-        if hasattr(step_output, 'observation') and step_output.observation:
-            step_content += f"**Observation**: {step_output.observation}\n\n"
+        async for step in iter_agent_steps(agent_runner, task):
+            # Create a message for this step
+            step_content = f"**Step {step.number}**\n\n"
+            step_content += format_reasoning(step.reasoning)
+            cache_summary = agent_registry.cache_summary()
+            if cache_summary:
+                step_content += f"\n\n_{cache_summary}_"
+            
+            step_msg = cl.Message(content=step_content, parent_id=thinking_msg.id)
+            if step.tokens is not None:
+                # Stream the final answer into the step message as it arrives
+                await step_msg.stream_token("\n\n**Answer**: ")
+                async for token in step.tokens:
+                    await step_msg.stream_token(token)
+            
+            # Send the step message
+            await step_msg.send()
         
-        # Send the step message
-        step_msg = cl.Message(content=step_content, parent_id=thinking_msg.id)
-        await step_msg.send()
-        step_messages.append(step_msg)
-        
-        # Check if this is the last step
-        is_done = step_output.is_last
-    
-    # Get final response
-    final_response = await cl.make_async(agent_runner.finalize_response)(task.task_id)
+        # Get final response
+        final_response = await agent_runner.afinalize_response(task.task_id)
     
     # Send the final answer
     final_msg = cl.Message(content=f"**Final Answer**: {str(final_response)}")
@@ -0,0 +1,396 @@
+"""
+ReAct agent worker running several independent tool calls of one reasoning
+step concurrently.
+
+The stock ReActAgentWorker runs a single Action per step, so looking up N
+companies costs N LLM round trips plus N sequential tool calls. With
+ParallelReActAgentWorker the LLM may list several Action/Action Input pairs
+after one Thought. They run at the same time (coroutine tools on the event
+loop, plain function tools in a thread pool), each under its own timeout, and
+come back as one observation with a numbered line per action, in the order
+they were asked for. A step with a single action behaves like the stock one.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from llama_index.core.agent import ReActAgentWorker
+from llama_index.core.agent.react.formatter import ReActChatFormatter
+from llama_index.core.agent.react.output_parser import ReActOutputParser, parse_action_reasoning_step
+from llama_index.core.agent.react.prompts import REACT_CHAT_SYSTEM_HEADER
+from llama_index.core.agent.react.types import (
+    ActionReasoningStep,
+    BaseReasoningStep,
+    ObservationReasoningStep,
+)
+from llama_index.core.agent.types import Task
+from llama_index.core.base.llms.types import ChatResponse
+from llama_index.core.callbacks import CBEventType, EventPayload
+from llama_index.core.instrumentation import get_dispatcher
+from llama_index.core.instrumentation.events.agent import AgentToolCallEvent
+from llama_index.core.llms.llm import LLM
+from llama_index.core.settings import Settings
+from llama_index.core.tools import BaseTool, FunctionTool, ToolOutput
+from llama_index.core.tools.types import AsyncBaseTool, BaseToolAsyncAdapter
+from llama_index.core.utils import print_text
+
+from react_cache import CachedTool
+
+dispatcher = get_dispatcher(__name__)
+
+# Seconds a tool call may take before its observation becomes a timeout error
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+PARALLEL_ACTIONS_PROMPT = """## Parallel Tool Use
+
+If you need several tool calls that do not depend on each other's results, you may request them all at once: write one Thought, then one Action and Action Input pair per call, one after the other:
+
+```
+Thought: I need to look up both companies, which I can do at the same time.
+Action: tool name
+Action Input: {{"input": "first"}}
+Action: tool name
+Action Input: {{"input": "second"}}
+```
+
+The tools are then run in parallel and you get a single Observation with one numbered line per action, in the same order. Only request calls in the same response when none of them needs the result of another.
+
+"""
+
+PARALLEL_REACT_CHAT_SYSTEM_HEADER = REACT_CHAT_SYSTEM_HEADER.replace(
+    "## Current Conversation", PARALLEL_ACTIONS_PROMPT + "## Current Conversation"
+)
+
+_ACTION_LINE = re.compile(r"^[ \t]*Action: ", re.MULTILINE)
+
+
+class ParallelActionReasoningStep(BaseReasoningStep):
+    """Several actions requested after one thought."""
+
+    thought: str
+    actions: List[ActionReasoningStep]
+
+    def get_content(self) -> str:
+        """Get content."""
+        lines = [f"Thought: {self.thought}"]
+        for action in self.actions:
+            lines.append(f"Action: {action.action}")
+            lines.append(f"Action Input: {action.action_input}")
+        return "\n".join(lines)
+
+    @property
+    def is_done(self) -> bool:
+        """Is the reasoning step the last one."""
+        return False
+
+
+class ParallelReActOutputParser(ReActOutputParser):
+    """
+    ReAct output parser that also accepts several Action/Action Input pairs,
+    returned as a ParallelActionReasoningStep. Anything else is parsed like
+    ReActOutputParser does.
+    """
+
+    def parse(self, output: str, is_streaming: bool = False) -> BaseReasoningStep:
+        blocks = _ACTION_LINE.split(output)
+        if len(blocks) <= 2:
+            return super().parse(output, is_streaming)
+
+        thought = blocks[0].strip()
+        if thought.startswith("Thought:"):
+            thought = thought[len("Thought:"):].strip()
+        actions = [
+            parse_action_reasoning_step(f"Thought: {thought}\nAction: {block}")
+            for block in blocks[1:]
+        ]
+        return ParallelActionReasoningStep(thought=thought, actions=actions)
+
+
+def _runs_in_thread(tool: AsyncBaseTool) -> bool:
+    """Whether a tool wraps a plain function, so calling it blocks."""
+    if isinstance(tool, CachedTool):
+        return _runs_in_thread(tool.tool)
+    if isinstance(tool, FunctionTool):
+        return not inspect.iscoroutinefunction(tool.real_fn)
+    return isinstance(tool, BaseToolAsyncAdapter)
+
+
+class ParallelReActAgentWorker(ReActAgentWorker):
+    """
+    ReActAgentWorker running the actions of one step concurrently.
+
+    Args:
+        tool_timeout: Seconds each tool call may take, None for no limit
+        tool_timeouts: Timeouts of specific tools by name, overriding
+            `tool_timeout`
+        max_tool_workers: Size of the thread pool for function tools
+
+    A tool call running in a thread cannot be interrupted: on timeout its
+    result is dropped, but the thread finishes the call.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        llm: LLM,
+        *,
+        tool_timeout: Optional[float] = DEFAULT_TOOL_TIMEOUT,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+        max_tool_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        if kwargs.get("react_chat_formatter") is None:
+            kwargs["react_chat_formatter"] = ReActChatFormatter.from_defaults(
+                system_header=PARALLEL_REACT_CHAT_SYSTEM_HEADER
+            )
+        if kwargs.get("output_parser") is None:
+            kwargs["output_parser"] = ParallelReActOutputParser()
+        super().__init__(tools, llm, **kwargs)
+        self._tool_timeout = tool_timeout
+        self._tool_timeouts = dict(tool_timeouts or {})
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=max_tool_workers, thread_name_prefix="react-tool"
+        )
+
+    @classmethod
+    def from_tools(
+        cls,
+        tools: Optional[Sequence[BaseTool]] = None,
+        llm: Optional[LLM] = None,
+        *,
+        tool_timeout: Optional[float] = DEFAULT_TOOL_TIMEOUT,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+        max_tool_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> "ParallelReActAgentWorker":
+        """
+        Same as ReActAgentWorker.from_tools, plus the tool timeouts and
+        thread pool size.
+        """
+        llm = llm or Settings.llm
+        if kwargs.get("callback_manager") is not None:
+            llm.callback_manager = kwargs["callback_manager"]
+        return cls(
+            tools=tools or [],
+            llm=llm,
+            tool_timeout=tool_timeout,
+            tool_timeouts=tool_timeouts,
+            max_tool_workers=max_tool_workers,
+            **kwargs,
+        )
+
+    def _timeout_for(self, tool: AsyncBaseTool) -> Optional[float]:
+        return self._tool_timeouts.get(tool.metadata.get_name(), self._tool_timeout)
+
+    def _extract_reasoning_step(
+        self, output: ChatResponse, is_streaming: bool = False
+    ) -> Tuple[str, List[BaseReasoningStep], bool]:
+        if output.message.content is None:
+            raise ValueError("Got empty message.")
+        message_content = output.message.content
+
+        try:
+            reasoning_step = self._output_parser.parse(message_content, is_streaming)
+        except BaseException as exc:
+            raise ValueError(f"Could not parse output: {message_content}") from exc
+        if self._verbose:
+            print_text(f"{reasoning_step.get_content()}\n", color="pink")
+
+        if not reasoning_step.is_done and not isinstance(
+            reasoning_step, (ActionReasoningStep, ParallelActionReasoningStep)
+        ):
+            raise ValueError(f"Expected ActionReasoningStep, got {reasoning_step}")
+        return message_content, [reasoning_step], reasoning_step.is_done
+
+    @staticmethod
+    def _error_output(tool: AsyncBaseTool, action: ActionReasoningStep, error: Exception, content: str) -> ToolOutput:
+        return ToolOutput(
+            content=content,
+            tool_name=tool.metadata.get_name(),
+            raw_input={"kwargs": action.action_input},
+            raw_output=error,
+            is_error=True,
+        )
+
+    def _timeout_output(self, tool: AsyncBaseTool, action: ActionReasoningStep) -> ToolOutput:
+        content = f"Error: {tool.metadata.get_name()} timed out after {self._timeout_for(tool)} s"
+        return self._error_output(tool, action, TimeoutError(content), content)
+
+    def _call_tool(self, tool: AsyncBaseTool, action: ActionReasoningStep) -> ToolOutput:
+        """Blocking call of one tool, with the callback events of ReActAgentWorker."""
+        with self.callback_manager.event(
+            CBEventType.FUNCTION_CALL,
+            payload={
+                EventPayload.FUNCTION_CALL: action.action_input,
+                EventPayload.TOOL: tool.metadata,
+            },
+        ) as event:
+            try:
+                dispatcher.event(
+                    AgentToolCallEvent(
+                        arguments=json.dumps({**action.action_input}),
+                        tool=tool.metadata,
+                    )
+                )
+                tool_output = tool.call(**action.action_input)
+            except Exception as e:
+                tool_output = self._error_output(tool, action, e, f"Error: {e!s}")
+            event.on_end(payload={EventPayload.FUNCTION_OUTPUT: str(tool_output)})
+        return tool_output
+
+    async def _acall_tool(self, tool: AsyncBaseTool, action: ActionReasoningStep) -> ToolOutput:
+        with self.callback_manager.event(
+            CBEventType.FUNCTION_CALL,
+            payload={
+                EventPayload.FUNCTION_CALL: action.action_input,
+                EventPayload.TOOL: tool.metadata,
+            },
+        ) as event:
+            try:
+                dispatcher.event(
+                    AgentToolCallEvent(
+                        arguments=json.dumps({**action.action_input}),
+                        tool=tool.metadata,
+                    )
+                )
+                if _runs_in_thread(tool):
+                    context = contextvars.copy_context()
+                    call = asyncio.get_running_loop().run_in_executor(
+                        self._tool_executor,
+                        functools.partial(context.run, tool.call, **action.action_input),
+                    )
+                else:
+                    call = tool.acall(**action.action_input)
+                tool_output = await asyncio.wait_for(call, timeout=self._timeout_for(tool))
+            except asyncio.TimeoutError:
+                tool_output = self._timeout_output(tool, action)
+            except Exception as e:
+                tool_output = self._error_output(tool, action, e, f"Error: {e!s}")
+            event.on_end(payload={EventPayload.FUNCTION_OUTPUT: str(tool_output)})
+        return tool_output
+
+    def _reasoning_failure(self, task: Task, exp: Exception) -> Tuple[List[BaseReasoningStep], bool]:
+        tool_output = self._handle_reasoning_failure_fn(self.callback_manager, exp)
+        task.extra_state["sources"].append(tool_output)
+        observation_step = ObservationReasoningStep(observation=str(tool_output), return_direct=False)
+        if self._verbose:
+            print_text(f"{observation_step.get_content()}\n", color="blue")
+        return [observation_step], False
+
+    def _observe(
+        self,
+        task: Task,
+        current_reasoning: List[BaseReasoningStep],
+        actions: List[ActionReasoningStep],
+        tools_dict: Dict[str, AsyncBaseTool],
+        tool_outputs: List[ToolOutput],
+    ) -> Tuple[List[BaseReasoningStep], bool]:
+        """Add the tool outputs, in action order, as one observation."""
+        task.extra_state["sources"].extend(tool_outputs)
+
+        if len(actions) == 1:
+            tool = tools_dict.get(actions[0].action)
+            return_direct = bool(tool and tool.metadata.return_direct and not tool_outputs[0].is_error)
+            observation = str(tool_outputs[0])
+        else:
+            # The answer has to combine the results, so never return one directly
+            return_direct = False
+            observation = "\n".join(
+                f"{i}. {action.action}: {tool_output}"
+                for i, (action, tool_output) in enumerate(zip(actions, tool_outputs), start=1)
+            )
+
+        observation_step = ObservationReasoningStep(observation=observation, return_direct=return_direct)
+        current_reasoning.append(observation_step)
+        if self._verbose:
+            print_text(f"{observation_step.get_content()}\n", color="blue")
+        return current_reasoning, return_direct
+
+    @staticmethod
+    def _actions_of(reasoning_step: BaseReasoningStep) -> List[ActionReasoningStep]:
+        if isinstance(reasoning_step, ParallelActionReasoningStep):
+            return list(reasoning_step.actions)
+        return [reasoning_step]
+
+    def _process_actions(
+        self,
+        task: Task,
+        tools: Sequence[AsyncBaseTool],
+        output: ChatResponse,
+        is_streaming: bool = False,
+    ) -> Tuple[List[BaseReasoningStep], bool]:
+        try:
+            _, current_reasoning, is_done = self._extract_reasoning_step(output, is_streaming)
+        except ValueError as exp:
+            return self._reasoning_failure(task, exp)
+        if is_done:
+            return current_reasoning, True
+
+        tools_dict = {tool.metadata.get_name(): tool for tool in tools}
+        actions = self._actions_of(current_reasoning[-1])
+
+        # Every action runs in the thread pool; results are collected in order
+        futures = []
+        for action in actions:
+            tool = tools_dict.get(action.action)
+            if tool is None:
+                futures.append(None)
+            else:
+                context = contextvars.copy_context()
+                futures.append(self._tool_executor.submit(context.run, self._call_tool, tool, action))
+
+        # As in the async path, every timeout counts from the start of the batch
+        started = time.monotonic()
+        deadlines = {}
+        for action, future in zip(actions, futures):
+            if future is not None:
+                timeout = self._timeout_for(tools_dict[action.action])
+                deadlines[future] = None if timeout is None else started + timeout
+        waiting = set(deadlines)
+        while waiting:
+            upcoming = [deadlines[future] for future in waiting if deadlines[future] is not None]
+            _, waiting = wait(waiting, timeout=max(0.0, min(upcoming) - time.monotonic()) if upcoming else None)
+            now = time.monotonic()
+            waiting = {future for future in waiting if deadlines[future] is None or deadlines[future] > now}
+
+        tool_outputs = []
+        for action, future in zip(actions, futures):
+            if future is None:
+                tool_outputs.append(self._handle_nonexistent_tool_name(action))
+            elif future.done():
+                tool_outputs.append(future.result())
+            else:
+                tool_outputs.append(self._timeout_output(tools_dict[action.action], action))
+        return self._observe(task, current_reasoning, actions, tools_dict, tool_outputs)
+
+    async def _aprocess_actions(
+        self,
+        task: Task,
+        tools: Sequence[AsyncBaseTool],
+        output: ChatResponse,
+        is_streaming: bool = False,
+    ) -> Tuple[List[BaseReasoningStep], bool]:
+        try:
+            _, current_reasoning, is_done = self._extract_reasoning_step(output, is_streaming)
+        except ValueError as exp:
+            return self._reasoning_failure(task, exp)
+        if is_done:
+            return current_reasoning, True
+
+        tools_dict = {tool.metadata.get_name(): tool for tool in tools}
+        actions = self._actions_of(current_reasoning[-1])
+
+        async def run(action: ActionReasoningStep) -> ToolOutput:
+            tool = tools_dict.get(action.action)
+            if tool is None:
+                return self._handle_nonexistent_tool_name(action)
+            return await self._acall_tool(tool, action)
+
+        tool_outputs = await asyncio.gather(*(run(action) for action in actions))
+        return self._observe(task, current_reasoning, actions, tools_dict, list(tool_outputs))
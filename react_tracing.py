@@ -0,0 +1,396 @@
+"""
+Per-step tracing for the ReAct agent of the Chainlit apps.
+
+StepTracer is a llama-index callback handler: added to the LLM's callback
+manager (AgentRegistry(callback_handlers=[tracer])) it sees every LLM call
+and tool call of the agent worker and files them, as spans, under the agent
+step running at the time. A StepTrace then has the step's wall time, LLM
+latency and tokens in/out, tool durations, the time the message waited for
+its session, and whatever the app times itself (e.g. sending the step
+message). `summary()` is a one-line digest for the step message, and every
+finished step is written to a sink:
+
+    JsonlSpanSink        one JSON object per span
+    OtlpJsonFileSink     OTLP/JSON ExportTraceServiceRequest lines, as written
+                         by the OpenTelemetry collector's file exporter
+
+Usage:
+    step_tracer = StepTracer(JsonlSpanSink("react_spans.jsonl"))
+    ...
+    task_trace = step_tracer.trace_task(task, session_id=..., queue_delay=...)
+    async for step in iter_agent_steps(agent_runner, task, task_trace):
+        ...  step.trace.summary()
+        with step.trace.span("send"):
+            await step_msg.send()
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from llama_index.core.callbacks import CBEventType, EventPayload
+from llama_index.core.callbacks.base_handler import BaseCallbackHandler
+
+# Step whose LLM and tool calls are being recorded, per task/thread context
+_current_step: contextvars.ContextVar[Optional["StepTrace"]] = contextvars.ContextVar(
+    "current_react_step", default=None
+)
+
+# Rough characters per token, when the LLM does not report its usage
+_CHARS_PER_TOKEN = 4
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+@dataclass
+class Span:
+    """A timed operation within a step; times are Unix epoch seconds."""
+
+    name: str
+    start: float
+    end: Optional[float] = None
+    span_id: str = field(default_factory=_new_span_id)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.time()) - self.start
+
+
+@dataclass
+class StepTrace:
+    """Spans of one agent step."""
+
+    task_trace: "TaskTrace"
+    number: int
+    start: float = field(default_factory=time.time)
+    end: Optional[float] = None
+    span_id: str = field(default_factory=_new_span_id)
+    spans: List[Span] = field(default_factory=list)
+    queue_delay: float = 0.0
+
+    @property
+    def wall_time(self) -> float:
+        return (self.end if self.end is not None else time.time()) - self.start
+
+    def _spans(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+    @property
+    def llm_seconds(self) -> float:
+        return sum(span.duration for span in self._spans("llm"))
+
+    @property
+    def tool_seconds(self) -> float:
+        return sum(span.duration for span in self._spans("tool"))
+
+    @property
+    def tokens_in(self) -> int:
+        return sum(span.attributes.get("tokens_in", 0) for span in self._spans("llm"))
+
+    @property
+    def tokens_out(self) -> int:
+        return sum(span.attributes.get("tokens_out", 0) for span in self._spans("llm"))
+
+    @property
+    def tokens_estimated(self) -> bool:
+        return any(span.attributes.get("tokens_estimated") for span in self._spans("llm"))
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time a block of the app's own work as a span of this step."""
+        span = Span(name=name, start=time.time(), attributes=attributes)
+        self.spans.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.time()
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.time()
+
+    def summary(self) -> str:
+        """E.g. "⏱ 1.52 s · LLM 1.01 s, 812→45 tokens · tools 0.30 s (add 0.30 s)"."""
+        parts = [f"⏱ {self.wall_time:.2f} s"]
+        llm_spans = self._spans("llm")
+        if llm_spans:
+            approx = "~" if self.tokens_estimated else ""
+            calls = f"{len(llm_spans)} calls, " if len(llm_spans) > 1 else ""
+            parts.append(
+                f"LLM {self.llm_seconds:.2f} s, {calls}{approx}{self.tokens_in}→{approx}{self.tokens_out} tokens"
+            )
+        tool_spans = self._spans("tool")
+        if tool_spans:
+            tools = ", ".join(f"{span.attributes.get('tool', '?')} {span.duration:.2f} s" for span in tool_spans)
+            parts.append(f"tools {self.tool_seconds:.2f} s ({tools})")
+        if self.queue_delay >= 0.005:
+            parts.append(f"queued {self.queue_delay:.2f} s")
+        return " · ".join(parts)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """The step and its spans as flat JSON-compatible records."""
+        task_trace = self.task_trace
+        common = {
+            "trace_id": task_trace.trace_id,
+            "task_id": task_trace.task_id,
+            "session_id": task_trace.session_id,
+            "step": self.number,
+        }
+        step_record = {
+            **common,
+            "span_id": self.span_id,
+            "parent_id": None,
+            "name": "step",
+            "start": self.start,
+            "end": self.end,
+            "duration": self.wall_time,
+            "attributes": {
+                "llm_seconds": self.llm_seconds,
+                "tool_seconds": self.tool_seconds,
+                "tokens_in": self.tokens_in,
+                "tokens_out": self.tokens_out,
+                "queue_delay": self.queue_delay,
+            },
+        }
+        return [step_record] + [
+            {
+                **common,
+                "span_id": span.span_id,
+                "parent_id": self.span_id,
+                "name": span.name,
+                "start": span.start,
+                "end": span.end,
+                "duration": span.duration,
+                "attributes": span.attributes,
+            }
+            for span in self.spans
+        ]
+
+
+class TaskTrace:
+    """Steps of one agent task, created by StepTracer.trace_task."""
+
+    def __init__(self, tracer: "StepTracer", task_id: str, session_id: Optional[str], queue_delay: float) -> None:
+        self.tracer = tracer
+        self.trace_id = uuid.uuid4().hex
+        self.task_id = task_id
+        self.session_id = session_id
+        self.queue_delay = queue_delay
+        self.steps: List[StepTrace] = []
+
+    def start_step(self, number: int) -> StepTrace:
+        """Start recording a step in the current context."""
+        step_trace = StepTrace(task_trace=self, number=number)
+        if not self.steps:
+            step_trace.queue_delay = self.queue_delay
+        self.steps.append(step_trace)
+        _current_step.set(step_trace)
+        return step_trace
+
+    def finish_step(self, step_trace: StepTrace) -> None:
+        """Stop recording a step and export it."""
+        step_trace.finish()
+        if _current_step.get() is step_trace:
+            _current_step.set(None)
+        self.tracer.export(step_trace)
+
+
+def _text_length(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_text_length(item) for item in value)
+    content = getattr(value, "content", None)
+    if content is None and hasattr(value, "message"):
+        content = value.message.content
+    if content is None and hasattr(value, "text"):
+        content = value.text
+    return len(content or "")
+
+
+def _estimate_tokens(value: Any) -> int:
+    return -(-_text_length(value) // _CHARS_PER_TOKEN)
+
+
+def _usage(response: Any) -> Optional[tuple[int, int]]:
+    """(prompt tokens, completion tokens) reported with a response, if any."""
+    for source in (getattr(response, "additional_kwargs", None), getattr(response, "raw", None)):
+        if source is None:
+            continue
+        usage = source.get("usage", source) if isinstance(source, dict) else getattr(source, "usage", None)
+        if isinstance(usage, dict):
+            prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        else:
+            prompt = getattr(usage, "prompt_tokens", None)
+            completion = getattr(usage, "completion_tokens", None)
+        if prompt is not None and completion is not None:
+            return int(prompt), int(completion)
+    return None
+
+
+class StepTracer(BaseCallbackHandler):
+    """
+    Callback handler recording LLM and tool calls as spans of agent steps,
+    and exporting finished steps to `sinks`.
+    """
+
+    def __init__(self, *sinks: Any) -> None:
+        super().__init__(event_starts_to_ignore=[], event_ends_to_ignore=[])
+        self.sinks = list(sinks)
+        self._open: Dict[str, tuple[StepTrace, Span]] = {}
+        self._lock = threading.Lock()
+
+    def trace_task(self, task, *, session_id: Optional[str] = None, queue_delay: float = 0.0) -> TaskTrace:
+        return TaskTrace(self, task.task_id, session_id, queue_delay)
+
+    def export(self, step_trace: StepTrace) -> None:
+        for sink in self.sinks:
+            sink.write(step_trace)
+
+    def on_event_start(
+        self,
+        event_type: CBEventType,
+        payload: Optional[Dict[str, Any]] = None,
+        event_id: str = "",
+        parent_id: str = "",
+        **kwargs: Any,
+    ) -> str:
+        step_trace = _current_step.get()
+        if step_trace is None or event_type not in (CBEventType.LLM, CBEventType.FUNCTION_CALL):
+            return event_id
+        payload = payload or {}
+        if event_type == CBEventType.LLM:
+            span = Span(name="llm", start=time.time())
+            span.attributes["prompt_length"] = _text_length(
+                payload.get(EventPayload.MESSAGES) or payload.get(EventPayload.PROMPT)
+            )
+        else:
+            tool = payload.get(EventPayload.TOOL)
+            span = Span(name="tool", start=time.time())
+            span.attributes["tool"] = tool.name if tool is not None else None
+        # Kept with the step, as a streamed LLM call may end outside its context
+        with self._lock:
+            step_trace.spans.append(span)
+            self._open[event_id] = (step_trace, span)
+        return event_id
+
+    def on_event_end(
+        self,
+        event_type: CBEventType,
+        payload: Optional[Dict[str, Any]] = None,
+        event_id: str = "",
+        **kwargs: Any,
+    ) -> None:
+        with self._lock:
+            opened = self._open.pop(event_id, None)
+        if opened is None:
+            return
+        _, span = opened
+        span.end = time.time()
+        payload = payload or {}
+        if EventPayload.EXCEPTION in payload:
+            span.attributes["error"] = str(payload[EventPayload.EXCEPTION])
+            return
+
+        if event_type == CBEventType.LLM:
+            response = payload.get(EventPayload.RESPONSE) or payload.get(EventPayload.COMPLETION)
+            usage = _usage(response)
+            if usage is not None:
+                span.attributes["tokens_in"], span.attributes["tokens_out"] = usage
+            else:
+                span.attributes["tokens_in"] = -(-span.attributes.pop("prompt_length", 0) // _CHARS_PER_TOKEN)
+                span.attributes["tokens_out"] = _estimate_tokens(response)
+                span.attributes["tokens_estimated"] = True
+            span.attributes.pop("prompt_length", None)
+        else:
+            output = payload.get(EventPayload.FUNCTION_OUTPUT)
+            if isinstance(output, str) and output.startswith("Error:"):
+                span.attributes["error"] = output
+
+    def start_trace(self, trace_id: Optional[str] = None) -> None:
+        pass
+
+    def end_trace(
+        self,
+        trace_id: Optional[str] = None,
+        trace_map: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        pass
+
+
+class JsonlSpanSink:
+    """Appends the records of every finished step to a JSON lines file."""
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+
+    def write(self, step_trace: StepTrace) -> None:
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in step_trace.records())
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class OtlpJsonFileSink:
+    """
+    Appends every finished step to a file as one OTLP/JSON
+    ExportTraceServiceRequest per line, which OpenTelemetry tooling can
+    import (e.g. the collector's otlpjsonfile receiver).
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], service_name: str = "react-chainlit") -> None:
+        self.path = os.fspath(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def write(self, step_trace: StepTrace) -> None:
+        spans = []
+        for record in step_trace.records():
+            attributes = {
+                "task_id": record["task_id"],
+                "session_id": record["session_id"],
+                "step": record["step"],
+                **record["attributes"],
+            }
+            spans.append({
+                "traceId": record["trace_id"],
+                "spanId": record["span_id"],
+                "parentSpanId": record["parent_id"] or "",
+                "name": record["name"],
+                "kind": 1,
+                "startTimeUnixNano": str(int(record["start"] * 1e9)),
+                "endTimeUnixNano": str(int((record["end"] or record["start"]) * 1e9)),
+                "attributes": _otlp_attributes(attributes),
+            })
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "react_tracing"}, "spans": spans}],
+            }]
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request) + "\n")
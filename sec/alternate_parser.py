@@ -0,0 +1,269 @@
+from helper_functions import *
+import bisect
+import re
+import requests
+from collections import defaultdict
+from lxml import etree, html
+from io import BytesIO
+import time
+import logging
+from lxml import html
+from io import StringIO
+
+# Initialize the HTML document parser
+
+
+def init_html_doc(html_string):
+    # Create parser with SEC document optimizations
+    parser = html.HTMLParser(
+        remove_comments=True,
+        encoding='utf-8',
+        huge_tree=True  # Necessary for large SEC filings
+    )
+
+    # Parse HTML and get root element
+    doc_tree = html.parse(StringIO(html_string), parser=parser)
+    root = doc_tree.getroot()  # Correct way to access root element
+
+    # Make exhibit links absolute
+    root.make_links_absolute("https://www.sec.gov")
+
+    # Register namespaces for XBRL and EDGAR
+    xpath_namespaces = {
+        'ix': 'http://www.xbrl.org/2003/instance',
+        'edgar': 'http://www.sec.gov/edgar/document'
+    }
+
+    return root, xpath_namespaces
+
+
+BALANCE_SHEET_XPATHS = [
+    '//h2[contains(., "Consolidated Balance Sheet")]/following::table[1]',
+    '//ix:nonnumeric[@name="us-gaap:Assets"]/ancestor::table',
+    '//table[.//th[contains(., "Total Assets")]]'
+]
+
+def extract_text_content(element_list):
+    """Extracts and cleans text from lxml elements"""
+    texts = []
+    for elem in element_list:
+        # Handle different element types
+        if isinstance(elem, html.HtmlElement):
+            # Clean whitespace and join text
+            text = ' '.join(elem.text_content().split())
+            texts.append(text)
+        elif hasattr(elem, 'xpath'):  # For PDF wrapper elements
+            texts.append('\n'.join(elem.xpath('//text()')))
+        else:
+            texts.append(str(elem))
+    return '\n\n'.join(texts)
+
+
+def extract_10k_sections(html_doc):
+    # Phase 1: Direct Extraction
+    results = {
+        'item1_business': None,
+        'balance_sheet': None
+    }
+
+    # A. Find Item 1: Business
+    if not results['item1_business']:
+        # Method 1: Standard location
+        # results['item1_business'] = html_doc.xpath(
+        #     '//section[contains(., "Part I")]//*[self::h2 or self::div][contains(., "Item 1. Business")]/following-sibling::*')
+        results['item1_business'] = extract_text_content(html_doc.xpath(
+            "//*[contains(translate(., 'ITEM', 'item'), 'item 1') and contains(translate(., 'BUSINESS', 'business'), 'business')]/following::*[not(contains(translate(., 'ITEM', 'item'), 'item '))]"))
+
+        # Method 2: Incorporated references
+        if not results['item1_business']:
+            incorporated_ref = html_doc.xpath(
+                '//*[contains(., "incorporated by reference")]')
+            if incorporated_ref:
+                exhibit_13 = extract_text_content(html_doc.xpath(
+                    '//a[contains(., "Exhibit 13")]/@href'))
+                print(f"Exhibit 13 Path : {exhibit_13}")
+                results['item1_business'] = f"Exhibit 13 Path : {exhibit_13}"
+                # results['item1_business'] = fetch_and_parse(exhibit_13).xpath(BUSINESS_XPATH)
+
+    # B. Find Consolidated Balance Sheet
+    balance_sheet_locations = [
+        ('//*[contains(., "Consolidated Balance Sheet")]', 'exact match'),
+        ('//*[contains(., "Financial Position")]', 'alternative title'),
+        ('//table[@class="financials"]', 'generic table detection'),
+        ('//ix:nonnumeric[@name="us-gaap:Assets"]', 'XBRL tagging')
+    ]
+
+    for xpath, method in balance_sheet_locations:
+        if not results['balance_sheet']:
+            results['balance_sheet'] = extract_text_content(html_doc.xpath(xpath))
+            if results['balance_sheet']:
+                print(f"Found via {method}")
+
+    # Phase 2: Exhibit Fallback
+    if not results['balance_sheet']:
+        exhibits = html_doc.xpath(
+            '//div[@id="exhibits"]//a[contains(@href, "EX-")]')
+        financial_exhibits = [
+            extract_text_content(e) for e in exhibits if '21' in e or '99.1' in e or 'financial' in e.text.lower()]
+
+        results['balance_sheet'] = financial_exhibits
+
+        # for exhibit in financial_exhibits:
+        #     exhibit_content = fetch_and_parse(exhibit.attrib['href'])
+        #     results['balance_sheet'] = exhibit_content.xpath(BALANCE_SHEET_XPATHS)
+        #     if results['balance_sheet']: break
+
+    return results
+
+
+
+# Fast path: everything below is evaluated against one index built per document
+
+_BLOCK_TAGS = ('p', 'div', 'td', 'th', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+_ITEM_HEADING_PATTERN = re.compile(r'^item\s*(\d+[a-z]?)\b')
+
+_IS_LINKED_XPATH = etree.XPath('boolean(ancestor::a[@href] or .//a[@href])')
+_FOLLOWING_TABLE_XPATH = etree.XPath('following::table[1]')
+_EXHIBIT_13_XPATH = etree.XPath('//a[contains(., "Exhibit 13")]/@href')
+
+# BALANCE_SHEET_XPATHS for documents parsed by init_html_doc: the HTML parser
+# keeps the "ix:" prefix in the tag name, so XBRL facts are matched by name()
+_BALANCE_SHEET_FALLBACK_XPATHS = [
+    (etree.XPath('//*[name()="ix:nonfraction" or name()="ix:nonnumeric"][@name="us-gaap:Assets"]/ancestor::table[1]'), 'XBRL tagging'),
+    (etree.XPath('//table[@class="financials"]'), 'generic table detection'),
+    (etree.XPath('//table[.//th[contains(., "Total Assets")]]'), 'total assets header'),
+]
+
+
+class SectionIndex:
+    """
+    Index of the text blocks of a document parsed by init_html_doc.
+
+    A single pass collects the innermost block elements (paragraphs, divs,
+    table cells, ...) in document order together with their normalized text.
+    Short blocks are indexed as headings by their lowercase text, so section
+    lookups no longer evaluate string-value XPath predicates over every
+    element of the document.
+    """
+
+    def __init__(self, html_doc, max_heading_length=200):
+        blocks = list(html_doc.iter(*_BLOCK_TAGS))
+        containers = set()
+        for block in blocks:
+            parent_block = next(block.iterancestors(*_BLOCK_TAGS), None)
+            if parent_block is not None:
+                containers.add(parent_block)
+
+        self.html_doc = html_doc
+        self.blocks = [block for block in blocks if block not in containers]
+        self.texts = [' '.join(block.text_content().split()) for block in self.blocks]
+
+        # Normalized heading text -> positions in self.blocks
+        self.headings = defaultdict(list)
+        for position, text in enumerate(self.texts):
+            if text and len(text) <= max_heading_length:
+                self.headings[text.lower()].append(position)
+
+        # Item headings in the body, i.e. excluding table of contents links
+        self.item_positions = sorted(
+            position
+            for heading, positions in self.headings.items()
+            if _ITEM_HEADING_PATTERN.match(heading)
+            for position in positions
+            if not self.is_linked(position)
+        )
+
+    def is_linked(self, position):
+        return _IS_LINKED_XPATH(self.blocks[position])
+
+    def find_headings(self, predicate):
+        """Positions of headings whose lowercase text satisfies `predicate`, in document order"""
+        return sorted(
+            position
+            for heading, positions in self.headings.items()
+            if predicate(heading)
+            for position in positions
+        )
+
+    def find_item(self, number, title=None):
+        """
+        Position of the body heading of an Item, e.g. find_item('1', 'business').
+        Returns None if there is none.
+        """
+        def matches(heading):
+            match = _ITEM_HEADING_PATTERN.match(heading)
+            return match is not None and match.group(1) == number and (title is None or title in heading)
+
+        for position in self.find_headings(matches):
+            if not self.is_linked(position):
+                return position
+        return None
+
+    def item_text(self, position):
+        """Text of the blocks following an Item heading up to the next Item heading"""
+        next_index = bisect.bisect_right(self.item_positions, position)
+        end = self.item_positions[next_index] if next_index < len(self.item_positions) else len(self.blocks)
+        return '\n\n'.join(text for text in self.texts[position + 1:end] if text)
+
+
+def extract_10k_sections_fast(html_doc, index=None):
+    """
+    Counterpart of extract_10k_sections answering the lookups from a
+    SectionIndex with precompiled XPath expressions.
+
+    Item 1 is the text between the "Item 1. Business" heading in the body
+    and the next Item heading. The balance sheet is the first table following
+    a "Consolidated Balance Sheet(s)" or "Financial Position" heading, falling
+    back to XBRL tagging and generic table detection.
+    """
+    index = index or SectionIndex(html_doc)
+    results = {
+        'item1_business': None,
+        'balance_sheet': None
+    }
+
+    # A. Find Item 1: Business
+    position = index.find_item('1', 'business')
+    if position is None:
+        position = index.find_item('1')
+    if position is not None:
+        results['item1_business'] = index.item_text(position)
+    elif any('incorporated by reference' in text.lower() for text in index.texts):
+        exhibit_13 = extract_text_content(_EXHIBIT_13_XPATH(html_doc))
+        results['item1_business'] = f"Exhibit 13 Path : {exhibit_13}"
+
+    # B. Find Consolidated Balance Sheet
+    balance_sheet_headings = index.find_headings(
+        lambda heading: 'consolidated balance sheet' in heading or 'financial position' in heading
+    )
+    for position in balance_sheet_headings:
+        if index.is_linked(position):
+            continue
+        tables = _FOLLOWING_TABLE_XPATH(index.blocks[position])
+        if tables:
+            results['balance_sheet'] = extract_text_content(tables)
+            break
+
+    for xpath, method in _BALANCE_SHEET_FALLBACK_XPATHS:
+        if results['balance_sheet']:
+            break
+        results['balance_sheet'] = extract_text_content(xpath(html_doc)[:1]) or None
+        if results['balance_sheet']:
+            print(f"Found via {method}")
+
+    return results
+
+if __name__ == '__main__':
+    accession, filing_date = find_sec_filing('19617', '10-K')
+    html_content = download_sec_filing('19617', accession_number=accession)
+    # Usage:
+    # html_string = """<your entire HTML document string>"""
+    html_doc, ns = init_html_doc(html_content)
+
+    # Now use in XPath queries with namespace handling:
+    # results = html_doc.xpath('//ix:nonnumeric', namespaces=ns)
+
+    sections = extract_10k_sections_fast(html_doc)
+    with open('alternate_approach.txt','w',encoding='utf-8') as op_file:
+        op_file.write(str(sections))
\ No newline at end of file
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from sec_parser.semantic_elements.top_section_title import TopSectionTitle
+from sec_10k_parser import Edgar10KParser
+
+HtmlSource = Union[str, bytes, os.PathLike]
+
+
+@dataclass(frozen=True)
+class ParsedElement:
+    """
+    Compact, picklable view of a semantic element.
+
+    `section_id` is the identifier of the top section (e.g. 'part1', 'item7')
+    the element belongs to, or None before the first top section title.
+    """
+    type_name: str
+    text: str
+    section_id: Optional[str]
+    level: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ParseResult:
+    index: int
+    source: str
+    elements: Optional[tuple[ParsedElement, ...]]
+    error: Optional[str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Parser built once per worker process by `_init_worker`
+_worker_parser = None
+
+
+def _init_worker(parser_factory: Callable[[], Edgar10KParser]) -> None:
+    global _worker_parser
+    _worker_parser = parser_factory()
+
+
+def _read_source(source: HtmlSource) -> Union[str, bytes]:
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, os.PathLike) or '<' not in source:
+        with open(source, encoding='utf-8') as f:
+            return f.read()
+    return source
+
+
+def _describe_source(index: int, source: HtmlSource) -> str:
+    if isinstance(source, os.PathLike) or (isinstance(source, str) and '<' not in source):
+        return os.fspath(source)
+    return f"<html #{index}>"
+
+
+def to_parsed_elements(elements) -> tuple[ParsedElement, ...]:
+    """
+    Convert semantic elements into their compact form.
+    """
+    parsed = []
+    section_id = None
+    for element in elements:
+        if isinstance(element, TopSectionTitle):
+            section_id = element.section_type.identifier
+        parsed.append(
+            ParsedElement(
+                type_name=element.__class__.__name__,
+                text=element.text,
+                section_id=section_id,
+                level=getattr(element, 'level', None),
+            )
+        )
+    return tuple(parsed)
+
+
+def _parse_one(index: int, source: HtmlSource) -> ParseResult:
+    start = time.perf_counter()
+    description = _describe_source(index, source)
+    try:
+        elements = _worker_parser.parse(_read_source(source))
+        return ParseResult(
+            index=index,
+            source=description,
+            elements=to_parsed_elements(elements),
+            error=None,
+            seconds=time.perf_counter() - start,
+        )
+    except Exception:
+        return ParseResult(
+            index=index,
+            source=description,
+            elements=None,
+            error=traceback.format_exc(),
+            seconds=time.perf_counter() - start,
+        )
+
+
+def parse_many(
+    paths_or_html_iter: Iterable[HtmlSource],
+    workers: Optional[int] = None,
+    *,
+    parser_factory: Callable[[], Edgar10KParser] = Edgar10KParser,
+    max_pending: Optional[int] = None,
+) -> Iterator[ParseResult]:
+    """
+    Parse many 10-K filings on a process pool, yielding results as they finish.
+
+    Each worker builds its parser once. A failing document yields a ParseResult
+    with `error` set instead of stopping the batch. When a worker process dies
+    (a crash in lxml, running out of memory on a huge filing), the documents
+    the pool was parsing at the time yield such a result and the batch goes
+    on with a new pool. Results come back in completion order; use
+    `ParseResult.index` to map them to the input.
+
+    Args:
+        paths_or_html_iter: File paths, or HTML documents as str/bytes. Paths
+            are preferred since only the path is sent to the worker.
+        workers: Number of worker processes, defaults to the CPU count
+        parser_factory: Picklable callable building the parser in each worker
+        max_pending: Maximum number of documents submitted but not yet
+            yielded, defaults to twice the number of workers
+
+    Yields:
+        One ParseResult per input document
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    sources = enumerate(paths_or_html_iter)
+    # Submitted parses: index, source description and submission time
+    pending: dict[Future, tuple[int, str, float]] = {}
+
+    def new_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(parser_factory,),
+        )
+
+    # A source that could not be submitted because the pool had just broken
+    unsubmitted: list[tuple[int, HtmlSource]] = []
+
+    def submit_next() -> bool:
+        for index, source in unsubmitted or sources:
+            try:
+                future = executor.submit(_parse_one, index, source)
+            except BrokenProcessPool:
+                unsubmitted[:] = [(index, source)]
+                return False
+            unsubmitted.clear()
+            pending[future] = (index, _describe_source(index, source), time.perf_counter())
+            return True
+        return False
+
+    def collect(future: Future) -> tuple[ParseResult, bool]:
+        """The result of a finished parse, and whether its worker process died."""
+        index, description, submitted = pending.pop(future)
+        try:
+            return future.result(), False
+        except BrokenProcessPool:
+            return ParseResult(
+                index=index,
+                source=description,
+                elements=None,
+                error=traceback.format_exc(),
+                seconds=time.perf_counter() - submitted,
+            ), True
+
+    executor = new_executor()
+    try:
+        while len(pending) < max_pending and submit_next():
+            pass
+
+        while pending or unsubmitted:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                result, failed = collect(future)
+                broken = broken or failed
+                yield result
+            if not broken and not unsubmitted:
+                for _ in done:
+                    submit_next()
+                continue
+
+            # A dead worker breaks the pool and fails every parse it still
+            # had; report those and go on with a new pool
+            wait(pending)
+            for future in list(pending):
+                yield collect(future)[0]
+            executor.shutdown(cancel_futures=True)
+            executor = new_executor()
+            while len(pending) < max_pending and submit_next():
+                pass
+    finally:
+        # Closing the generator early cancels the parses that have not started
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,63 @@
+"""
+Benchmark for extract_10k_sections_fast against extract_10k_sections.
+
+Usage:
+    python bench_alternate_parser.py [filing.htm ...]
+
+Without arguments a few 10-K filings are downloaded (through FilingCache).
+Both extractors run on the same parsed document; the SectionIndex build is
+included in the fast path timing. The start of each result is printed so the
+two can be compared by eye, since the original XPath expressions also pick up
+the text of enclosing elements.
+"""
+import sys
+import time
+
+from alternate_parser import extract_10k_sections, extract_10k_sections_fast, init_html_doc
+from filing_cache import FilingCache
+from helper_functions import download_sec_filing, find_sec_filing
+
+DEFAULT_CIKS = ['72971', '19617', '320193']
+
+
+def load_documents(paths):
+    if paths:
+        return [(path, open(path, encoding='utf-8').read()) for path in paths]
+    cache = FilingCache()
+    documents = []
+    for cik in DEFAULT_CIKS:
+        accession, _ = find_sec_filing(cik, '10-K', cache=cache)
+        documents.append((cik, download_sec_filing(cik, accession, cache=cache)))
+    return documents
+
+
+def timed(fn, html_doc):
+    start = time.perf_counter()
+    try:
+        result = fn(html_doc)
+    except Exception as e:
+        result = {'error': repr(e)}
+    return time.perf_counter() - start, result
+
+
+def preview(value, limit=100):
+    return ' '.join(str(value).split())[:limit] if value else value
+
+
+def main(paths):
+    for name, document in load_documents(paths):
+        html_doc, _ = init_html_doc(document)
+        original_time, original = timed(extract_10k_sections, html_doc)
+        fast_time, fast = timed(extract_10k_sections_fast, html_doc)
+        print(f"{name}: {len(document) / 1e6:.1f} MB")
+        print(f"  extract_10k_sections:      {original_time:8.3f} s")
+        print(f"  extract_10k_sections_fast: {fast_time:8.3f} s ({original_time / fast_time:.0f}x)")
+        for key in ('item1_business', 'balance_sheet', 'error'):
+            if key in original or key in fast:
+                print(f"  {key}:")
+                print(f"    original: {preview(original.get(key))!r}")
+                print(f"    fast:     {preview(fast.get(key))!r}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark for FinancialTableMatcher against the previous per-pattern
+classification in FinancialTableExtractor.
+
+Usage:
+    python bench_financial_table_matcher.py [filing.htm ...]
+
+Without arguments a few 10-K filings are downloaded (through FilingCache).
+Tables are pulled out with BeautifulSoup; the caption is the first 200
+characters of the table text, as in FinancialTableExtractor._get_table_caption.
+"""
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from filing_cache import FilingCache
+from financial_table_extractor import FINANCIAL_KEYWORDS, FinancialTableMatcher
+from helper_functions import download_sec_filing, find_sec_filing
+
+DEFAULT_CIKS = ['72971', '19617', '320193']
+
+# Classification as implemented before FinancialTableMatcher, kept as the reference
+_LEGACY_PATTERNS = {
+    "balance_sheet": re.compile(
+        r"(consolidated\s+)?balance\s+sheets?|statements?\s+of\s+(financial\s+)?position",
+        re.IGNORECASE
+    ),
+    "income_statement": re.compile(
+        r"(consolidated\s+)?statements?\s+of\s+(operations|income|earnings|comprehensive\s+income)",
+        re.IGNORECASE
+    ),
+    "cash_flow": re.compile(
+        r"(consolidated\s+)?statements?\s+of\s+cash\s+flows?",
+        re.IGNORECASE
+    ),
+    "stockholders_equity": re.compile(
+        r"(consolidated\s+)?statements?\s+of\s+(stockholders'?|shareholders'?)\s+equity|changes\s+in\s+(stockholders'?|shareholders'?)\s+equity",
+        re.IGNORECASE
+    ),
+    "notes": re.compile(
+        r"notes\s+to\s+(consolidated\s+)?financial\s+statements?",
+        re.IGNORECASE
+    ),
+}
+
+
+def legacy_classify(caption, table_text):
+    for table_type, pattern in _LEGACY_PATTERNS.items():
+        if pattern.search(caption):
+            return table_type
+    table_text = table_text.lower()
+    keyword_count = sum(1 for keyword in FINANCIAL_KEYWORDS if keyword in table_text)
+    has_currency = bool(re.search(r'[\$€£¥]', table_text))
+    has_financial_numbers = bool(re.search(r'\d{1,3}(,\d{3})+(\.\d+)?', table_text))
+    if (keyword_count >= 3) and (has_currency or has_financial_numbers):
+        return "financial_data"
+    return None
+
+
+def matcher_classify(matcher, caption, table_text):
+    table_type = matcher.identify_table_type(caption)
+    if not table_type and matcher.contains_financial_data(table_text):
+        table_type = "financial_data"
+    return table_type
+
+
+def load_tables(paths):
+    if paths:
+        documents = [open(path, encoding='utf-8').read() for path in paths]
+    else:
+        cache = FilingCache()
+        documents = []
+        for cik in DEFAULT_CIKS:
+            accession, _ = find_sec_filing(cik, '10-K', cache=cache)
+            documents.append(download_sec_filing(cik, accession, cache=cache))
+
+    tables = []
+    for document in documents:
+        for table in BeautifulSoup(document, "lxml").find_all("table"):
+            text = table.text.strip()
+            tables.append((text[:200].strip(), text))
+    return tables
+
+
+def timed(fn, tables, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(caption, text) for caption, text in tables]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main(paths, repeat=5):
+    tables = load_tables(paths)
+    matcher = FinancialTableMatcher()
+
+    legacy_time, legacy_results = timed(legacy_classify, tables, repeat)
+    matcher_time, matcher_results = timed(
+        lambda caption, text: matcher_classify(matcher, caption, text), tables, repeat
+    )
+
+    mismatches = [
+        (caption, old, new)
+        for (caption, _), old, new in zip(tables, legacy_results, matcher_results)
+        if old != new
+    ]
+    print(f"Tables: {len(tables)}")
+    print(f"Legacy:  {legacy_time * 1e3:.2f} ms ({legacy_time / len(tables) * 1e6:.1f} us/table)")
+    print(f"Matcher: {matcher_time * 1e3:.2f} ms ({matcher_time / len(tables) * 1e6:.1f} us/table)")
+    print(f"Speed-up: {legacy_time / matcher_time:.2f}x")
+    print(f"Identical classification: {not mismatches}")
+    for caption, old, new in mismatches[:10]:
+        print(f"  {old!r} != {new!r}: {caption[:80]!r}")
+    return not mismatches
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main(sys.argv[1:]) else 1)
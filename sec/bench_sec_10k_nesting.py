@@ -0,0 +1,72 @@
+"""
+Checks that SEC10KTreeBuilder builds the same tree as TreeBuilder with
+SEC10KNestingRule, and compares how long both take.
+
+Usage:
+    python bench_sec_10k_nesting.py [filing.htm ...]
+
+Without arguments a few 10-K filings are downloaded (through FilingCache).
+Exits with a non-zero status if any tree differs.
+"""
+import sys
+import time
+
+from filing_cache import FilingCache
+from helper_functions import download_sec_filing, find_sec_filing
+from sec_10k_nesting import SEC10KNestingRule, SEC10KTreeBuilder
+from sec_10k_parser import Edgar10KParser
+from sec_parser.semantic_tree import TreeBuilder
+
+DEFAULT_CIKS = ['72971', '19617', '320193']
+
+
+def load_documents(paths):
+    if paths:
+        return [open(path, encoding='utf-8').read() for path in paths]
+    cache = FilingCache()
+    documents = []
+    for cik in DEFAULT_CIKS:
+        accession, _ = find_sec_filing(cik, '10-K', cache=cache)
+        documents.append(download_sec_filing(cik, accession, cache=cache))
+    return documents
+
+
+def tree_shape(nodes):
+    """
+    Nested (element id, children) tuples; element identity is compared since
+    both builders receive the same elements.
+    """
+    return tuple((id(node.semantic_element), tree_shape(node.children)) for node in nodes)
+
+
+def timed_build(builder, elements, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tree = builder.build(elements)
+        best = min(best, time.perf_counter() - start)
+    return best, tree
+
+
+def main(paths, repeat=3):
+    parser = Edgar10KParser()
+    reference = TreeBuilder(get_rules=lambda: [SEC10KNestingRule()])
+    linear = SEC10KTreeBuilder()
+
+    identical = True
+    for document in load_documents(paths):
+        elements = parser.parse(document)
+        reference_time, reference_tree = timed_build(reference, elements, repeat)
+        linear_time, linear_tree = timed_build(linear, elements, repeat)
+        same = tree_shape(list(reference_tree)) == tree_shape(list(linear_tree))
+        identical = identical and same
+        print(
+            f"{len(elements):6} elements: TreeBuilder {reference_time * 1e3:8.1f} ms, "
+            f"SEC10KTreeBuilder {linear_time * 1e3:7.1f} ms "
+            f"({reference_time / linear_time:.1f}x), identical: {same}"
+        )
+    return identical
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main(sys.argv[1:]) else 1)
@@ -0,0 +1,94 @@
+"""
+Benchmark for the indexed TopSectionManagerFor10K against the previous
+implementation, kept in new_top_section_manager_for_10k.py as the reference.
+
+Usage:
+    python bench_top_section_manager.py [filing.htm ...]
+
+Without arguments a few 10-K filings are downloaded (through FilingCache).
+Each filing is parsed once with each step; the time spent in the step itself
+is reported next to the full parse time, and the resulting elements are
+compared.
+"""
+import sys
+import time
+
+from filing_cache import FilingCache
+from helper_functions import download_sec_filing, find_sec_filing
+from new_top_section_manager_for_10k import TopSectionManagerFor10K as ReferenceTopSectionManager
+from sec_10k_parser import Edgar10KParser
+from top_section_manager_for_10k import TopSectionManagerFor10K
+
+DEFAULT_CIKS = ['72971', '19617', '320193', '789019', '1018724']
+
+
+def load_documents(paths):
+    if paths:
+        return [open(path, encoding='utf-8').read() for path in paths]
+    cache = FilingCache()
+    documents = []
+    for cik in DEFAULT_CIKS:
+        accession, _ = find_sec_filing(cik, '10-K', cache=cache)
+        documents.append(download_sec_filing(cik, accession, cache=cache))
+    return documents
+
+
+def make_parser(manager_class, timings):
+    def timed_step(step):
+        process = step.process
+
+        def wrapper(elements):
+            start = time.perf_counter()
+            result = process(elements)
+            timings.append(time.perf_counter() - start)
+            return result
+
+        step.process = wrapper
+        return step
+
+    parser = None
+
+    def get_steps():
+        steps = parser.get_default_steps()
+        for index, step in enumerate(steps):
+            if isinstance(step, TopSectionManagerFor10K):
+                steps[index] = timed_step(
+                    manager_class(types_to_process=step._types_to_process)
+                )
+        return steps
+
+    parser = Edgar10KParser(get_steps=get_steps)
+    return parser
+
+
+def summarize(elements):
+    return [(element.__class__.__name__, element.text) for element in elements]
+
+
+def main(paths):
+    documents = load_documents(paths)
+    results = {}
+    for name, manager_class in (
+        ("Reference", ReferenceTopSectionManager),
+        ("Indexed", TopSectionManagerFor10K),
+    ):
+        timings = []
+        parser = make_parser(manager_class, timings)
+        start = time.perf_counter()
+        parsed = [summarize(parser.parse(document)) for document in documents]
+        total = time.perf_counter() - start
+        results[name] = (sum(timings), total, parsed)
+
+    for name, (step_time, total, parsed) in results.items():
+        elements = sum(len(p) for p in parsed)
+        print(f"{name:9}: step {step_time * 1e3:8.1f} ms, parse {total:6.2f} s, {elements} elements")
+    reference_time = results["Reference"][0]
+    indexed_time = results["Indexed"][0]
+    print(f"Step speed-up: {reference_time / indexed_time:.2f}x over {len(documents)} filings")
+    identical = results["Reference"][2] == results["Indexed"][2]
+    print(f"Identical elements: {identical}")
+    return identical
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main(sys.argv[1:]) else 1)
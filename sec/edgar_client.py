@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import aiohttp
+
+from helper_functions import (
+    SEC_ARCHIVES_URL,
+    SEC_DATA_URL,
+    SEC_HEADERS,
+    find_primary_document_link,
+    select_filing,
+    strip_submission_header,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from filing_cache import FilingCache
+
+# EDGAR's fair access policy allows at most 10 requests per second
+EDGAR_MAX_REQUESTS_PER_SECOND = 10
+
+
+class TokenBucket:
+    """
+    TokenBucket is an asyncio rate limiter.
+
+    Tokens are refilled continuously at `rate` per second up to `capacity`.
+    Each `acquire` takes one token, sleeping until one is available. With the
+    default capacity of 1 requests are evenly spaced at 1/rate seconds.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated_at) * self.rate,
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class FilingResult:
+    cik: str
+    form_type: str
+    accession_number: Optional[str] = None
+    filing_date: Optional[str] = None
+    html: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncEdgarClient:
+    """
+    AsyncEdgarClient fetches EDGAR submissions and filings over a single pooled
+    aiohttp session.
+
+    Connections are kept alive and shared across all requests, responses are
+    gzip-decoded by aiohttp, and every request goes through a token bucket so
+    the client as a whole stays under EDGAR's request rate policy. Use
+    `fetch_filings` to pipeline the submissions -> index -> primary document
+    lookups of many companies at once:
+
+        async with AsyncEdgarClient() as client:
+            results = await client.fetch_filings([("72971", "10-K"), ("19617", "10-K")])
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: float = EDGAR_MAX_REQUESTS_PER_SECOND - 1,
+        max_connections: int = 10,
+        cache: Optional[FilingCache] = None,
+        archives_url: str = SEC_ARCHIVES_URL,
+        data_url: str = SEC_DATA_URL,
+        headers: Optional[dict[str, str]] = None,
+        timeout: float = 60.0,
+    ) -> None:
+        """
+        Args:
+            requests_per_second: Sustained request rate across the client
+            max_connections: Size of the keep-alive connection pool
+            cache: Optional FilingCache consulted before any network I/O
+            archives_url: EDGAR archives host, overridable for a local stand-in
+            data_url: EDGAR submissions API host, overridable for a local stand-in
+            headers: Headers sent with every request, built once
+            timeout: Total timeout in seconds for a single request
+        """
+        self.cache = cache
+        self.archives_url = archives_url
+        self.data_url = data_url
+        self._limiter = TokenBucket(requests_per_second)
+        self._max_connections = max_connections
+        self._headers = dict(headers or SEC_HEADERS)
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> AsyncEdgarClient:
+        connector = aiohttp.TCPConnector(limit=self._max_connections)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self._headers,
+            timeout=self._timeout,
+            auto_decompress=True,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get(
+        self,
+        url: str,
+        headers: Optional[dict[str, str]] = None,
+    ) -> tuple[int, bytes, dict[str, str]]:
+        if self._session is None:
+            raise RuntimeError("AsyncEdgarClient must be used as an async context manager")
+        await self._limiter.acquire()
+        async with self._session.get(url, headers=headers) as response:
+            body = await response.read()
+            return response.status, body, dict(response.headers)
+
+    async def find_filing(self, cik, form_type: str) -> tuple[str, str]:
+        """
+        Async counterpart of `find_sec_filing`.
+
+        Returns:
+            A tuple of (accession number, filing date)
+        """
+        cik = str(cik).lstrip('0')
+        url = f"{self.data_url}/submissions/CIK{cik.zfill(10)}.json"
+
+        cached = self.cache.get_submissions(cik) if self.cache is not None else None
+        if cached is not None and self.cache.is_fresh(cached):
+            self.cache.record_hit()
+            return select_filing(json.loads(cached.body), cik, form_type)
+
+        headers = self.cache.conditional_headers(cached) if self.cache is not None else None
+        status, body, response_headers = await self._get(url, headers=headers)
+        if status == 304 and cached is not None:
+            self.cache.record_revalidated(cik)
+            return select_filing(json.loads(cached.body), cik, form_type)
+        if status != 200:
+            raise Exception(f"Failed to get filings data: {status}")
+
+        text = body.decode('utf-8')
+        if self.cache is not None:
+            self.cache.record_miss()
+            self.cache.put_submissions(
+                cik,
+                text,
+                etag=response_headers.get('ETag'),
+                last_modified=response_headers.get('Last-Modified'),
+            )
+        return select_filing(json.loads(text), cik, form_type)
+
+    async def download_filing(self, cik, accession_number: str) -> str:
+        """
+        Async counterpart of `download_sec_filing`.
+
+        Returns:
+            HTML content of the filing
+        """
+        if self.cache is not None:
+            cached = self.cache.get_filing(cik, accession_number)
+            if cached is not None:
+                return cached[1]
+
+        cik_padded = str(cik).lstrip('0')
+        url = f"{self.archives_url}/Archives/edgar/data/{cik_padded}/{accession_number}-index.html"
+        status, body, _ = await self._get(url)
+        if status != 200:
+            raise Exception(f"Failed to download filing index: {status}")
+        index_page = body.decode('utf-8')
+
+        document_link = find_primary_document_link(index_page, self.archives_url)
+        status, body, _ = await self._get(document_link)
+        if status != 200:
+            raise Exception(f"Failed to download filing: {status}")
+        content = strip_submission_header(body.decode('utf-8'))
+
+        if self.cache is not None:
+            self.cache.put_filing(cik, accession_number, index_page, content)
+        return content
+
+    async def fetch_filing(self, cik, form_type: str) -> FilingResult:
+        """
+        Find and download the latest filing of a form type for one company.
+
+        Errors are captured on the result rather than raised.
+        """
+        result = FilingResult(cik=str(cik), form_type=form_type)
+        try:
+            result.accession_number, result.filing_date = await self.find_filing(cik, form_type)
+            result.html = await self.download_filing(cik, result.accession_number)
+        except Exception as e:
+            result.error = e
+        return result
+
+    async def fetch_filings(
+        self,
+        requests: Iterable[tuple[str, str]],
+        *,
+        concurrency: int = 50,
+    ) -> list[FilingResult]:
+        """
+        Fetch the latest filing for many (CIK, form type) pairs concurrently.
+
+        Args:
+            requests: Pairs of (CIK, form type)
+            concurrency: Maximum number of companies in flight at once; the
+                token bucket still bounds the overall request rate
+
+        Returns:
+            One FilingResult per request, in input order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(cik, form_type: str) -> FilingResult:
+            async with semaphore:
+                return await self.fetch_filing(cik, form_type)
+
+        return await asyncio.gather(
+            *(fetch(cik, form_type) for cik, form_type in requests)
+        )
+
+
+def fetch_filings(
+    requests: Iterable[tuple[str, str]],
+    **client_kwargs,
+) -> list[FilingResult]:
+    """
+    Synchronous entry point for `AsyncEdgarClient.fetch_filings`.
+    """
+    async def run() -> list[FilingResult]:
+        async with AsyncEdgarClient(**client_kwargs) as client:
+            return await client.fetch_filings(requests)
+
+    return asyncio.run(run())
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class CachedResponse:
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = 0.0
+
+
+class FilingCache:
+    """
+    FilingCache is a persistent on-disk cache for EDGAR downloads.
+
+    Filings are immutable once their accession number exists, so the index page
+    and the decoded primary document are stored under a key derived from
+    (CIK, accession) and served without any network I/O on later runs.
+
+    The `submissions/CIK*.json` responses do change over time. They are stored
+    together with their ETag / Last-Modified validators so that callers can
+    issue a conditional request and reuse the cached body on a 304.
+
+    All bodies are zlib-compressed. The total compressed size is bounded by
+    `max_bytes`; the least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: str = "sec_cache.sqlite",
+        *,
+        max_bytes: int = 2 * 1024 ** 3,
+        submissions_max_age: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            path: Location of the SQLite file backing the cache
+            max_bytes: Upper bound on the total compressed size of all entries
+            submissions_max_age: Seconds during which a cached submissions
+                response is used without revalidating it against the server
+        """
+        self.max_bytes = max_bytes
+        self.submissions_max_age = submissions_max_age
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _key(*parts: str) -> str:
+        return hashlib.sha256("/".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize_cik(cik) -> str:
+        return str(cik).lstrip('0')
+
+    def get_filing(self, cik, accession_number: str) -> Optional[tuple[str, str]]:
+        """
+        Get a cached filing.
+
+        Args:
+            cik: Central Index Key (company identifier)
+            accession_number: SEC filing accession number
+
+        Returns:
+            A tuple of (index page HTML, primary document HTML), or None on a miss
+        """
+        cik = self._normalize_cik(cik)
+        index_page = self._get(self._key("index", cik, accession_number))
+        document = self._get(self._key("document", cik, accession_number))
+        if index_page is None or document is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return index_page.body, document.body
+
+    def put_filing(self, cik, accession_number: str, index_page: str, document: str) -> None:
+        """
+        Store a filing's index page and decoded primary document.
+        """
+        cik = self._normalize_cik(cik)
+        self._put(self._key("index", cik, accession_number), index_page)
+        self._put(self._key("document", cik, accession_number), document)
+
+    def get_submissions(self, cik) -> Optional[CachedResponse]:
+        """
+        Get the cached submissions JSON for a company, including its validators.
+
+        Hit/miss counters are not updated here since a stale entry still needs
+        to be revalidated; see `is_fresh` and `record_revalidated`.
+        """
+        return self._get(self._key("submissions", self._normalize_cik(cik)))
+
+    def put_submissions(
+        self,
+        cik,
+        body: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self._put(
+            self._key("submissions", self._normalize_cik(cik)),
+            body,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def is_fresh(self, cached: CachedResponse) -> bool:
+        return time.time() - cached.stored_at < self.submissions_max_age
+
+    def record_hit(self) -> None:
+        self.stats.hits += 1
+
+    def record_miss(self) -> None:
+        self.stats.misses += 1
+
+    def record_revalidated(self, cik) -> None:
+        """
+        Record a 304 for the submissions entry and restart its freshness window.
+        """
+        self.stats.hits += 1
+        self.stats.revalidated += 1
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET stored_at = ? WHERE key = ?",
+                (time.time(), self._key("submissions", self._normalize_cik(cik))),
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def conditional_headers(cached: Optional[CachedResponse]) -> dict[str, str]:
+        """
+        Build If-None-Match / If-Modified-Since headers for a cached response.
+        """
+        headers = {}
+        if cached is None:
+            return headers
+        if cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+        return headers
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+        body, etag, last_modified, stored_at = row
+        return CachedResponse(
+            body=zlib.decompress(body).decode('utf-8'),
+            etag=etag,
+            last_modified=last_modified,
+            stored_at=stored_at,
+        )
+
+    def _put(
+        self,
+        key: str,
+        body: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        compressed = zlib.compress(body.encode('utf-8'), 6)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._total_bytes -= row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, body, size, etag, last_modified, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), etag, last_modified, now, now),
+            )
+            self._total_bytes += len(compressed)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Drop least recently used entries until we are back under the bound.
+        # Caller holds the lock and commits.
+        if self._total_bytes <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        )
+        to_delete = []
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", to_delete)
+        self.stats.evictions += len(to_delete)
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
+
+import numpy as np
+import pandas as pd
+from lxml import html as lxml_html
+
+from sec_parser.semantic_elements.table_element.table_element import TableElement
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sec_parser.semantic_elements.abstract_semantic_element import (
+        AbstractSemanticElement,
+    )
+
+# Scale hints such as "(in millions)" or "in thousands, except per share data"
+_SCALE_PATTERN = re.compile(r"\bin\s+(thousands|millions|billions)\b", re.IGNORECASE)
+_SCALES = {"thousands": 1e3, "millions": 1e6, "billions": 1e9}
+# "in millions, except per share data": the rows named in the carve-out are not scaled
+_EXCEPT_PATTERN = re.compile(r"\bexcept\b([^)\n]{0,80})", re.IGNORECASE)
+_PER_SHARE_PATTERN = re.compile(r"\bper[\s-]+share\b", re.IGNORECASE)
+_PER_SHARE_ROW_PATTERN = re.compile(
+    r"\bper\s+(?:\w+\s+){0,2}share\b|\bper[\s-]share\b|\bEPS\b", re.IGNORECASE
+)
+_SHARE_PATTERN = re.compile(r"\bshares?\b", re.IGNORECASE)
+_SHARE_ROW_PATTERN = re.compile(r"\bshares\b", re.IGNORECASE)
+
+# Cells holding nothing but a dash (nil / not applicable) become NaN
+_DASH_PATTERN = r"^[\-\u2010-\u2015\u2212]+$"
+
+# Fragments SEC tables put in a cell of their own next to the number
+_PREFIX_TOKENS = {"$", "€", "£", "¥"}
+_SUFFIX_TOKENS = {")", "%", ")%", "%)"}
+
+_LABEL_PATTERN = re.compile(r"[A-Za-z]")
+_YEAR_PATTERN = r"^(?:19|20)\d{2}$"
+
+
+def _unscaled_rows(scale_text: str, labels: List[str]) -> np.ndarray:
+    """Which rows the "except ..." carve-out of a scale hint excludes from scaling."""
+    exempt = np.zeros(len(labels), dtype=bool)
+    for match in _EXCEPT_PATTERN.finditer(scale_text):
+        carve_out = match.group(1)
+        row_patterns = []
+        if _PER_SHARE_PATTERN.search(carve_out):
+            row_patterns.append(_PER_SHARE_ROW_PATTERN)
+        # "except share and per share data" also leaves share counts alone
+        if _SHARE_PATTERN.search(_PER_SHARE_PATTERN.sub("", carve_out)):
+            row_patterns.append(_SHARE_ROW_PATTERN)
+        for row, label in enumerate(labels):
+            exempt[row] |= any(pattern.search(label) for pattern in row_patterns)
+    return exempt
+
+
+class FinancialTableElement(TableElement):
+    """
+    FinancialTableElement represents a table containing financial data in a 10-K report.
+    
+    This element extends the standard TableElement with additional metadata about
+    the type of financial information it contains (e.g., balance sheet, income statement).
+    It also provides methods for extracting structured financial data from the table.
+    """
+
+    def __init__(
+        self,
+        html_tag,
+        *,
+        table_type: str,
+        log_origin: Optional[str] = None,
+        processing_log = None,
+    ) -> None:
+        super().__init__(html_tag, log_origin=log_origin, processing_log=processing_log)
+        self._table_type = table_type
+        self._frames: Dict[tuple, pd.DataFrame] = {}
+        
+    @property
+    def table_type(self) -> str:
+        """
+        Get the type of financial table.
+        
+        Returns:
+            A string identifying the type of financial table (e.g., 'balance_sheet',
+            'income_statement', 'cash_flow', etc.)
+        """
+        return self._table_type
+    
+    @staticmethod
+    def create_from_element(
+        element: AbstractSemanticElement,
+        *,
+        table_type: str,
+        log_origin: Optional[str] = None,
+    ) -> FinancialTableElement:
+        """
+        Create a FinancialTableElement from another element.
+        
+        Args:
+            element: The source element to convert
+            table_type: The type of financial table
+            log_origin: The origin of the log entry
+            
+        Returns:
+            A new FinancialTableElement
+        """
+        processing_log = element.processing_log.copy()
+        if log_origin:
+            processing_log.add_item(
+                log_origin=log_origin,
+                message=f"Converted to FinancialTableElement with type: {table_type}",
+            )
+            
+        return FinancialTableElement(
+            element.html_tag,
+            table_type=table_type,
+            log_origin=log_origin,
+            processing_log=processing_log,
+        )
+    
+    def extract_structured_data(self, *, as_frame: bool = False) -> Dict[str, Any]:
+        """
+        Extract structured financial data from the table.
+        
+        Args:
+            as_frame: Return the data as a numeric DataFrame (see `to_frame`)
+                instead of a 2D list of cell strings
+        
+        Returns:
+            A dictionary containing the structured financial data
+        """
+        if as_frame:
+            frame = self.to_frame()
+            return {
+                "type": self._table_type,
+                "headers": {
+                    "columns": list(frame.columns),
+                    "rows": list(frame.index),
+                },
+                "data": frame,
+            }
+        
+        # This would be a more complex implementation in practice
+        # Here's a simplified version that extracts row/column headers and data
+        
+        structured_data = {
+            "type": self._table_type,
+            "headers": self._extract_headers(),
+            "data": self._extract_data(),
+        }
+        
+        return structured_data
+    
+    def _extract_headers(self) -> Dict[str, List[str]]:
+        """
+        Extract column and row headers from the table.
+        
+        Returns:
+            A dictionary with 'columns' and 'rows' keys containing lists of headers
+        """
+        # Get the HTML table
+        table = self.html_tag.find_tag("table")
+        if not table:
+            return {"columns": [], "rows": []}
+            
+        headers = {"columns": [], "rows": []}
+        
+        # Extract column headers (typically in thead or first row)
+        thead = table.find_tag("thead")
+        if thead:
+            th_elements = thead.find_all_tags("th")
+            headers["columns"] = [th.get_text().strip() for th in th_elements]
+        else:
+            # If no thead, use the first row
+            first_row = table.find_tag("tr")
+            if first_row:
+                th_elements = first_row.find_all_tags("th") or first_row.find_all_tags("td")
+                headers["columns"] = [th.get_text().strip() for th in th_elements]
+        
+        # Extract row headers (typically the first cell of each row)
+        rows = table.find_all_tags("tr")[1:]  # Skip the header row
+        for row in rows:
+            cells = row.find_all_tags("th") or row.find_all_tags("td")
+            if cells:
+                headers["rows"].append(cells[0].get_text().strip())
+                
+        return headers
+    
+    def _extract_data(self) -> List[List[str]]:
+        """
+        Extract the data cells from the table.
+        
+        Returns:
+            A 2D list of strings representing the table data
+        """
+        # Get the HTML table
+        table = self.html_tag.find_tag("table")
+        if not table:
+            return []
+            
+        # Get all rows
+        rows = table.find_all_tags("tr")
+        
+        # Skip the header row
+        data_rows = []
+        for row in rows[1:]:
+            cells = row.find_all_tags("td")
+            data_rows.append([cell.get_text().strip() for cell in cells])
+            
+        return data_rows
+
+    
+    def to_frame(self, caption: Optional[str] = None, *, apply_scale: bool = True) -> pd.DataFrame:
+        """
+        Extract the table as a float64 DataFrame.
+        
+        Leading rows without numbers become the column labels and the first
+        cell of every other row becomes the index. Values are converted
+        column-wise: "(1,234)" becomes -1234.0, dashes and blanks become NaN,
+        and amounts are multiplied by the scale hint ("in thousands",
+        "in millions", "in billions") found in the caption, or in the table
+        text when no caption is given. Percentages are never scaled, and
+        neither are the per-share (and share count) rows a hint such as
+        "in millions, except per share data" carves out.
+        
+        The result is cached on the element and every call returns a copy of
+        it, so callers may modify the frame they get.
+        
+        Args:
+            caption: Text describing the table, e.g. the paragraph above it
+            apply_scale: Whether to apply the scale hint
+        
+        Returns:
+            A DataFrame indexed by row label with one float64 column per value column
+        """
+        key = (caption, apply_scale)
+        if key not in self._frames:
+            self._frames[key] = self._build_frame(caption, apply_scale)
+        return self._frames[key].copy()
+    
+    def _extract_cell_rows(self) -> List[List[list]]:
+        """
+        Extract the cells of every row that has text as [text, first column,
+        colspan] lists, gluing currency symbols, closing parentheses and
+        percent signs to the number they belong to (their own cell is left
+        empty). Cells keep their column positions, blank ones included.
+        """
+        root = lxml_html.fromstring(self.html_tag.get_source_code())
+        rows = []
+        for tr in root.iter("tr"):
+            cells: List[list] = []
+            column = 0
+            pending_prefix = ""
+            last_value = None
+            for cell in tr.xpath("./td|./th"):
+                colspan = cell.get("colspan", "1")
+                span = int(colspan) if colspan.isdigit() and int(colspan) > 0 else 1
+                text = " ".join(cell.text_content().split())
+                cells.append([text, column, span])
+                column += span
+                if not text:
+                    continue
+                if text in _PREFIX_TOKENS:
+                    pending_prefix = text
+                    cells[-1][0] = ""
+                elif text in _SUFFIX_TOKENS and last_value is not None:
+                    last_value[0] += text
+                    cells[-1][0] = ""
+                else:
+                    cells[-1][0] = pending_prefix + text
+                    pending_prefix = ""
+                    last_value = cells[-1]
+            if last_value is not None:
+                rows.append(cells)
+        return rows
+    
+    def _build_frame(self, caption: Optional[str], apply_scale: bool) -> pd.DataFrame:
+        rows = self._extract_cell_rows()
+        if not rows:
+            return pd.DataFrame(dtype=np.float64)
+        
+        # The first cell with text is the row label when it contains letters
+        labels = []
+        for cells in rows:
+            first = next(cell for cell in cells if cell[0])
+            if _LABEL_PATTERN.search(first[0]):
+                labels.append(first[0])
+                first[0] = ""
+            else:
+                labels.append("")
+        
+        # Values at their column positions; `spanned` repeats every text over
+        # the columns its cell spans, to line header cells up with the values
+        width = max(cells[-1][1] + cells[-1][2] for cells in rows)
+        positioned = [[""] * width for _ in rows]
+        spanned = [[""] * width for _ in rows]
+        for row, cells in enumerate(rows):
+            for text, column, span in cells:
+                positioned[row][column] = text
+                spanned[row][column:column + span] = [text] * span
+        grid = pd.DataFrame(positioned, dtype=object)
+        
+        raw = grid.stack(future_stack=True).astype(str)
+        # A glued currency prefix comes before the sign: "$(1,234)" is negative too
+        signed = raw.str.replace(r"[$€£¥\s]", "", regex=True)
+        is_negative = signed.str.startswith("(") & signed.str.contains(")", regex=False)
+        is_percent = raw.str.contains("%", regex=False)
+        cleaned = raw.str.replace(r"[$€£¥,()%\s]", "", regex=True)
+        cleaned = cleaned.mask(cleaned.str.fullmatch(_DASH_PATTERN), "")
+        values = pd.to_numeric(cleaned, errors="coerce").astype(np.float64)
+        values = values.mask(is_negative, -values)
+        
+        if apply_scale:
+            scale_text = caption if caption is not None else self.text
+            hint = _SCALE_PATTERN.search(scale_text)
+            if hint:
+                exempt = _unscaled_rows(scale_text, labels)[values.index.get_level_values(0)]
+                scaled = ~is_percent & ~exempt
+                values = values.mask(scaled, values * _SCALES[hint.group(1).lower()])
+        
+        numeric = values.unstack().to_numpy(dtype=np.float64)
+        cells = raw.unstack().to_numpy()
+        
+        # Leading rows without amounts (a row of fiscal years counts as text) are headers
+        is_amount = (~values.isna() & ~raw.str.fullmatch(_YEAR_PATTERN)).unstack().to_numpy()
+        header_rows = 0
+        while header_rows < len(rows) - 1 and not is_amount[header_rows].any():
+            header_rows += 1
+        
+        # Spacer columns (blank, or left behind by a glued "$" or ")") are
+        # empty in every row below the headers; a header over a spacer column
+        # belongs to the value column to its right
+        kept = np.flatnonzero((cells[header_rows:] != "").any(axis=0))
+        columns = []
+        previous = -1
+        for col in kept:
+            texts = []
+            for row in range(header_rows):
+                text = spanned[row][col] or next(
+                    (spanned[row][spacer] for spacer in range(col - 1, previous, -1) if spanned[row][spacer]),
+                    "",
+                )
+                if text:
+                    texts.append(text)
+            previous = col
+            label = " ".join(texts) or f"column_{len(columns)}"
+            while label in columns:
+                label += "'"
+            columns.append(label)
+        
+        return pd.DataFrame(
+            numeric[header_rows:, kept],
+            index=pd.Index(labels[header_rows:], name="label"),
+            columns=columns,
+        )
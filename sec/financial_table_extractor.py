@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence
+import re
+
+from sec_parser.processing_steps.abstract_classes.abstract_elementwise_processing_step import (
+    AbstractElementwiseProcessingStep,
+    ElementProcessingContext,
+)
+from sec_parser.semantic_elements.table_element.table_element import TableElement
+from financial_table_element import FinancialTableElement
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sec_parser.semantic_elements.abstract_semantic_element import (
+        AbstractSemanticElement,
+    )
+
+
+# Keywords that typically appear in financial tables
+FINANCIAL_KEYWORDS = (
+    "assets", "liabilities", "equity", "revenue", "income", "expense", 
+    "earnings", "profit", "loss", "total", "net", "cash", "operating", 
+    "investing", "financing", "depreciation", "amortization", "tax",
+    "deficit", "balance", "retained", "accumulated", "capital"
+)
+
+# Table types in priority order: when a caption matches several, the first wins
+FINANCIAL_TABLE_TYPES = (
+    "balance_sheet",
+    "income_statement",
+    "cash_flow",
+    "stockholders_equity",
+    "notes",
+)
+
+# One alternation covering every table type. The optional "consolidated" prefixes
+# and plural suffixes never change whether a caption matches, so they are left out;
+# every branch then starts with a literal, which keeps the scan cheap. The
+# un-named "balance sheet" branch and "changes in ... equity" map to their types
+# in `_match_type`.
+_FINANCIAL_TABLE_PATTERN = re.compile(
+    r"balance\s+sheet"
+    r"|statements?\s+of\s+(?:"
+    r"(?P<balance_sheet>(?:financial\s+)?position)"
+    r"|(?P<income_statement>operations|income|earnings|comprehensive\s+income)"
+    r"|(?P<cash_flow>cash\s+flow)"
+    r"|(?P<stockholders_equity>(?:stockholders|shareholders)'?\s+equity))"
+    r"|(?P<changes_in_equity>changes\s+in\s+(?:stockholders|shareholders)'?\s+equity)"
+    r"|(?P<notes>notes\s+to\s+(?:consolidated\s+)?financial\s+statement)",
+    re.IGNORECASE,
+)
+
+_CURRENCY_SYMBOLS = ("$", "€", "£", "¥")
+_FINANCIAL_NUMBER_PATTERN = re.compile(r'\d{1,3}(,\d{3})+(\.\d+)?')
+
+
+@dataclass(frozen=True)
+class FinancialTableMatch:
+    table_type: Optional[str]
+    keyword_count: int
+    has_currency: bool
+    has_financial_numbers: bool
+
+
+class FinancialTableMatcher:
+    """
+    FinancialTableMatcher classifies table captions and contents using
+    precompiled patterns shared across all tables.
+
+    The caption is matched against a single alternation of all financial
+    statement patterns instead of one regex per table type. The content check
+    stops counting keywords once the threshold is reached and only then looks
+    for currency symbols or formatted numbers.
+    """
+
+    def __init__(
+        self,
+        keywords: Sequence[str] = FINANCIAL_KEYWORDS,
+        *,
+        min_keywords: int = 3,
+    ) -> None:
+        self._keywords = tuple(keyword.lower() for keyword in keywords)
+        self._min_keywords = min_keywords
+
+    @staticmethod
+    def _match_type(match: re.Match) -> str:
+        group = match.lastgroup
+        if group is None:
+            return "balance_sheet"
+        if group == "changes_in_equity":
+            return "stockholders_equity"
+        return group
+
+    def identify_table_type(self, text: str) -> Optional[str]:
+        """
+        Identify the type of financial table based on its caption or surrounding text.
+
+        Returns the same type as trying each table type's pattern in
+        FINANCIAL_TABLE_TYPES order.
+        """
+        match = _FINANCIAL_TABLE_PATTERN.search(text)
+        if match is None:
+            return None
+
+        # A later match can still belong to a higher priority type
+        best = FINANCIAL_TABLE_TYPES.index(self._match_type(match))
+        while best > 0:
+            match = _FINANCIAL_TABLE_PATTERN.search(text, match.start() + 1)
+            if match is None:
+                break
+            best = min(best, FINANCIAL_TABLE_TYPES.index(self._match_type(match)))
+        return FINANCIAL_TABLE_TYPES[best]
+
+    def count_keywords(self, lowered_text: str, limit: Optional[int] = None) -> int:
+        count = 0
+        for keyword in self._keywords:
+            if keyword in lowered_text:
+                count += 1
+                if count == limit:
+                    break
+        return count
+
+    @staticmethod
+    def has_currency(text: str) -> bool:
+        return any(symbol in text for symbol in _CURRENCY_SYMBOLS)
+
+    @staticmethod
+    def has_financial_numbers(text: str) -> bool:
+        return _FINANCIAL_NUMBER_PATTERN.search(text) is not None
+
+    def contains_financial_data(self, text: str) -> bool:
+        """
+        Check if a table's text contains financial data.
+
+        A table qualifies with at least `min_keywords` financial keywords and
+        either currency symbols or formatted numbers.
+        """
+        if self.count_keywords(text.lower(), self._min_keywords) < self._min_keywords:
+            return False
+        return self.has_currency(text) or self.has_financial_numbers(text)
+
+    def match(self, caption: str, table_text: str) -> FinancialTableMatch:
+        """
+        Compute every classification signal for a table, without short-circuiting.
+        """
+        return FinancialTableMatch(
+            table_type=self.identify_table_type(caption),
+            keyword_count=self.count_keywords(table_text.lower()),
+            has_currency=self.has_currency(table_text),
+            has_financial_numbers=self.has_financial_numbers(table_text),
+        )
+
+
+class FinancialTableExtractor(AbstractElementwiseProcessingStep):
+    """
+    FinancialTableExtractor identifies and classifies financial tables in 10-K reports.
+    
+    This processing step looks for tables that contain financial information and
+    classifies them as FinancialTableElement instances. It specifically targets:
+    
+    1. Balance Sheets
+    2. Income Statements
+    3. Cash Flow Statements
+    4. Statement of Stockholders' Equity
+    5. Notes to Financial Statements
+    
+    This helps with extracting structured financial data from the 10-K report.
+    """
+
+    def __init__(
+        self,
+        *,
+        types_to_process: set[type[AbstractSemanticElement]] | None = None,
+        types_to_exclude: set[type[AbstractSemanticElement]] | None = None,
+    ) -> None:
+        super().__init__(
+            types_to_process=types_to_process,
+            types_to_exclude=types_to_exclude,
+        )
+        
+        self._matcher = FinancialTableMatcher(FINANCIAL_KEYWORDS)
+
+    def _process_element(
+        self,
+        element: AbstractSemanticElement,
+        _: ElementProcessingContext,
+    ) -> AbstractSemanticElement:
+        """
+        Process an element to determine if it represents a financial table.
+        """
+        if not isinstance(element, TableElement):
+            return element
+            
+        # Get the table's caption or find text before the table
+        caption = self._get_table_caption(element)
+        
+        # Check if the caption matches any financial table patterns
+        table_type = self._identify_financial_table_type(caption)
+        
+        # If no match by caption, check table content
+        if not table_type and self._contains_financial_data(element):
+            table_type = "financial_data"
+        
+        # If identified as a financial table, convert to FinancialTableElement
+        if table_type:
+            element.processing_log.add_item(
+                log_origin=self.__class__.__name__,
+                message=f"Identified financial table type: {table_type}"
+            )
+            
+            return FinancialTableElement.create_from_element(
+                element,
+                table_type=table_type,
+                log_origin=self.__class__.__name__,
+            )
+            
+        return element
+    
+    def _get_table_caption(self, table_element: TableElement) -> str:
+        """
+        Get the caption of a table, either from a caption tag or nearby text.
+        
+        Args:
+            table_element: The table element to find caption for
+            
+        Returns:
+            The caption text if found, empty string otherwise
+        """
+        # Check for HTML caption tag
+        caption_tag = table_element.html_tag.find_tag("caption")
+        if caption_tag:
+            return caption_tag.get_text().strip()
+        
+        # Check for title in preceding elements (more complex in real implementation)
+        # This is a simplified approach
+        return table_element.html_tag.get_text()[:200].strip()
+    
+    def _identify_financial_table_type(self, text: str) -> Optional[str]:
+        """
+        Identify the type of financial table based on its caption or surrounding text.
+        
+        Args:
+            text: The text to analyze
+            
+        Returns:
+            The identified table type or None if not recognized
+        """
+        return self._matcher.identify_table_type(text)
+    
+    def _contains_financial_data(self, table_element: TableElement) -> bool:
+        """
+        Check if a table contains financial data by analyzing its content.
+        
+        Args:
+            table_element: The table element to analyze
+            
+        Returns:
+            True if the table appears to contain financial data, False otherwise
+        """
+        return self._matcher.contains_financial_data(table_element.text)
@@ -0,0 +1,202 @@
+import json
+import requests
+import re
+import io
+import pandas as pd
+from bs4 import BeautifulSoup
+
+SEC_ARCHIVES_URL = "https://www.sec.gov"
+SEC_DATA_URL = "https://data.sec.gov"
+
+# Add headers to avoid being blocked by SEC.gov
+SEC_HEADERS = {
+    'User-Agent': 'Example Company Name research@example.com',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# Shared session so repeated calls reuse keep-alive connections
+_session = requests.Session()
+_session.headers.update(SEC_HEADERS)
+
+def find_primary_document_link(index_page, base_url=SEC_ARCHIVES_URL):
+    """
+    Find the primary document URL in a filing's -index.html page.
+    
+    Args:
+        index_page: HTML of the filing index page
+        base_url: EDGAR archives host the link is resolved against
+    
+    Returns:
+        URL of the primary HTML document
+    """
+    soup = BeautifulSoup(index_page, "html.parser")
+    table_tag = soup.find("table",class_="tableFile",summary="Data Files")
+    rows = table_tag.find_all('tr')
+    for row in rows:
+        cells = row.find_all("td")
+        if len(cells) > 3 and "EXTRACTED" in cells[1].text:
+            xbrl_link = f"{base_url}/{cells[2].a['href']}"
+    
+    return xbrl_link.replace("_htm.xml",".htm")
+
+def strip_submission_header(content):
+    """
+    Drop the SEC submission metadata in front of the HTML document.
+    
+    Args:
+        content: Body of the primary document response, decoded or raw bytes
+    
+    Returns:
+        The HTML portion, or the full content if no HTML tag was found. Raw
+        bytes are decoded as UTF-8 without copying the undecoded slice.
+    """
+    if isinstance(content, bytes):
+        # Find the beginning of the HTML document
+        doc_start = content.find(b'<HTML')
+        if doc_start == -1:
+            doc_start = content.find(b'<html')
+        return str(memoryview(content)[max(doc_start, 0):], 'utf-8')
+    
+    # Find the beginning of the HTML document
+    doc_start = content.find('<HTML')
+    if doc_start == -1:
+        doc_start = content.find('<html')
+    
+    # If no HTML tags found, keep the full content, otherwise just the HTML portion
+    if doc_start != -1:
+        content = content[doc_start:]
+    
+    return content
+
+def select_filing(data, cik, form_type):
+    """
+    Pick the most recent filing of a form type from a submissions JSON.
+    
+    Returns:
+        A tuple of (accession number, filing date)
+    """
+    # Get recent filings
+    recent_filings = data.get('filings', {}).get('recent', {})
+    if not recent_filings:
+        raise Exception(f"No filings found for CIK {cik}")
+    
+    # Get forms, dates, and accession numbers
+    forms = recent_filings.get('form', [])
+    dates = recent_filings.get('filingDate', [])
+    accessions = recent_filings.get('accessionNumber', [])
+    
+    # Filter by form type
+    for i, form in enumerate(forms):
+        if form == form_type:
+            filing_date = dates[i]
+            accession = accessions[i]
+            return accession, filing_date
+    
+    raise Exception(f"No {form_type} filing found for CIK {cik}")
+
+def download_sec_filing(cik, accession_number, cache=None, base_url=SEC_ARCHIVES_URL):
+    """
+    Download an SEC filing by CIK and accession number.
+    
+    Args:
+        cik: Central Index Key (company identifier)
+        accession_number: SEC filing accession number
+        cache: Optional FilingCache; filings are immutable, so a hit is served
+            without touching the network
+        base_url: EDGAR archives host, overridable for a local stand-in
+    
+    Returns:
+        HTML content of the filing
+    """
+    if cache is not None:
+        cached = cache.get_filing(cik, accession_number)
+        if cached is not None:
+            return cached[1]
+
+    # Format CIK and accession number for the URL
+    cik_padded = str(cik).lstrip('0')
+    
+    # Construct the URL for the filing
+    url = f"{base_url}/Archives/edgar/data/{cik_padded}/{accession_number}-index.html"
+
+    print(f"URL: {url}")
+    
+    # Download the filing
+    response = _session.get(url)
+    index_page = response.text
+    document_link = find_primary_document_link(index_page, base_url)
+    
+    response = _session.get(document_link)
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to download filing: {response.status_code}")
+    
+    print(f'Fethed Document from link: {document_link}')
+    # SEC returns the complete submission file, which includes metadata and the actual filing
+    content = strip_submission_header(response.content)
+    
+    if cache is not None:
+        cache.put_filing(cik, accession_number, index_page, content)
+    
+    return content
+
+def find_sec_filing(cik, form_type, start_date=None, end_date=None, cache=None, base_url=SEC_DATA_URL):
+    """Get a specific filing accession number for a company.
+
+    When a FilingCache is given, the submissions JSON is revalidated with
+    If-None-Match / If-Modified-Since and reused on a 304.
+    """
+    # Clean CIK number
+    cik = str(cik).lstrip('0')
+    
+    # Construct URL for SEC API
+    url = f"{base_url}/submissions/CIK{cik.zfill(10)}.json"
+    
+    cached = cache.get_submissions(cik) if cache is not None else None
+    if cached is not None and cache.is_fresh(cached):
+        cache.record_hit()
+        data = json.loads(cached.body)
+    else:
+        # Make request, conditional on the cached validators if we have any
+        headers = cache.conditional_headers(cached) if cache is not None else {}
+        response = _session.get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            cache.record_revalidated(cik)
+            data = json.loads(cached.body)
+        elif response.status_code != 200:
+            raise Exception(f"Failed to get filings data: {response.status_code}")
+        else:
+            if cache is not None:
+                cache.record_miss()
+                cache.put_submissions(
+                    cik,
+                    response.text,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                )
+            # Parse JSON response
+            data = response.json()
+    
+    return select_filing(data, cik, form_type)
+
+def open_sec_filing_stream(cik, accession_number, base_url=SEC_ARCHIVES_URL):
+    """
+    Open an SEC filing's primary document as a binary stream.
+    
+    Unlike download_sec_filing, the body is not read into memory; pass the
+    stream to StreamingEdgar10KParser.iter_sections. The caller closes it.
+    
+    Returns:
+        A file-like object yielding the (gzip-decoded) document bytes
+    """
+    cik_padded = str(cik).lstrip('0')
+    url = f"{base_url}/Archives/edgar/data/{cik_padded}/{accession_number}-index.html"
+    document_link = find_primary_document_link(_session.get(url).text, base_url)
+    
+    response = _session.get(document_link, stream=True)
+    if response.status_code != 200:
+        response.close()
+        raise Exception(f"Failed to download filing: {response.status_code}")
+    
+    response.raw.decode_content = True
+    return response.raw
\ No newline at end of file
@@ -0,0 +1,32 @@
+from sec_10k_parser_v2 import Edgar10KParser
+from helper_functions import *
+from filing_cache import FilingCache
+from sec_10k_nesting import SEC10KNestingRule, SEC10KTreeBuilder
+from tree_serialization import render_to, save_tree
+import sys
+
+
+def get_rules():
+    rules = [SEC10KNestingRule()]
+    return rules
+
+# Main execution
+cache = FilingCache()
+accession, filing_date = find_sec_filing('72971', '10-K', cache=cache)
+html_content = download_sec_filing('72971', accession_number=accession, cache=cache)
+
+# Parse the document
+parser = Edgar10KParser()
+elements = parser.parse(html_content)
+
+# Build the tree with custom nesting rules
+builder = SEC10KTreeBuilder(get_rules=get_rules)
+tree = builder.build(elements)
+
+# Render once, streaming to both stdout and the file
+with open('rendered_tree.txt', 'w', encoding='utf-8') as op_file:
+    render_to(tree, sys.stdout, op_file)
+print()
+
+# Save the tree so it can be reloaded with load_tree() without parsing again
+save_tree(tree, 'semantic_tree.jsonl')
\ No newline at end of file
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sec_parser.semantic_elements import TitleElement
+from sec_parser.semantic_elements.top_section_title import TopSectionTitle
+from sec_parser.semantic_tree import AbstractNestingRule, TreeBuilder
+from sec_parser.semantic_tree.semantic_tree import SemanticTree
+from sec_parser.semantic_tree.tree_node import TreeNode
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sec_parser.semantic_elements.abstract_semantic_element import (
+        AbstractSemanticElement,
+    )
+
+
+# Custom nesting rule for 10-K structure
+class SEC10KNestingRule(AbstractNestingRule):
+    def __init__(self):
+        self.part_items = {
+            "part1": ["item1", "item1a", "item1b", "item2", "item3", "item4"],
+            "part2": ["item5", "item6", "item7", "item7a", "item8",
+                      "item9", "item9a", "item9b", "item9c"],
+            "part3": ["item10", "item11", "item12", "item13", "item14"],
+            "part4": ["item15", "item16"]
+        }
+        # Create reverse mapping from item to parent part
+        self.item_to_part = {}
+        for part, items in self.part_items.items():
+            for item in items:
+                self.item_to_part[item] = part
+        super().__init__()
+
+    def _should_be_nested_under(self, parent, child):
+        # Handle Part > Item nesting
+        if isinstance(parent, TopSectionTitle) and isinstance(child, TopSectionTitle):
+            if parent.section_type.level == 0 and child.section_type.level == 1:
+                return child.section_type.identifier in self.part_items.get(
+                    parent.section_type.identifier, []
+                )
+
+        # Handle Item > Subitem nesting
+        if isinstance(parent, TopSectionTitle) and isinstance(child, TopSectionTitle):
+            if parent.section_type.level == 1 and child.section_type.level == 2:
+                return True
+
+        # Nest content under nearest section title
+        if isinstance(parent, TopSectionTitle) and not isinstance(child, TitleElement):
+            return True
+
+        return False
+
+
+class SEC10KTreeBuilder(TreeBuilder):
+    """
+    SEC10KTreeBuilder builds the same tree as TreeBuilder with
+    SEC10KNestingRule, in a single linear pass.
+
+    SEC10KNestingRule only ever nests elements under a TopSectionTitle, so
+    instead of keeping every element on the stack only the current
+    Part/Item/sub-item ancestry is kept. Each element is checked against that
+    ancestry from the innermost section outwards; sections that do not accept
+    it are closed, exactly as TreeBuilder pops its stack. Children are appended
+    directly, avoiding the membership check of TreeNode.add_child, which is
+    linear in the number of children and made large sections quadratic.
+
+    Custom rules passed through `get_rules` must likewise only nest under
+    TopSectionTitle elements.
+    """
+
+    @staticmethod
+    def get_default_rules() -> list[AbstractNestingRule]:
+        return [SEC10KNestingRule()]
+
+    def build(self, elements: list[AbstractSemanticElement]) -> SemanticTree:
+        rules = self.get_rules()
+        ancestry: list[TreeNode] = []
+        root_nodes: list[TreeNode] = []
+
+        for element in elements:
+            new_node = TreeNode(element)
+            while ancestry and not any(
+                rule.should_be_nested_under(
+                    parent=ancestry[-1].semantic_element,
+                    child=element,
+                )
+                for rule in rules
+            ):
+                ancestry.pop()
+
+            if ancestry:
+                parent_node = ancestry[-1]
+                parent_node._children.append(new_node)
+                new_node._parent = parent_node
+            else:
+                root_nodes.append(new_node)
+
+            if isinstance(element, TopSectionTitle):
+                ancestry.append(new_node)
+
+        return SemanticTree(root_nodes)
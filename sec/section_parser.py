@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import html as html_lib
+import io
+import re
+from typing import Optional
+
+from streaming_parser import ParsedSection, StreamingEdgar10KParser
+from top_section_manager_for_10k import TopSectionManagerFor10K
+from top_section_title_types_10k import IDENTIFIER_TO_10K_SECTION, ITEM_TO_PART
+
+_ANCHOR_PATTERN = re.compile(
+    r"""<a\b[^>]*?\bhref\s*=\s*["']?#([^"'\s>]+)[^>]*>(.*?)</a\s*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def _visible_text(html: str) -> str:
+    return " ".join(html_lib.unescape(_TAG_PATTERN.sub(" ", html)).split())
+
+
+def _match_section_id(text: str) -> Optional[str]:
+    if part := TopSectionManagerFor10K.match_part(text):
+        return f"part{part}"
+    if item := TopSectionManagerFor10K.match_item(text):
+        return f"item{item}"
+    return None
+
+
+def find_toc_targets(html: str) -> list[tuple[str, str]]:
+    """
+    Find the table of contents links to Part/Item sections.
+
+    A link counts when its own text, or the text of the table row it sits in,
+    starts like a Part/Item heading (e.g. "Item 7." in one cell and the linked
+    title in the next).
+
+    Returns:
+        Pairs of (section id, anchor name) in table of contents order
+    """
+    targets = []
+    seen = set()
+    for match in _ANCHOR_PATTERN.finditer(html):
+        anchor = match.group(1)
+        if anchor in seen:
+            continue
+        section_id = _match_section_id(_visible_text(match.group(2)))
+        if section_id is None:
+            row_start = html.rfind("<tr", 0, match.start())
+            row_end = html.find("</tr", match.end())
+            if row_start != -1 and row_end != -1:
+                section_id = _match_section_id(_visible_text(html[row_start:row_end]))
+        if section_id is not None:
+            seen.add(anchor)
+            targets.append((section_id, anchor))
+    return targets
+
+
+def _find_anchor_offset(html: str, anchor: str) -> Optional[int]:
+    match = re.search(
+        r"""\b(?:id|name)\s*=\s*["']?""" + re.escape(anchor) + r"""["'\s/>]""",
+        html,
+    )
+    if match is None:
+        return None
+    return html.rfind("<", 0, match.start())
+
+
+def locate_section(html: str, section_id: str) -> Optional[tuple[int, int]]:
+    """
+    Locate a section's character range using the table of contents anchors.
+
+    The section runs from the element its TOC link points to up to the next
+    linked Part/Item heading.
+
+    Returns:
+        A (start, end) range into `html`, or None if the TOC does not link it
+    """
+    offsets = {}
+    for target_id, anchor in find_toc_targets(html):
+        offset = _find_anchor_offset(html, anchor)
+        if offset is not None and target_id not in offsets:
+            offsets[target_id] = offset
+
+    start = offsets.get(section_id)
+    if start is None:
+        return None
+    end = min((offset for offset in offsets.values() if offset > start), default=len(html))
+    return start, end
+
+
+def parse_section(
+    html: str,
+    section_id: str,
+    *,
+    parser: Optional[StreamingEdgar10KParser] = None,
+) -> Optional[ParsedSection]:
+    """
+    Parse a single 10-K section, e.g. parse_section(html, "item7").
+
+    The section is located through the table of contents anchors and only its
+    slice of the document runs through the Edgar10KParser pipeline. Items are
+    parsed behind a heading for their Part, so they come out as TopSectionTitle
+    just like in a full parse. Filings without a usable table of contents fall
+    back to StreamingEdgar10KParser.parse_section, which stops reading after
+    the section. Page numbers and page headers are recognized from how often
+    they recur in the whole document, so within a single section they stay
+    title/text elements.
+
+    Returns:
+        The parsed section, or None if not found
+    """
+    parser = parser or StreamingEdgar10KParser()
+    section_range = locate_section(html, section_id)
+    if section_range is None:
+        return parser.parse_section(io.BytesIO(html.encode("utf-8")), section_id)
+
+    start, end = section_range
+    part_block = None
+    part_id = ITEM_TO_PART.get(section_id)
+    if part_id is not None:
+        part_block = f"<p>{IDENTIFIER_TO_10K_SECTION[part_id].title}</p>"
+    return parser.parse_blocks(section_id, [html[start:end]], part_block=part_block)
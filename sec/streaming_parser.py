@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Iterator, Optional, Union
+
+from lxml import etree
+
+from sec_parser.processing_engine.html_tag import HtmlTag
+from sec_parser.processing_steps.page_header_classifier import PageHeaderClassifier
+from sec_parser.processing_steps.page_number_classifier import PageNumberClassifier
+from sec_parser.semantic_elements.semantic_elements import TextElement
+from sec_10k_parser import Edgar10KParser
+from top_section_manager_for_10k import TopSectionManagerFor10K
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sec_parser.semantic_elements.abstract_semantic_element import (
+        AbstractSemanticElement,
+    )
+
+HtmlStream = Union[str, os.PathLike, IO[bytes]]
+
+# Parent tag TextElementMerger wraps adjacent text elements in
+_MERGED_TEXT_TAG = "sec-parser-merged-text"
+
+# Elements that may wrap the blocks of a filing; tables, lists and the like never do
+WRAPPER_TAGS = {"div", "section", "article", "main", "center", "font", "document", "text"}
+
+
+@dataclass
+class ParsedSection:
+    """
+    Semantic elements of one top section of a 10-K.
+
+    `section_id` is the identifier of the section heading ('part1', 'item7',
+    ...), or None for the cover page and table of contents before the first
+    heading.
+    """
+    section_id: Optional[str]
+    elements: list[AbstractSemanticElement]
+
+
+class _RunningPageNumberClassifier(PageNumberClassifier):
+    """
+    PageNumberClassifier whose candidate counts carry over between sections,
+    so page numbers are recognized once they have recurred often enough.
+    """
+
+    def __init__(self, candidate_count: Counter, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._candidate_count = candidate_count
+
+
+class _RunningPageHeaderClassifier(PageHeaderClassifier):
+    def __init__(self, candidate_count: Counter, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._candidate_count = candidate_count
+
+
+def iter_html_blocks(
+    stream: IO[bytes],
+    *,
+    chunk_size: int = 64 * 1024,
+    wrapper_threshold: int = 20,
+) -> Iterator[tuple[str, str]]:
+    """
+    Read an HTML document incrementally and yield its top-level blocks.
+
+    Blocks are the children of <body>. When an element grows more than
+    `wrapper_threshold` children while still open (SEC documents often wrap
+    the whole filing in one <div>, or in several nested ones), and it is
+    nested in <body> through wrapper elements (WRAPPER_TAGS) only, the
+    wrappers are descended into: their children are emitted instead, down to
+    that element. Emitted blocks are removed from the tree, so memory is
+    bounded by the largest block rather than by the document.
+
+    Yields:
+        Tuples of (block HTML, normalized block text)
+    """
+    parser = etree.HTMLPullParser(
+        events=("start", "end"),
+        huge_tree=True,
+        remove_comments=True,
+    )
+    # <body> and the wrappers descended into: their children are the blocks
+    containers = set()
+
+    def emit(element):
+        html = etree.tostring(element, encoding="unicode", method="html", with_tail=True)
+        text = " ".join("".join(element.itertext()).split())
+        element.getparent().remove(element)
+        return html, text
+
+    def wrapper_path(element):
+        """[container, wrapper, ..., element] when only wrappers lie in between, else None."""
+        path = [element]
+        node = element.getparent()
+        while node is not None:
+            path.append(node)
+            if node in containers:
+                return path[::-1]
+            if node.tag not in WRAPPER_TAGS:
+                return None
+            node = node.getparent()
+        return None
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            parser.feed(chunk)
+        else:
+            parser.close()
+
+        for event, element in parser.read_events():
+            if event == "start":
+                if element.tag == "body" and not containers:
+                    containers.add(element)
+                continue
+            if not containers:
+                continue
+
+            parent = element.getparent()
+            if parent is None:
+                continue
+            if parent in containers:
+                if element in containers:
+                    # A wrapper closing; its children were emitted already
+                    containers.discard(element)
+                    parent.remove(element)
+                else:
+                    yield emit(element)
+            elif len(parent) >= wrapper_threshold and parent.tag in WRAPPER_TAGS:
+                path = wrapper_path(parent)
+                if path is None:
+                    continue
+                # Descend through every wrapper level down to `parent`. Only
+                # the children before the open path, and those of `parent` up
+                # to `element`, are complete: the parser may have read further
+                # into the chunk, and later children arrive with their own
+                # end events
+                for upper, lower in zip(path, path[1:]):
+                    containers.add(lower)
+                    for child in list(upper):
+                        if child is lower:
+                            break
+                        yield emit(child)
+                for child in list(parent):
+                    yield emit(child)
+                    if child is element:
+                        break
+
+        if not chunk:
+            return
+
+
+def _normalized_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _drop_block(
+    elements: list[AbstractSemanticElement],
+    block: str,
+    *,
+    at_end: bool = False,
+) -> list[AbstractSemanticElement]:
+    """
+    Drop what was parsed from the injected HTML `block` at the start (or end)
+    of `elements`, whatever it was classified as. A block that was merged
+    into the adjacent text is cut out of the merged TextElement.
+    """
+    if not elements:
+        return elements
+    index = -1 if at_end else 0
+    element = elements[index]
+    root = etree.fromstring(block, etree.HTMLParser())
+    block_text = _normalized_text("".join(root.itertext())) if root is not None else ""
+
+    if _normalized_text(element.text) == block_text:
+        return elements[:-1] if at_end else elements[1:]
+    if not isinstance(element, TextElement) or element.html_tag.name != _MERGED_TEXT_TAG:
+        return elements
+
+    children = element.html_tag.get_children()
+    if _normalized_text(children[index].text) != block_text:
+        return elements
+    rest = children[:-1] if at_end else children[1:]
+    html_tag = rest[0] if len(rest) == 1 else HtmlTag.wrap_tags_in_new_parent(_MERGED_TEXT_TAG, rest)
+    remainder = TextElement(html_tag, processing_log=element.processing_log)
+    return elements[:-1] + [remainder] if at_end else [remainder] + elements[1:]
+
+
+class StreamingEdgar10KParser:
+    """
+    StreamingEdgar10KParser parses a 10-K from a byte stream one top section
+    at a time.
+
+    Top-level blocks are read incrementally and grouped into sections at each
+    Part/Item heading, using the same patterns as TopSectionManagerFor10K.
+    Each section then runs through the full Edgar10KParser pipeline and is
+    yielded before the rest of the document is read, so callers that only
+    need Item 1A or Item 7 can stop early. Peak memory is bounded by the
+    largest section instead of by the document size.
+
+    To stay close to a full parse, the most recent Part heading is parsed in
+    front of every Item section (so items are assigned to their part) and the
+    cover page is parsed together with the first heading (so it is classified
+    as the introductory section); those extra blocks are dropped from the
+    output. Page number and page header statistics accumulate across sections,
+    so those are only recognized once they have recurred in earlier sections.
+    """
+
+    def __init__(
+        self,
+        *,
+        chunk_size: int = 64 * 1024,
+        max_heading_length: int = 200,
+    ) -> None:
+        self._chunk_size = chunk_size
+        self._max_heading_length = max_heading_length
+        self._page_number_counts: Counter = Counter()
+        self._page_header_counts: Counter = Counter()
+        self._parser = Edgar10KParser(get_steps=self._get_steps)
+
+    def _get_steps(self):
+        steps = self._parser.get_default_steps()
+        for index, step in enumerate(steps):
+            if isinstance(step, PageNumberClassifier):
+                steps[index] = _RunningPageNumberClassifier(
+                    self._page_number_counts,
+                    types_to_process=step._types_to_process,
+                )
+            elif isinstance(step, PageHeaderClassifier):
+                steps[index] = _RunningPageHeaderClassifier(
+                    self._page_header_counts,
+                    types_to_process=step._types_to_process,
+                )
+        return steps
+
+    def _match_heading(self, html: str, text: str) -> Optional[str]:
+        if len(text) > self._max_heading_length or "<table" in html:
+            return None
+        if part := TopSectionManagerFor10K.match_part(text):
+            return f"part{part}"
+        if item := TopSectionManagerFor10K.match_item(text):
+            return f"item{item}"
+        return None
+
+    def parse_blocks(
+        self,
+        section_id: Optional[str],
+        blocks: list[str],
+        *,
+        part_block: Optional[str] = None,
+        next_heading_block: Optional[str] = None,
+    ) -> ParsedSection:
+        """
+        Run the full pipeline over the HTML blocks of one section.
+
+        Args:
+            section_id: Identifier of the section the blocks belong to
+            blocks: HTML of the section, in document order
+            part_block: HTML of the Part heading the section belongs to,
+                parsed in front of the blocks and dropped from the result
+            next_heading_block: HTML of the heading following the section,
+                parsed after the blocks and dropped from the result
+        """
+        html = "".join([
+            "<html><body>",
+            part_block or "",
+            *blocks,
+            next_heading_block or "",
+            "</body></html>",
+        ])
+        elements = self._parser.parse(html)
+        # Injected blocks are dropped whatever they were classified as: a
+        # heading the top section patterns miss comes out as plain text
+        if part_block is not None:
+            elements = _drop_block(elements, part_block)
+        if next_heading_block is not None:
+            elements = _drop_block(elements, next_heading_block, at_end=True)
+        return ParsedSection(section_id, elements)
+
+    def iter_sections(self, source: HtmlStream) -> Iterator[ParsedSection]:
+        """
+        Parse a 10-K section by section.
+
+        Args:
+            source: Path to the filing, or a binary file-like object such as
+                an open file or a streamed HTTP response body
+
+        Yields:
+            One ParsedSection per top section, in document order
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as stream:
+                yield from self.iter_sections(stream)
+            return
+
+        self._page_number_counts.clear()
+        self._page_header_counts.clear()
+        section_id: Optional[str] = None
+        blocks: list[str] = []
+        part_block: Optional[str] = None
+        section_part_block: Optional[str] = None
+
+        for html, text in iter_html_blocks(source, chunk_size=self._chunk_size):
+            heading = self._match_heading(html, text)
+            if heading is not None and blocks:
+                if section_id is None:
+                    yield self.parse_blocks(None, blocks, next_heading_block=html)
+                else:
+                    yield self.parse_blocks(section_id, blocks, part_block=section_part_block)
+                blocks = []
+            if heading is not None:
+                section_id = heading
+                if heading.startswith("part"):
+                    part_block = html
+                    section_part_block = None
+                else:
+                    section_part_block = part_block
+            blocks.append(html)
+
+        if blocks:
+            yield self.parse_blocks(section_id, blocks, part_block=section_part_block)
+
+    def parse_section(self, source: HtmlStream, section_id: str) -> Optional[ParsedSection]:
+        """
+        Stream the filing until `section_id` has been parsed and return it.
+        Returns None if the section was not found.
+        """
+        for section in self.iter_sections(source):
+            if section.section_id == section_id:
+                return section
+        return None
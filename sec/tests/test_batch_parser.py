@@ -0,0 +1,34 @@
+import os
+import time
+
+from batch_parser import parse_many
+
+
+class CrashingParser:
+    """Parses nothing, slowly, and kills its worker process on a document saying CRASH."""
+
+    def parse(self, html):
+        if "CRASH" in html:
+            os._exit(1)
+        time.sleep(0.02)
+        return []
+
+
+def documents(count, crash_at):
+    return [f"<html><body><p>{'CRASH' if i == crash_at else 'ok'} {i}</p></body></html>" for i in range(count)]
+
+
+def test_dead_worker_fails_only_its_document():
+    results = list(parse_many(documents(6, crash_at=2), workers=1, parser_factory=CrashingParser, max_pending=1))
+    assert [result.index for result in results] == list(range(6))
+    assert [result.ok for result in results] == [True, True, False, True, True, True]
+    assert "BrokenProcessPool" in results[2].error
+
+
+def test_batch_goes_on_after_a_dead_worker():
+    results = list(parse_many(documents(20, crash_at=5), workers=2, parser_factory=CrashingParser))
+    assert sorted(result.index for result in results) == list(range(20))
+    failed = {result.index for result in results if not result.ok}
+    # Parses the broken pool still had fail with the document that killed it
+    assert 5 in failed and len(failed) <= 8
+    assert all(result.ok for result in results if result.index >= 15)
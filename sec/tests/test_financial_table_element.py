@@ -0,0 +1,88 @@
+import bs4
+import numpy as np
+import pytest
+from sec_parser.processing_engine.html_tag import HtmlTag
+
+from financial_table_element import FinancialTableElement
+
+
+def make_table(rows_html, table_type="income_statement"):
+    soup = bs4.BeautifulSoup(f"<table>{rows_html}</table>", "lxml")
+    return FinancialTableElement(HtmlTag(soup.table), table_type=table_type)
+
+
+def test_currency_sign_and_parenthesis_in_separate_cells_is_negative():
+    element = make_table(
+        "<tr><td></td><td></td><td>2023</td><td></td></tr>"
+        "<tr><td>Net loss</td><td>$</td><td>(1,234</td><td>)</td></tr>"
+        "<tr><td>Revenue</td><td>$</td><td>500</td><td></td></tr>"
+    )
+    frame = element.to_frame(apply_scale=False)
+    assert frame.loc["Net loss", "2023"] == pytest.approx(-1234.0)
+    assert frame.loc["Revenue", "2023"] == pytest.approx(500.0)
+
+
+def test_parenthesised_value_in_one_cell_is_negative():
+    element = make_table(
+        "<tr><td></td><td>2023</td></tr>"
+        "<tr><td>Other expense</td><td>$ (56)</td></tr>"
+    )
+    assert element.to_frame(apply_scale=False).loc["Other expense", "2023"] == pytest.approx(-56.0)
+
+
+def test_per_share_rows_are_not_scaled():
+    element = make_table(
+        "<tr><td></td><td>2023</td><td>2022</td></tr>"
+        "<tr><td>Net income</td><td>$ 1,200</td><td>$ 1,000</td></tr>"
+        "<tr><td>Earnings per share - diluted</td><td>$ 2.45</td><td>$ 2.01</td></tr>"
+        "<tr><td>Diluted EPS</td><td>2.45</td><td>2.01</td></tr>"
+        "<tr><td>Weighted average shares outstanding</td><td>490</td><td>497</td></tr>"
+    )
+    frame = element.to_frame("(In millions, except per share data)")
+    assert frame.loc["Net income", "2023"] == pytest.approx(1.2e9)
+    assert frame.loc["Earnings per share - diluted", "2023"] == pytest.approx(2.45)
+    assert frame.loc["Diluted EPS", "2022"] == pytest.approx(2.01)
+    assert frame.loc["Weighted average shares outstanding", "2023"] == pytest.approx(4.9e8)
+
+    frame = element.to_frame("(In millions, except share and per share amounts)")
+    assert frame.loc["Weighted average shares outstanding", "2023"] == pytest.approx(490.0)
+    assert frame.loc["Net income", "2022"] == pytest.approx(1e9)
+
+
+def test_missing_values_keep_their_column():
+    element = make_table(
+        "<tr><td></td><td colspan='3'>2023</td><td colspan='3'>2022</td><td colspan='3'>2021</td></tr>"
+        "<tr><td>Revenue</td><td>$</td><td>300</td><td></td><td>$</td><td>200</td><td></td>"
+        "<td>$</td><td>100</td><td></td></tr>"
+        "<tr><td>Impairment</td><td></td><td>(40</td><td>)</td><td></td><td>&#8212;</td><td></td>"
+        "<td></td><td>(10</td><td>)</td></tr>"
+        "<tr><td>New segment</td><td></td><td>25</td><td></td><td></td><td></td><td></td>"
+        "<td></td><td></td><td></td></tr>"
+    )
+    frame = element.to_frame(apply_scale=False)
+    assert list(frame.columns) == ["2023", "2022", "2021"]
+    assert frame.loc["Revenue"].tolist() == [300.0, 200.0, 100.0]
+    impairment = frame.loc["Impairment"]
+    assert impairment["2023"] == -40.0 and np.isnan(impairment["2022"]) and impairment["2021"] == -10.0
+    assert frame.loc["New segment", "2023"] == 25.0
+    assert frame.loc[["New segment"], ["2022", "2021"]].isna().all(axis=None)
+
+
+def test_header_over_a_currency_column_labels_the_value():
+    element = make_table(
+        "<tr><td></td><td>2023</td><td></td><td>2022</td><td></td></tr>"
+        "<tr><td>Cash</td><td>$</td><td>12</td><td>$</td><td>9</td></tr>"
+    )
+    assert element.to_frame(apply_scale=False).loc["Cash"].to_dict() == {"2023": 12.0, "2022": 9.0}
+
+
+def test_changing_a_returned_frame_does_not_change_the_next():
+    element = make_table(
+        "<tr><td></td><td>2023</td></tr>"
+        "<tr><td>Revenue</td><td>500</td></tr>"
+    )
+    frame = element.to_frame(apply_scale=False)
+    frame.loc["Revenue", "2023"] = 0.0
+    frame["extra"] = 1.0
+    again = element.to_frame(apply_scale=False)
+    assert again.loc["Revenue", "2023"] == 500.0 and list(again.columns) == ["2023"]
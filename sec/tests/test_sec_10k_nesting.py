@@ -0,0 +1,84 @@
+import random
+
+import bs4
+import pytest
+from sec_parser.processing_engine.html_tag import HtmlTag
+from sec_parser.semantic_elements import TextElement, TitleElement
+from sec_parser.semantic_elements.top_section_title import TopSectionTitle
+from sec_parser.semantic_tree import TreeBuilder
+
+from bench_sec_10k_nesting import tree_shape
+from sec_10k_nesting import SEC10KNestingRule, SEC10KTreeBuilder
+from top_section_title_types_10k import IDENTIFIER_TO_10K_SECTION, TopSectionIn10K
+
+SUBITEM = TopSectionIn10K(identifier="item7-results", title="Results of Operations", order=11, level=2)
+
+
+def tag(text):
+    return HtmlTag(bs4.BeautifulSoup(f"<p>{text}</p>", "lxml").p)
+
+
+def top_section(identifier):
+    section_type = SUBITEM if identifier == SUBITEM.identifier else IDENTIFIER_TO_10K_SECTION[identifier]
+    return TopSectionTitle(tag(section_type.title), level=section_type.level, section_type=section_type)
+
+
+def title(text):
+    return TitleElement(tag(text), level=0)
+
+
+def text(text):
+    return TextElement(tag(text))
+
+
+def assert_same_tree(elements):
+    reference = TreeBuilder(get_rules=lambda: [SEC10KNestingRule()]).build(elements)
+    linear = SEC10KTreeBuilder().build(elements)
+    assert tree_shape(list(linear)) == tree_shape(list(reference))
+    return linear
+
+
+def test_filing_outline():
+    elements = [
+        text("Cover page"),
+        top_section("part1"),
+        top_section("item1"),
+        text("We make anvils."),
+        title("Products"),
+        text("Anvils and hammers."),
+        top_section("item1a"),
+        text("Risks."),
+        top_section("part2"),
+        top_section("item7"),
+        top_section(SUBITEM.identifier),
+        text("Revenue grew."),
+        # Items out of their part close it
+        top_section("item15"),
+        text("Exhibits."),
+        top_section("part4"),
+        top_section("item16"),
+        text("None."),
+    ]
+    tree = assert_same_tree(elements)
+    roots = list(tree)
+    assert [node.semantic_element.text for node in roots][:2] == ["Cover page", "Part I: Business"]
+    item1 = roots[1].children[0]
+    assert [node.semantic_element.text for node in item1.children] == ["We make anvils."]
+    # SEC10KNestingRule never nests titles, so a title closes the sections
+    assert roots[2].semantic_element.text == "Products"
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_sequences(seed):
+    rng = random.Random(seed)
+    identifiers = list(IDENTIFIER_TO_10K_SECTION) + [SUBITEM.identifier]
+    elements = []
+    for i in range(300):
+        kind = rng.random()
+        if kind < 0.15:
+            elements.append(top_section(rng.choice(identifiers)))
+        elif kind < 0.35:
+            elements.append(title(f"Title {i}"))
+        else:
+            elements.append(text(f"Text {i}"))
+    assert_same_tree(elements)
@@ -0,0 +1,60 @@
+from sec_parser.semantic_elements.top_section_title import TopSectionTitle
+
+from section_parser import find_toc_targets, parse_section
+from streaming_parser import StreamingEdgar10KParser
+
+
+def filing_with_toc():
+    toc = "".join(
+        f'<tr><td><a href="#{anchor}">{title}</a></td></tr>'
+        for anchor, title in [
+            ("p1", "Part I - Financial Information"),
+            ("i1", "Item 1. Business"),
+            ("p4", "Part IV - Other Information"),
+            ("i15", "Item 15. Exhibits"),
+            ("i16", "Item 16. Form 10-K Summary"),
+        ]
+    )
+    body = "".join([
+        f"<table>{toc}</table>",
+        '<p id="p1">PART I - FINANCIAL INFORMATION</p>',
+        '<p id="i1">Item 1. Business</p>',
+        "<p>We make anvils.</p>",
+        '<p id="p4">PART IV - OTHER INFORMATION</p>',
+        '<p id="i15">Item 15. Exhibits</p>',
+        "<p>Exhibit 3.1 Articles of incorporation.</p>",
+        "<p>Exhibit 3.2 Bylaws.</p>",
+        '<p id="i16">Item 16. Form 10-K Summary</p>',
+        "<p>None.</p>",
+    ])
+    return f"<html><body>{body}</body></html>"
+
+
+def test_toc_targets_include_part_iv():
+    assert [section_id for section_id, _ in find_toc_targets(filing_with_toc())] == [
+        "part1", "item1", "part4", "item15", "item16",
+    ]
+
+
+def test_injected_part_heading_is_dropped():
+    section = parse_section(filing_with_toc(), "item15")
+    assert section is not None and section.section_id == "item15"
+    texts = [element.text for element in section.elements]
+    assert not any("Part IV" in text for text in texts)
+    assert isinstance(section.elements[0], TopSectionTitle)
+    assert "Exhibit 3.2 Bylaws." in "".join(texts)
+
+
+def test_unrecognized_injected_block_is_cut_out_of_merged_text():
+    section = StreamingEdgar10KParser().parse_blocks(
+        "item15",
+        ["<p>Exhibit 3.1 Articles of incorporation.</p>", "<p>Exhibit 3.2 Bylaws.</p>"],
+        part_block="<p>Exhibits and schedules</p>",
+    )
+    assert [element.text for element in section.elements] == [
+        "Exhibit 3.1 Articles of incorporation.Exhibit 3.2 Bylaws.",
+    ]
+
+
+def test_missing_section_is_none():
+    assert parse_section(filing_with_toc(), "item7") is None
@@ -0,0 +1,54 @@
+import io
+
+import pytest
+
+from streaming_parser import StreamingEdgar10KParser, iter_html_blocks
+
+
+def filing_body():
+    blocks = ["<p>ACME CORP</p>", "<p>ANNUAL REPORT ON FORM 10-K</p>", "<p>PART I - FINANCIAL INFORMATION</p>", "<p>Item 1. Business</p>"]
+    blocks += [f"<p>We make anvils, paragraph {i}.</p>" for i in range(30)]
+    blocks += ["<p>PART II - OTHER INFORMATION</p>", "<p>Item 7. Management's Discussion and Analysis</p>"]
+    blocks += [f"<p>Revenue grew, paragraph {i}.</p>" for i in range(30)]
+    return "".join(blocks)
+
+
+def wrapped(body, depth):
+    return "<html><body>" + "<div>" * depth + body + "</div>" * depth + "<p>Trailing note</p></body></html>"
+
+
+@pytest.mark.parametrize("depth", [0, 1, 2, 3])
+def test_nested_wrappers_are_split_into_blocks(depth):
+    blocks = list(iter_html_blocks(io.BytesIO(wrapped(filing_body(), depth).encode()), chunk_size=256))
+    texts = [text for _, text in blocks if text]
+    assert "PART I - FINANCIAL INFORMATION" in texts
+    assert "We make anvils, paragraph 29." in texts
+    assert texts[-1] == "Trailing note"
+    assert len(texts) == 67
+
+
+def test_blocks_before_a_nested_wrapper_are_kept():
+    body = "<div><p>Cover</p><div>" + filing_body() + "</div></div>"
+    blocks = list(iter_html_blocks(io.BytesIO(f"<html><body>{body}</body></html>".encode()), chunk_size=128))
+    texts = [text for _, text in blocks if text]
+    assert texts[0] == "Cover"
+    assert len(texts) == 67
+
+
+def test_tables_are_not_split():
+    rows = "".join(f"<tr><td>Row {i}</td><td>{i}</td></tr>" for i in range(40))
+    html = f"<html><body><div><div><table>{rows}</table></div></div></body></html>"
+    blocks = list(iter_html_blocks(io.BytesIO(html.encode())))
+    assert len(blocks) == 1 and blocks[0][0].count("<tr>") == 40
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_sections_of_a_filing_in_nested_wrappers(depth):
+    parser = StreamingEdgar10KParser(chunk_size=512)
+    source = io.BytesIO(wrapped(filing_body(), depth).encode())
+    section_ids = [section.section_id for section in parser.iter_sections(source)]
+    assert section_ids == [None, "part1", "item1", "part2", "item7"]
+
+    section = parser.parse_section(io.BytesIO(wrapped(filing_body(), depth).encode()), "item7")
+    assert section is not None
+    assert any("Revenue grew, paragraph 29." in element.text for element in section.elements)
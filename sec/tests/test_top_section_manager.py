@@ -0,0 +1,38 @@
+from sec_parser.semantic_elements.top_section_title import TopSectionTitle
+
+from bench_top_section_manager import make_parser, summarize
+from new_top_section_manager_for_10k import TopSectionManagerFor10K as ReferenceTopSectionManager
+from top_section_manager_for_10k import TopSectionManagerFor10K
+
+FILING = "<html><body>" + "".join(
+    f"<p>{text}</p>"
+    for text in [
+        "PART I - FINANCIAL INFORMATION",
+        "Item 1. Business",
+        "We make anvils.",
+        "PART II - OTHER INFORMATION",
+        "Item 7. Management's Discussion and Analysis",
+        "Revenue grew.",
+        "PART III - GOVERNANCE",
+        "Item 10. Directors, Executive Officers and Corporate Governance",
+        "See the proxy statement.",
+        "PART IV - EXHIBITS",
+        "Item 15. Exhibits",
+        "Exhibit 3.1 Articles of incorporation.",
+    ]
+) + "</body></html>"
+
+
+def test_indexed_manager_matches_the_reference():
+    reference = make_parser(ReferenceTopSectionManager, []).parse(FILING)
+    indexed = make_parser(TopSectionManagerFor10K, []).parse(FILING)
+    assert summarize(indexed) == summarize(reference)
+    titles = [element.text for element in indexed if isinstance(element, TopSectionTitle)]
+    assert "PART IV - EXHIBITS" in titles and "Item 15. Exhibits" in titles
+
+
+def test_part_numerals():
+    for manager in (ReferenceTopSectionManager, TopSectionManagerFor10K):
+        assert [manager.match_part(f"Part {numeral} - x") for numeral in ("I", "II", "III", "IV")] == [
+            "1", "2", "3", "4",
+        ]
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from typing import IO, TYPE_CHECKING, Iterable, Iterator, Optional, Union
+
+from sec_parser.semantic_elements.semantic_elements import IrrelevantElement
+from sec_parser.semantic_elements.top_section_title import TopSectionTitle
+from sec_parser.semantic_tree.render_ import DEFAULT_CHAR_DISPLAY_LIMIT
+from sec_parser.semantic_tree.semantic_tree import SemanticTree
+from sec_parser.semantic_tree.tree_node import TreeNode
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sec_parser.semantic_elements.abstract_semantic_element import (
+        AbstractSemanticElement,
+    )
+
+TREE_FORMAT = "sec-semantic-tree"
+TREE_FORMAT_VERSION = 1
+
+
+class StoredNode:
+    """
+    A semantic tree node loaded by `load_tree`.
+
+    It stands in for both the TreeNode and its semantic element: `children`,
+    `level`, `text` and `get_summary()` behave like theirs. `type_name` is the
+    class name of the original element and `section_id` the identifier of the
+    top section it belongs to. The text is only read from disk when accessed.
+    """
+
+    __slots__ = (
+        "type_name", "level", "section_id", "irrelevant", "parent", "children",
+        "_store", "_start", "_end", "_summary", "_text",
+    )
+
+    def __init__(
+        self,
+        store: StoredTree,
+        record: dict,
+        parent: Optional[StoredNode],
+    ) -> None:
+        self.type_name: str = record["type"]
+        self.level: Optional[int] = record.get("level")
+        self.section_id: Optional[str] = record.get("section")
+        self.irrelevant: bool = bool(record.get("irrelevant"))
+        self.parent = parent
+        self.children: list[StoredNode] = []
+        self._store = store
+        self._start: int = record["start"]
+        self._end: int = record["end"]
+        self._summary: Optional[str] = record.get("summary")
+        self._text: Optional[str] = None
+
+    @property
+    def semantic_element(self) -> StoredNode:
+        return self
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._store.read_text(self._start, self._end)
+        return self._text
+
+    def get_summary(self) -> str:
+        return self._summary if self._summary is not None else self.text
+
+    def get_descendants(self) -> Iterator[StoredNode]:
+        for child in self.children:
+            yield child
+            yield from child.get_descendants()
+
+    def __repr__(self) -> str:
+        return f"StoredNode({self.type_name}, section_id={self.section_id!r}, children={len(self.children)})"
+
+
+class StoredTree:
+    """
+    A semantic tree loaded by `load_tree`, iterable over its root nodes like
+    SemanticTree. The companion text file is memory-mapped and node texts are
+    sliced out of it on first access; call `close` (or use it as a context
+    manager) to release it.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != TREE_FORMAT or header.get("version") != TREE_FORMAT_VERSION:
+                msg = f"Unsupported tree file: {os.fspath(path)}"
+                raise ValueError(msg)
+            records = [json.loads(line) for line in f]
+
+        self._text_file = open(text_path_for(path), "rb")
+        size = os.fstat(self._text_file.fileno()).st_size
+        self._text = mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        # Records are stored in pre-order with the index of their parent
+        nodes: list[StoredNode] = []
+        self._root_nodes: list[StoredNode] = []
+        for record in records:
+            parent_index = record.get("parent")
+            parent = nodes[parent_index] if parent_index is not None else None
+            node = StoredNode(self, record, parent)
+            nodes.append(node)
+            if parent is None:
+                self._root_nodes.append(node)
+            else:
+                parent.children.append(node)
+        self._nodes = nodes
+
+    def __iter__(self) -> Iterator[StoredNode]:
+        yield from self._root_nodes
+
+    def __len__(self) -> int:
+        return len(self._root_nodes)
+
+    def __enter__(self) -> StoredTree:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def nodes(self) -> Iterator[StoredNode]:
+        """All nodes in document order."""
+        yield from self._nodes
+
+    def read_text(self, start: int, end: int) -> str:
+        return self._text[start:end].decode("utf-8")
+
+    def close(self) -> None:
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+        self._text_file.close()
+
+
+def text_path_for(path: Union[str, os.PathLike]) -> str:
+    """Path of the companion file holding the node texts of a tree file."""
+    return os.fspath(path) + ".text"
+
+
+def _root_nodes(tree) -> list:
+    if isinstance(tree, (TreeNode, StoredNode)):
+        return [tree]
+    return list(tree)
+
+
+def _is_ignored(element, ignored_types: tuple[type[AbstractSemanticElement], ...]) -> bool:
+    if isinstance(element, StoredNode):
+        if element.irrelevant and IrrelevantElement in ignored_types:
+            return True
+        return any(element.type_name == t.__name__ for t in ignored_types)
+    return isinstance(element, ignored_types)
+
+
+def iter_render_lines(
+    tree: Union[SemanticTree, StoredTree, list, TreeNode, StoredNode],
+    *,
+    pretty: bool | None = True,
+    ignored_types: tuple[type[AbstractSemanticElement], ...] | None = None,
+    char_display_limit: int | None = None,
+    verbose: bool = False,
+) -> Iterator[str]:
+    """
+    Yield the lines of `render(tree)` one at a time.
+
+    Joined with "\\n" the lines are identical to sec_parser's `render`, but the
+    whole string is never built. Trees loaded with `load_tree` are rendered
+    the same way as the tree they were saved from.
+    """
+    pretty = pretty if pretty is not None else True
+    ignored_types = ignored_types or (IrrelevantElement,)
+    char_display_limit = (
+        char_display_limit
+        if char_display_limit and char_display_limit > 0
+        else DEFAULT_CHAR_DISPLAY_LIMIT
+    )
+
+    def lines(nodes: list, prefix: str, is_root: bool) -> Iterator[str]:
+        for i, node in enumerate(nodes):
+            element = node.semantic_element
+            if _is_ignored(element, ignored_types):
+                continue
+
+            is_last = i == len(nodes) - 1
+            indent = "├── " if not is_last else "└── "
+            new_prefix = "│   " if not is_last else "    "
+
+            level = ""
+            lvl = getattr(element, "level", None)
+            if verbose and lvl is not None:
+                level = f"[L{lvl}]"
+                if pretty:
+                    level = f"\033[1;92m{level}\033[0m"
+            type_name = element.type_name if isinstance(element, StoredNode) else element.__class__.__name__
+            class_name = f"{type_name}{level}"
+            contents = element.get_summary().strip()
+            if len(contents) > char_display_limit:
+                half_limit = (char_display_limit - 3) // 2
+                contents = f"{contents[:half_limit]}...{contents[-half_limit:]}"
+            if pretty:
+                class_name = f"\033[1;34m{class_name}\033[0m"
+
+            line = f"{prefix}{indent}{class_name}" if not is_root else class_name
+            if contents:
+                line = f"{line}: {contents}"
+            yield line
+
+            # Same prefix handling as `render`: children of root nodes start unindented
+            yield from lines(node.children, prefix + (prefix if is_root else new_prefix), False)
+
+    yield from lines(_root_nodes(tree), "", True)
+
+
+def render_to(
+    tree: Union[SemanticTree, StoredTree, list, TreeNode, StoredNode],
+    *files: IO[str],
+    **render_kwargs,
+) -> int:
+    """
+    Render a tree once and write it to every file as it is produced, e.g.
+    render_to(tree, sys.stdout, op_file).
+
+    Args:
+        tree: Tree to render
+        files: Text file handles to write to
+        render_kwargs: Keyword arguments of `iter_render_lines`
+
+    Returns:
+        Number of lines written
+    """
+    count = 0
+    for line in iter_render_lines(tree, **render_kwargs):
+        if count:
+            line = "\n" + line
+        for f in files:
+            f.write(line)
+        count += 1
+    return count
+
+
+def _iter_with_parent(nodes: Iterable[TreeNode]) -> Iterator[tuple[TreeNode, Optional[TreeNode]]]:
+    stack = [(node, None) for node in reversed(list(nodes))]
+    while stack:
+        node, parent = stack.pop()
+        yield node, parent
+        stack.extend((child, node) for child in reversed(node.children))
+
+
+def save_tree(tree: Union[SemanticTree, list[TreeNode]], path: Union[str, os.PathLike]) -> int:
+    """
+    Serialize a semantic tree so it can be reloaded without parsing the HTML.
+
+    `path` gets one JSON line per node, in document order, with its element
+    type, level, top section id, parent index and the byte range of its text.
+    The texts themselves are concatenated into the companion file returned by
+    `text_path_for(path)`, so they can be read lazily.
+
+    Returns:
+        Number of nodes written
+    """
+    indices: dict[int, int] = {}
+    sections: dict[int, Optional[str]] = {}
+    offset = 0
+    with open(path, "w", encoding="utf-8") as tree_file, open(text_path_for(path), "wb") as text_file:
+        tree_file.write(json.dumps({"format": TREE_FORMAT, "version": TREE_FORMAT_VERSION}) + "\n")
+        for index, (node, parent) in enumerate(_iter_with_parent(tree)):
+            element = node.semantic_element
+            section_id = sections[id(parent)] if parent is not None else None
+            if isinstance(element, TopSectionTitle):
+                section_id = element.section_type.identifier
+            indices[id(node)] = index
+            sections[id(node)] = section_id
+
+            text = element.text
+            encoded = text.encode("utf-8")
+            text_file.write(encoded)
+            record = {
+                "type": element.__class__.__name__,
+                "section": section_id,
+                "parent": indices[id(parent)] if parent is not None else None,
+                "start": offset,
+                "end": offset + len(encoded),
+            }
+            offset += len(encoded)
+
+            level = getattr(element, "level", None)
+            if level is not None:
+                record["level"] = level
+            summary = element.get_summary()
+            if summary != text:
+                record["summary"] = summary
+            if isinstance(element, IrrelevantElement):
+                record["irrelevant"] = 1
+            tree_file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    return len(indices)
+
+
+def load_tree(path: Union[str, os.PathLike]) -> StoredTree:
+    """
+    Load a tree written by `save_tree`. Node texts are read on first access.
+    """
+    return StoredTree(path)
@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+import pytest
+
+from dspy_batch import DONE, FAILED, RUNNING, BatchRunner, BatchStore, input_key
+
+
+class FlakyQA:
+    """Fails its first `failures` calls, then answers."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def acall(self, question):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("429 rate limited")
+        return {"answer": question.upper()}
+
+
+class SlowQA:
+    """Answers after `latency` seconds, recording its calls and how many ran at once."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = []
+        self.answered = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def acall(self, question):
+        self.calls.append(question)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        self.answered.append(question)
+        return {"answer": question.upper()}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BatchStore(str(tmp_path / "batch.db"))
+    yield store
+    store.close()
+
+
+def runner(module, store, max_attempts):
+    return BatchRunner(module, store, max_attempts=max_attempts, base_delay=0.0, flush_interval=0.01)
+
+
+def test_retry_failed_gets_max_attempts_tries_again(store):
+    module = FlakyQA(failures=3)
+    summary = asyncio.run(runner(module, store, 2).run(["q"], run_id="r"))
+    assert summary["failed"] == 1 and module.calls == 2
+
+    summary = asyncio.run(runner(module, store, 2).run(["q"], run_id="r", retry_failed=True))
+    assert summary["done"] == 1 and module.calls == 4
+    task, = store.results("r")
+    assert task["status"] == DONE and task["attempts"] == 4
+
+
+def test_task_left_running_keeps_its_retries(store):
+    store.add_tasks("r", [{"question": "q"}])
+    now = time.time()
+    # A crash after one try left the task running
+    store.write([(RUNNING, 1, None, None, 0, 0, now, None, None, "r", input_key({"question": "q"}))])
+
+    module = FlakyQA(failures=2)
+    summary = asyncio.run(runner(module, store, 3).run(["q"], run_id="r"))
+    assert summary["done"] == 1 and module.calls == 3
+    task, = store.results("r")
+    assert task["attempts"] == 4
+
+
+def test_exhausted_tries_fail_the_task(store):
+    module = FlakyQA(failures=10)
+    summary = asyncio.run(runner(module, store, 3).run(["q"], run_id="r"))
+    assert summary["failed"] == 1 and module.calls == 3
+    task, = store.results("r")
+    assert task["status"] == FAILED and task["attempts"] == 3 and "429" in task["error"]
+
+
+def test_skipped_counts_the_done_tasks_of_the_run(store):
+    asyncio.run(runner(FlakyQA(failures=0), store, 1).run(["a", "b", "c"], run_id="r"))
+    summary = asyncio.run(runner(FlakyQA(failures=0), store, 1).run([], run_id="r"))
+    assert summary["skipped"] == 3 and summary["added"] == 0 and summary["done"] == 0
+
+    summary = asyncio.run(runner(FlakyQA(failures=0), store, 1).run(["a", "d"], run_id="r"))
+    assert summary["skipped"] == 3 and summary["added"] == 1 and summary["done"] == 1
+
+
+def test_resume_skips_done_inputs(store):
+    questions = [f"q{i}" for i in range(20)]
+
+    async def crash_and_resume():
+        module = SlowQA(latency=0.01)
+        run = asyncio.create_task(BatchRunner(module, store, concurrency=4, flush_interval=0.01).run(questions, run_id="r"))
+        while len(module.answered) < 8:
+            await asyncio.sleep(0.005)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        done_before = {task["input"]["question"] for task in store.results("r") if task["status"] == DONE}
+
+        resumed = SlowQA(latency=0.0)
+        summary = await BatchRunner(resumed, store, concurrency=4, flush_interval=0.01).run(questions, run_id="r")
+        return done_before, resumed, summary
+
+    done_before, resumed, summary = asyncio.run(crash_and_resume())
+    assert len(done_before) >= 8
+    assert summary["skipped"] == len(done_before)
+    assert not done_before & set(resumed.calls)
+    assert sorted(resumed.calls) == sorted(set(questions) - done_before)
+    assert store.progress("r")[DONE] == len(questions)
+
+
+def test_cancelled_run_stores_every_pending_update(store):
+    async def cancel_midway():
+        module = SlowQA(latency=0.01)
+        # Nothing would be written before the run ends but for the final flush
+        runner = BatchRunner(module, store, concurrency=4, batch_size=10_000, flush_interval=60.0)
+        run = asyncio.create_task(runner.run([f"q{i}" for i in range(40)], run_id="r"))
+        while len(module.answered) < 10:
+            await asyncio.sleep(0.005)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        return module
+
+    module = asyncio.run(cancel_midway())
+    progress = store.progress("r")
+    assert progress[DONE] == len(module.answered)
+    assert progress[RUNNING] == len(module.calls) - len(module.answered)
+
+
+def test_updates_are_written_in_batches(store):
+    writes = []
+    write = store.write
+    store.write = lambda updates: (writes.append(len(updates)), write(updates))
+
+    start = time.perf_counter()
+    runner = BatchRunner(SlowQA(latency=0.0), store, concurrency=2, batch_size=5, flush_interval=30.0)
+    asyncio.run(runner.run([f"q{i}" for i in range(12)], run_id="r"))
+    # A running and a done update per input, in full batches but for the last
+    assert sum(writes) == 24 and max(writes) == 5 and writes.count(5) >= 4
+    assert time.perf_counter() - start < 5
+
+
+def test_updates_are_flushed_every_flush_interval(store):
+    async def watch():
+        runner = BatchRunner(SlowQA(latency=0.5), store, concurrency=2, batch_size=10_000, flush_interval=0.05)
+        run = asyncio.create_task(runner.run(["a", "b"], run_id="r"))
+        await asyncio.sleep(0.25)
+        running = store.progress("r")[RUNNING]
+        await run
+        return running
+
+    assert asyncio.run(watch()) == 2
+    assert store.progress("r")[DONE] == 2
+
+
+def test_concurrency_is_bounded(store):
+    module = SlowQA(latency=0.01)
+    summary = asyncio.run(BatchRunner(module, store, concurrency=3).run([f"q{i}" for i in range(30)], run_id="r"))
+    assert summary["done"] == 30
+    assert module.max_in_flight == 3
@@ -0,0 +1,63 @@
+import pytest
+import torch
+from transformers import Phi3Config, Phi3ForCausalLM
+
+from phi3_long_context import chunked_prefill
+from phi3_server import tiny_random_model
+
+
+def longrope_model(original_max_position_embeddings=64, max_position_embeddings=1024):
+    torch.random.manual_seed(0)
+    head_dim = 16
+    config = Phi3Config(
+        vocab_size=300,
+        pad_token_id=0,
+        hidden_size=128,
+        intermediate_size=256,
+        num_hidden_layers=2,
+        num_attention_heads=8,
+        num_key_value_heads=8,
+        max_position_embeddings=max_position_embeddings,
+        original_max_position_embeddings=original_max_position_embeddings,
+        rope_scaling={
+            "type": "longrope",
+            "short_factor": [1.0] * (head_dim // 2),
+            "long_factor": [1.0 + i for i in range(head_dim // 2)],
+        },
+    )
+    return Phi3ForCausalLM(config).eval()
+
+
+@torch.no_grad()
+def single_pass_logits(model, input_ids):
+    return model(input_ids=torch.tensor([input_ids])).logits[:, -1, :]
+
+
+@pytest.mark.parametrize("chunk_size", [32, 100, 300])
+def test_chunked_prefill_matches_single_pass_with_longrope(chunk_size):
+    model = longrope_model()
+    input_ids = [(7 * i) % 300 for i in range(300)]
+    _, logits = chunked_prefill(model, input_ids, chunk_size=chunk_size)
+    assert torch.allclose(logits, single_pass_logits(model, input_ids), atol=1e-4)
+
+
+def test_longrope_short_factors_are_restored_after_prefill():
+    model = longrope_model()
+    embeddings = [module for module in model.modules() if hasattr(module, "short_factor")]
+    before = [list(embedding.short_factor) for embedding in embeddings]
+    chunked_prefill(model, list(range(200)), chunk_size=32)
+    assert [list(embedding.short_factor) for embedding in embeddings] == before
+
+
+def test_prompt_within_original_context_keeps_short_factors():
+    model = longrope_model()
+    input_ids = list(range(60))
+    _, logits = chunked_prefill(model, input_ids, chunk_size=16)
+    assert torch.allclose(logits, single_pass_logits(model, input_ids), atol=1e-4)
+
+
+def test_chunked_prefill_matches_single_pass_with_default_rope():
+    model, _ = tiny_random_model(hidden_size=64, num_hidden_layers=2)
+    input_ids = [(5 * i) % 250 for i in range(200)]
+    _, logits = chunked_prefill(model, input_ids, chunk_size=48)
+    assert torch.allclose(logits, single_pass_logits(model, input_ids), atol=1e-4)
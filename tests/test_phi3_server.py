@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from phi3_server import EXAMPLE_MESSAGES, GenerationStream, Phi3GenerationServer, _Request, tiny_random_model
+
+
+@pytest.fixture(scope="module")
+def tiny():
+    return tiny_random_model(hidden_size=64, num_hidden_layers=2)
+
+
+def test_held_back_text_is_flushed_when_the_request_finishes(tiny):
+    model, tokenizer = tiny
+    server = Phi3GenerationServer(model, tokenizer)
+    request = _Request(EXAMPLE_MESSAGES, 2, 0.0, False, GenerationStream(), submitted_at=0.0)
+    # "é" is two bytes; the request ends after its first one
+    first_byte, _ = tokenizer.encode("é")
+    assert server._accept_token(request, tokenizer.encode("a")[0])
+    assert not server._accept_token(request, first_byte)
+    text = request.stream.text()
+    assert text == tokenizer.decode(request.generated, skip_special_tokens=True)
+    assert text == "a\ufffd"
+
+
+def test_stream_text_of_a_finished_request_is_never_empty(tiny):
+    with Phi3GenerationServer(*tiny) as server:
+        stream = server.submit(EXAMPLE_MESSAGES, max_new_tokens=3)
+        text = stream.text()
+    assert stream.stats.generated_tokens == 0 or text
+
+
+def test_prefix_of_earlier_messages_is_cached(tiny):
+    model, tokenizer = tiny
+    earlier_ids = tokenizer.apply_chat_template(EXAMPLE_MESSAGES[:-1], tokenize=True)
+    assert earlier_ids[-1] == tokenizer.eos_token_id
+
+    with Phi3GenerationServer(model, tokenizer, prefix_cache_size=0) as server:
+        expected = server.generate(EXAMPLE_MESSAGES, max_new_tokens=8)
+    with Phi3GenerationServer(model, tokenizer) as server:
+        first = server.submit(EXAMPLE_MESSAGES, max_new_tokens=8)
+        assert first.text() == expected
+        second = server.submit(EXAMPLE_MESSAGES, max_new_tokens=8)
+        assert second.text() == expected
+    # Everything but the closing <|endoftext|> of the earlier messages is reused
+    assert first.stats.cached_prompt_tokens == second.stats.cached_prompt_tokens == len(earlier_ids) - 1
+    assert len(server._prefix_cache) == 1
+
+
+def test_stop_closes_queued_requests(tiny):
+    server = Phi3GenerationServer(*tiny, max_batch_size=1)
+    server.start()
+    streams = [server.submit(EXAMPLE_MESSAGES, max_new_tokens=10_000) for _ in range(4)]
+    server.stop()
+
+    outcomes = []
+
+    def consume(stream):
+        try:
+            stream.text()
+            outcomes.append("done")
+        except RuntimeError:
+            outcomes.append("stopped")
+
+    consumers = [threading.Thread(target=consume, args=(stream,), daemon=True) for stream in streams]
+    for consumer in consumers:
+        consumer.start()
+    for consumer in consumers:
+        consumer.join(timeout=10)
+    assert len(outcomes) == len(streams)
+    assert "stopped" in outcomes
@@ -0,0 +1,46 @@
+import time
+
+from llama_index.core.agent.types import Task
+from llama_index.core.base.llms.types import ChatMessage, ChatResponse
+from llama_index.core.llms import MockLLM
+from llama_index.core.memory import ChatMemoryBuffer
+from llama_index.core.tools import FunctionTool
+
+from react_parallel import ParallelReActAgentWorker
+
+
+def slow(seconds: float) -> str:
+    """Sleep for `seconds` and say so."""
+    time.sleep(seconds)
+    return f"slept {seconds}"
+
+
+def process(worker, response):
+    task = Task(input="question", memory=ChatMemoryBuffer.from_defaults(), extra_state={"sources": []})
+    output = ChatResponse(message=ChatMessage(role="assistant", content=response))
+    return worker._process_actions(task, [FunctionTool.from_defaults(slow)], output)
+
+
+def test_timeouts_of_a_batch_run_concurrently():
+    worker = ParallelReActAgentWorker([], MockLLM(), tool_timeout=0.3)
+    response = "Thought: Sleep a lot.\n" + "".join(
+        'Action: slow\nAction Input: {"seconds": 1.0}\n' for _ in range(4)
+    )
+    start = time.perf_counter()
+    reasoning, _ = process(worker, response)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.9
+    assert reasoning[-1].observation.count("timed out after 0.3 s") == 4
+
+
+def test_actions_within_their_timeout_complete():
+    worker = ParallelReActAgentWorker([], MockLLM(), tool_timeout=0.5)
+    response = (
+        "Thought: Sleep a little, then a lot.\n"
+        'Action: slow\nAction Input: {"seconds": 0.05}\n'
+        'Action: slow\nAction Input: {"seconds": 2.0}\n'
+    )
+    reasoning, _ = process(worker, response)
+    lines = reasoning[-1].observation.splitlines()
+    assert lines[0] == "1. slow: slept 0.05"
+    assert lines[1] == "2. slow: Error: slow timed out after 0.5 s"